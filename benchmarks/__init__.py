@@ -0,0 +1,87 @@
+"""
+Benchmarks of the hot paths of the platform.
+
+Run one of them from the project root with:
+    python -m benchmarks.<name> [--help]
+
+They use the settings in DJANGO_SETTINGS_MODULE (elearning.settings.local
+by default) and run against a throwaway test database, never against
+the development one.
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+from io import BytesIO
+
+
+def setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE',
+                          'elearning.settings.local')
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    # Create the test databases and destroy them on exit.
+    # DEBUG is turned off as in the test runner.
+    from django.test.utils import (setup_test_environment,
+                                   teardown_test_environment,
+                                   setup_databases, teardown_databases)
+    setup_test_environment(debug=False)
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+class Timer(object):
+    def __init__(self):
+        self.elapsed = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self.start
+
+
+def report(label, elapsed, rows=None, queries=None):
+    line = '{:<45} {:>9.3f}s'.format(label, elapsed)
+    if rows:
+        line += ' {:>10.0f} rows/s'.format(rows / elapsed)
+    if queries is not None:
+        line += ' {:>7} queries'.format(queries)
+    print(line)
+
+
+def wsgi_get(application, path, cookie='', host='testserver'):
+    # Call the WSGI application as a server would,
+    # return the status code and the duration of the request
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': host,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': host,
+        'HTTP_COOKIE': cookie,
+        'REMOTE_ADDR': '192.0.2.1',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    statuses = []
+    start = time.perf_counter()
+    b''.join(application(environ,
+                         lambda status, headers: statuses.append(status)))
+    return int(statuses[0].split()[0]), time.perf_counter() - start
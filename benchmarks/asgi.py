@@ -0,0 +1,188 @@
+"""
+Requests per second and latency of the catalog, course and player
+pages under concurrent clients: the synchronous views behind the WSGI
+application of elearning/wsgi.py, called from a pool of threads as by a
+threaded WSGI server, against the async views behind the ASGI
+application of elearning/asgi.py, called from one event loop.
+
+The test database is in memory, --latency adds a simulated round trip
+to each query as with a database server on the network, the case the
+concurrent loads of the async views are made for.
+
+    python -m benchmarks.asgi --requests 2000 --concurrency 50 --latency 1
+"""
+
+import argparse
+import asyncio
+import importlib
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import setup, test_database, Timer, wsgi_get
+
+HOST = 'testserver'
+
+
+def use_async_views(enabled):
+    # Import the URLconfs again, they pick the views with ASYNC_VIEWS
+    from django.conf import settings
+    from django.urls import clear_url_caches
+    settings.ASYNC_VIEWS = enabled
+    for name in ('courses.urls', 'students.urls', settings.ROOT_URLCONF):
+        if name in sys.modules:
+            importlib.reload(sys.modules[name])
+    clear_url_caches()
+
+
+def add_latency(seconds):
+    # Sleep before each query of every connection
+    from django.db.backends.signals import connection_created
+
+    def sleep(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def created(sender, connection, **kwargs):
+        connection.execute_wrappers.append(sleep)
+
+    connection_created.connect(created, weak=False)
+    from django.db import connections
+    for connection in connections.all():
+        if connection.connection is not None:
+            connection.execute_wrappers.append(sleep)
+
+
+async def asgi_get(application, path, cookie):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', HOST.encode()), (b'cookie', cookie.encode())],
+        'client': ('192.0.2.1', 50000),
+        'server': (HOST, 80),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    start = time.perf_counter()
+    await application(scope, receive, send)
+    return messages[0]['status'], time.perf_counter() - start
+
+
+def bench_wsgi(application, requests, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor, \
+            Timer() as timer:
+        results = list(executor.map(
+            lambda request: wsgi_get(application, *request), requests))
+    return timer.elapsed, results
+
+
+def bench_asgi(application, requests, concurrency):
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def get(path, cookie):
+            async with semaphore:
+                return await asgi_get(application, path, cookie)
+
+        return await asyncio.gather(*(get(*request)
+                                      for request in requests))
+
+    with Timer() as timer:
+        results = asyncio.run(main())
+    return timer.elapsed, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency',
+                        type=float,
+                        default=0,
+                        help='Milliseconds added to each query')
+    parser.add_argument('--courses', type=int, default=200)
+    parser.add_argument('--threads',
+                        type=int,
+                        help='ASYNC_VIEW_THREADS, the setting by default')
+    args = parser.parse_args()
+
+    setup()
+    from django.conf import settings
+    from django.test import Client, override_settings
+    from django.urls import reverse
+    from courses.models import Course
+    from courses.seed import seed
+
+    media_root = tempfile.mkdtemp()
+    try:
+        with test_database(), override_settings(MEDIA_ROOT=media_root):
+            seed(subjects=5, instructors=5, courses=args.courses, modules=5,
+                 contents=4, students=20, enrollments=5, index=False)
+            course = Course.objects.filter(
+                students__isnull=False).order_by('-id')[:1].get()
+            student = course.students.order_by('id')[:1].get()
+            client = Client()
+            client.force_login(student)
+            cookie = '{}={}'.format(
+                settings.SESSION_COOKIE_NAME,
+                client.cookies[settings.SESSION_COOKIE_NAME].value)
+            if args.latency:
+                add_latency(args.latency / 1000)
+            if args.threads:
+                settings.ASYNC_VIEW_THREADS = args.threads
+
+            def requests():
+                pages = [
+                    (reverse('course_list'), ''),
+                    (reverse('courses:course_detail', args=[course.slug]),
+                     ''),
+                    (reverse('students:student_course_detail',
+                             args=[course.id]), cookie),
+                ]
+                return [pages[i % len(pages)] for i in range(args.requests)]
+
+            from elearning.wsgi import application as wsgi_application
+            from elearning.asgi import application as asgi_application
+            phases = [
+                ('WSGI, synchronous views', False, bench_wsgi,
+                 wsgi_application),
+                ('ASGI, async views', True, bench_asgi, asgi_application),
+            ]
+            for label, enabled, bench, application in phases:
+                use_async_views(enabled)
+                pages = requests()
+                # Warm the caches and check the pages
+                bench(application, pages[:3], 1)
+                elapsed, results = bench(application, pages,
+                                         args.concurrency)
+                errors = sum(1 for status, duration in results
+                             if status != 200)
+                durations = sorted(duration for status, duration in results)
+                print('{:<25} {:>8.0f} requests/s {:>8.1f}ms p50 {:>8.1f}ms '
+                      'p95 {:>5} errors'.format(
+                          label, len(pages) / elapsed,
+                          durations[len(durations) // 2] * 1000,
+                          durations[int(len(durations) * 0.95)] * 1000,
+                          errors))
+            use_async_views(False)
+    finally:
+        shutil.rmtree(media_root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
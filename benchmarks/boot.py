@@ -0,0 +1,133 @@
+"""
+Boot time of a worker, its first request and the following ones, with
+the local and the production settings. Each run is a new process:
+the boot covers the import of the settings, django.setup() and the WSGI
+application, the first request the URLconf and the templates.
+
+Both profiles use the same SQLite database, migrated and seeded once,
+and a local memory cache in place of their own database and cache.
+
+    python -m benchmarks.boot --runs 5 --requests 200
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import wsgi_get
+
+PROFILES = ('local', 'production')
+HOST = 'localhost'
+
+
+def configure(profile, directory):
+    # Before anything is loaded from the settings
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'elearning.settings.' + profile
+    os.environ.setdefault('DJANGO_SECRET_KEY', 'benchmark')
+    os.environ.setdefault('DJANGO_ALLOWED_HOSTS', HOST)
+    from django.conf import settings
+    settings.DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(directory, 'db.sqlite3'),
+            'CONN_MAX_AGE': settings.DATABASES['default'].get(
+                'CONN_MAX_AGE', 0),
+        }
+    }
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'boot',
+        }
+    }
+    settings.MEDIA_ROOT = directory
+
+
+def prepare(directory):
+    configure('production', directory)
+    import django
+    django.setup()
+    from django.core.management import call_command
+    from courses.seed import seed
+    call_command('migrate', verbosity=0)
+    seed(subjects=5, instructors=5, courses=100, modules=5, contents=4,
+         students=20, enrollments=5, index=False)
+
+
+def run(profile, directory, requests):
+    start = time.perf_counter()
+    configure(profile, directory)
+    import django
+    django.setup()
+    from django.core.wsgi import get_wsgi_application
+    application = get_wsgi_application()
+    boot = time.perf_counter() - start
+
+    from courses.models import Course
+    slug = Course.objects.values_list('slug', flat=True)[:1].get()
+    paths = ['/', '/course/{}/'.format(slug)]
+    status, first = wsgi_get(application, paths[0], host=HOST)
+    assert status == 200, status
+    durations = []
+    for i in range(requests):
+        status, duration = wsgi_get(application,
+                                    paths[i % len(paths)],
+                                    host=HOST)
+        assert status == 200, status
+        durations.append(duration)
+    return {
+        'boot': boot,
+        'first_request': first,
+        'request': statistics.mean(durations),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--child', nargs=2, metavar=('PROFILE', 'DIRECTORY'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        profile, directory = args.child
+        if profile == 'prepare':
+            prepare(directory)
+        else:
+            print(json.dumps(run(profile, directory, args.requests)))
+        return
+
+    def child(profile):
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.boot', '--requests',
+             str(args.requests), '--child', profile, directory],
+            check=True,
+            capture_output=True,
+            text=True).stdout
+        return json.loads(output) if output else None
+
+    directory = tempfile.mkdtemp()
+    try:
+        child('prepare')
+        for profile in PROFILES:
+            runs = [child(profile) for i in range(args.runs)]
+            print('{:<12} {:>9.1f}ms boot {:>9.1f}ms first request '
+                  '{:>7.2f}ms by request'.format(
+                      profile,
+                      statistics.median(r['boot'] for r in runs) * 1000,
+                      statistics.median(r['first_request']
+                                        for r in runs) * 1000,
+                      statistics.median(r['request'] for r in runs) * 1000))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
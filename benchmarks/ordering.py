@@ -0,0 +1,74 @@
+"""
+Insertion of modules and contents with the OrderField allocation,
+one save() by row against bulk_create() of the whole batch.
+
+    python -m benchmarks.ordering --rows 5000
+"""
+
+import argparse
+
+from benchmarks import setup, test_database, Timer, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5000)
+    args = parser.parse_args()
+
+    setup()
+    from django.contrib.auth.models import User
+    from courses.budget import count_queries
+    from courses.models import Subject, Course, Module, Content, Text
+
+    with test_database():
+        owner = User.objects.create(username='instructor')
+        subject = Subject.objects.create(title='Subject', slug='subject')
+
+        def course(slug):
+            return Course.objects.create(owner=owner,
+                                         subject=subject,
+                                         title=slug,
+                                         slug=slug)
+
+        texts = Text.objects.bulk_create(
+            Text(owner=owner, title='Text', content='Text')
+            for i in range(args.rows))
+        if texts[0].pk is None:
+            # The database doesn't return the ids of the inserted rows
+            texts = list(Text.objects.order_by('pk'))
+
+        one_by_one = course('one-by-one')
+        with count_queries() as counter, Timer() as timer:
+            for i in range(args.rows):
+                Module.objects.create(course=one_by_one, title='Module')
+        report('Module.objects.create() x {}'.format(args.rows),
+               timer.elapsed, args.rows, counter.count)
+
+        bulk = course('bulk')
+        with count_queries() as counter, Timer() as timer:
+            Module.objects.bulk_create(
+                Module(course=bulk, title='Module')
+                for i in range(args.rows))
+        report('Module.objects.bulk_create({})'.format(args.rows),
+               timer.elapsed, args.rows, counter.count)
+
+        module = bulk.modules.first()
+        with count_queries() as counter, Timer() as timer:
+            for text in texts:
+                Content.objects.create(module=module, item=text)
+        report('Content.objects.create() x {}'.format(args.rows),
+               timer.elapsed, args.rows, counter.count)
+
+        module = bulk.modules.last()
+        with count_queries() as counter, Timer() as timer:
+            Content.objects.bulk_create(
+                Content(module=module, item=text) for text in texts)
+        report('Content.objects.bulk_create({})'.format(args.rows),
+               timer.elapsed, args.rows, counter.count)
+
+        orders = list(module.contents.values_list('order', flat=True))
+        assert orders == list(range(args.rows)), 'Orders are not contiguous'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Reordering of large modules through ContentOrderView, against the
+previous implementation running one UPDATE by content.
+
+    python -m benchmarks.reorder --sizes 100 300 1000
+"""
+
+import argparse
+import json
+import random
+
+from benchmarks import setup, test_database, Timer, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[100, 300, 1000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup()
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from django.urls import reverse
+    from courses.budget import count_queries
+    from courses.models import Subject, Course, Module, Content, Text
+
+    with test_database():
+        owner = User.objects.create(username='instructor')
+        subject = Subject.objects.create(title='Subject', slug='subject')
+        client = Client()
+        client.force_login(owner)
+
+        for size in args.sizes:
+            course = Course.objects.create(owner=owner,
+                                           subject=subject,
+                                           title='Course',
+                                           slug='course-{}'.format(size))
+            module = Module.objects.create(course=course, title='Module')
+            Text.objects.bulk_create(
+                Text(owner=owner, title='Text', content='Text')
+                for i in range(size))
+            texts = Text.objects.order_by('-pk')[:size]
+            Content.objects.bulk_create(
+                Content(module=module, item=text) for text in texts)
+            ids = list(module.contents.values_list('id', flat=True))
+
+            with count_queries() as counter, Timer() as timer:
+                for i in range(args.repeat):
+                    random.shuffle(ids)
+                    for order, id in enumerate(ids):
+                        Content.objects.filter(
+                            id=id, module__course__owner=owner).update(
+                                order=order)
+            report('one UPDATE by content, {} contents'.format(size),
+                   timer.elapsed / args.repeat, size,
+                   counter.count // args.repeat)
+
+            with count_queries() as counter, Timer() as timer:
+                for i in range(args.repeat):
+                    random.shuffle(ids)
+                    response = client.post(
+                        reverse('courses:content_order'),
+                        json.dumps({id: i for i, id in enumerate(ids)}),
+                        content_type='application/json')
+                    assert response.status_code == 200
+            report('ContentOrderView, {} contents'.format(size),
+                   timer.elapsed / args.repeat, size,
+                   counter.count // args.repeat)
+            assert list(module.contents.values_list('id', flat=True)) == ids
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Full text search over a large number of documents, against the
+icontains scan it replaces. The scan stops at the first 20 matches
+unranked, so it stays faster for the words in most documents.
+
+    python -m benchmarks.search --rows 100000
+"""
+
+import argparse
+import random
+import string
+
+from benchmarks import setup, test_database, Timer, report
+
+# Few common words and many rare ones, as in a natural language
+COMMON = ('python django course module lesson the of and to in is for '
+          'with on as by this that from an be at or').split()
+
+
+def make_words(count):
+    return [''.join(random.choice(string.ascii_lowercase)
+                    for i in range(random.randint(4, 10)))
+            for i in range(count)]
+
+
+def sentence(words, length):
+    return ' '.join(random.choice(COMMON) if random.random() < 0.5
+                    else random.choice(words) for i in range(length))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    from django.contrib.auth.models import User
+    from django.contrib.contenttypes.models import ContentType
+    from django.db.models import Q
+    from courses.budget import count_queries
+    from courses.models import Subject, Course, Module, SearchDocument
+    from courses.search import search
+
+    random.seed(0)
+    words = make_words(20000)
+    with test_database():
+        owner = User.objects.create(username='instructor')
+        subject = Subject.objects.create(title='Subject', slug='subject')
+        Course.objects.bulk_create(
+            Course(owner=owner,
+                   subject=subject,
+                   title='Course {}'.format(i),
+                   slug='course-{}'.format(i),
+                   overview='') for i in range(1000))
+        course_ids = list(Course.objects.values_list('id', flat=True))
+        content_type = ContentType.objects.get_for_model(Module)
+
+        with Timer() as timer:
+            for start in range(0, args.rows, 5000):
+                SearchDocument.objects.bulk_create(
+                    SearchDocument(content_type=content_type,
+                                   object_id=i,
+                                   course_id=random.choice(course_ids),
+                                   title=sentence(words, 4),
+                                   body=sentence(words, 60))
+                    for i in range(start, min(start + 5000, args.rows)))
+        report('index {} documents'.format(args.rows), timer.elapsed,
+               args.rows)
+
+        queries = [words[0], 'python ' + words[1],
+                   'course lesson', words[4][:3]]
+        for query in queries:
+            with count_queries() as counter, Timer() as timer:
+                for i in range(args.repeat):
+                    results = search(query)
+            report('search "{}"'.format(query), timer.elapsed / args.repeat,
+                   queries=counter.count // args.repeat)
+            assert results
+
+            with Timer() as timer:
+                for i in range(args.repeat):
+                    documents = SearchDocument.objects.all()
+                    for term in query.split():
+                        documents = documents.filter(
+                            Q(title__icontains=term)
+                            | Q(body__icontains=term))
+                    list(documents[:20])
+            report('icontains "{}"'.format(query),
+                   timer.elapsed / args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from .clone import clone_course
 from .models import Subject, Course, Module
 
 
@@ -19,3 +20,13 @@ class CourseAdmin(admin.ModelAdmin):
     search_fields = ['title', 'overview']
     prepopulated_fields = {'slug': ('title', )}
     inlines = [ModuleInline]
+    actions = ['clone_courses']
+
+    def clone_courses(self, request, queryset):
+        # The copies keep the owner of their course
+        for course in queryset:
+            clone_course(course)
+        self.message_user(request,
+                          '{} courses cloned.'.format(len(queryset)))
+
+    clone_courses.short_description = 'Clone the selected courses'
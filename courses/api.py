@@ -0,0 +1,143 @@
+"""
+Read-only JSON API of the catalog and of the course outlines.
+
+Every response has a strong ETag made of the version of the data it
+shows: the catalog version (see courses/cache.py) for the subjects and
+the courses of a subject, the version of the course for its outline
+(bumped by courses/signals.py). The versions live in the cache, so a
+request with a matching If-None-Match gets its 304 Not Modified
+without any SQL query.
+"""
+
+import hashlib
+
+from django.db.models import Prefetch
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from django.views.generic.base import View
+
+from braces.views import JSONResponseMixin
+
+from courses.cache import (CATALOG, get_version, course_version,
+                           catalog_courses)
+from courses.models import Subject, Course, Content
+from courses.pagination import paginate, InvalidCursor
+
+
+def make_etag(*parts):
+    return hashlib.md5('|'.join(str(part) for part in parts).encode(
+        'utf-8')).hexdigest()
+
+
+def catalog_etag(request, subject=None):
+    return make_etag(get_version(CATALOG), subject,
+                     request.GET.get('cursor', ''))
+
+
+def outline_etag(request, pk):
+    return make_etag(get_version(course_version(pk)), pk)
+
+
+def subject_data(subject):
+    return {
+        'id': subject.id,
+        'title': subject.title,
+        'slug': subject.slug,
+        'courses_url': reverse('courses:api_course_list',
+                               args=[subject.slug]),
+    }
+
+
+@method_decorator(condition(etag_func=catalog_etag), name='get')
+class SubjectListApiView(JSONResponseMixin, View):
+    query_budget = 1
+
+    def get(self, request):
+        return self.render_json_response({
+            'subjects': [
+                dict(subject_data(subject),
+                     total_courses=subject.course_count)
+                for subject in Subject.objects.all()
+            ]
+        })
+
+
+@method_decorator(condition(etag_func=catalog_etag), name='get')
+class CourseListApiView(JSONResponseMixin, View):
+    # The courses of a subject, by pages (see courses/pagination.py)
+    query_budget = 2
+
+    def get(self, request, subject):
+        subject = get_object_or_404(Subject, slug=subject)
+        try:
+            page = paginate(catalog_courses().filter(subject=subject),
+                            request.GET.get('cursor'))
+        except InvalidCursor as e:
+            raise Http404(str(e))
+        url = reverse('courses:api_course_list', args=[subject.slug])
+        next_url = previous_url = None
+        if page.has_next():
+            next_url = '{}?cursor={}'.format(url, page.next_cursor)
+        if page.has_previous():
+            previous_url = '{}?cursor={}'.format(url, page.previous_cursor)
+        return self.render_json_response({
+            'subject': subject_data(subject),
+            'courses': [{
+                'id': course.id,
+                'title': course.title,
+                'slug': course.slug,
+                'overview': course.overview,
+                'owner': course.owner.username,
+                'created': course.created,
+                'total_modules': course.module_count,
+                'outline_url': reverse('courses:api_course_outline',
+                                       args=[course.id]),
+            } for course in page],
+            'next': next_url,
+            'previous': previous_url,
+        })
+
+
+@method_decorator(condition(etag_func=outline_etag), name='get')
+class CourseOutlineApiView(JSONResponseMixin, View):
+    """
+    The modules of a course with the title and type of their contents,
+    without the contents whose item was deleted.
+    A query for the course, one for the modules, one for the contents
+    and one by content type for the items, whatever the size.
+    """
+    query_budget = 7
+
+    def get(self, request, pk):
+        course = get_object_or_404(
+            Course.objects.select_related('subject', 'owner').prefetch_related(
+                Prefetch('modules__contents',
+                         queryset=Content.objects.with_items())),
+            pk=pk)
+        # Loaded by with_items(), unless the item doesn't exist anymore
+        item_field = Content._meta.get_field('item')
+        return self.render_json_response({
+            'id': course.id,
+            'title': course.title,
+            'slug': course.slug,
+            'overview': course.overview,
+            'subject': subject_data(course.subject),
+            'owner': course.owner.username,
+            'created': course.created,
+            'modules': [{
+                'id': module.id,
+                'order': module.order,
+                'title': module.title,
+                'description': module.description,
+                'contents': [{
+                    'id': content.id,
+                    'order': content.order,
+                    'type': content.item._meta.model_name,
+                    'title': content.item.title,
+                } for content in module.contents.all()
+                  if item_field.is_cached(content)],
+            } for module in course.modules.all()],
+        })
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class CoursesConfig(AppConfig):
     name = 'courses'
+
+    def ready(self):
+        # Connect the signal receivers
+        import courses.signals  # noqa: F401
@@ -0,0 +1,80 @@
+"""
+Async versions of the public read views, for an ASGI server.
+
+They render the same pages as their synchronous versions in
+courses/views.py, but load the data of the page concurrently in the pool
+of courses/parallel.py: the session and the user of the request at the
+same time as the catalog, or as the course. The URLs use them when
+ASYNC_VIEWS is set (see elearning/asgi.py).
+"""
+
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.views.generic.base import View
+
+from courses import views
+from courses.cache import (lookup_catalog, catalog_subjects, catalog_page,
+                           make_catalog)
+from courses.conditional import page_validators, set_page_validators
+from courses.models import Course
+from courses.pagination import InvalidCursor
+from courses.parallel import AsyncViewMixin, run, gather, load_user
+
+
+def get_course(slug):
+    try:
+        return Course.objects.select_related('subject',
+                                             'owner').get(slug=slug)
+    except Course.DoesNotExist:
+        raise Http404('No course matches the given query.')
+
+
+class CourseListView(AsyncViewMixin, views.CourseListView):
+    async def get(self, request, subject=None):
+        cursor = request.GET.get('cursor')
+        user, (key, catalog) = await gather(
+            partial(load_user, request),
+            partial(lookup_catalog, subject, cursor))
+        if catalog is None:
+            # The subjects and the page of courses at the same time
+            try:
+                subjects, page = await gather(
+                    catalog_subjects, partial(catalog_page, subject,
+                                              cursor))
+            except InvalidCursor as e:
+                raise Http404(str(e))
+            catalog = make_catalog(subjects, subject, page)
+            if catalog is not None:
+                await run(cache.set, key, catalog,
+                          settings.CATALOG_CACHE_TIMEOUT)
+        if catalog is None:
+            raise Http404('No subject matches the given query.')
+        return self.render_to_response(catalog)
+
+
+class CourseDetailView(AsyncViewMixin, views.CourseDetailView):
+    # The course with its subject and owner, the session and the user
+    query_budget = 3
+
+    def dispatch(self, request, *args, **kwargs):
+        # ConditionalGetMixin.dispatch() queries the database, get()
+        # checks the validators itself
+        return View.dispatch(self, request, *args, **kwargs)
+
+    async def get(self, request, slug):
+        user, course = await gather(partial(load_user, request),
+                                    partial(get_course, slug))
+        parts = await run(self.get_etag_parts, user)
+        etag, timestamp = page_validators(course.last_modified, user, *parts)
+        response = get_conditional_response(request,
+                                            etag=etag,
+                                            last_modified=timestamp)
+        if response is None:
+            self.object = course
+            response = self.render_to_response(
+                self.get_context_data(object=course))
+        return set_page_validators(response, etag, timestamp)
@@ -0,0 +1,40 @@
+"""
+Users of the sessions, loaded from the cache.
+
+AuthenticationMiddleware loads the user of the session on each request
+with the get_user() of its backend. CachedModelBackend reads it from the
+cache, from the database on a miss, and keeps it for USER_CACHE_TIMEOUT
+seconds. The user is cached as loaded, before the request adds its
+groups and permissions to it (see courses/membership.py).
+
+The signals in courses/signals.py drop the cached user when it is saved
+or deleted: login (last_login), password change, deactivation. The
+session hash checked by django.contrib.auth.get_user() is then always
+the one of the current password, a password change still logs out the
+other sessions. Queryset update() doesn't send the signals, call
+invalidate_users() after it.
+"""
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_key(user_id):
+    return 'courses:user:{}'.format(user_id)
+
+
+def invalidate_users(*user_ids):
+    cache.delete_many([user_key(user_id) for user_id in user_ids])
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        key = user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            # None for an unknown or inactive user, not cached
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
@@ -0,0 +1,140 @@
+"""
+SQL query budgets for the views.
+
+Each view declares the maximum number of queries a request may run with
+a ``query_budget`` class attribute (or the ``query_budget`` decorator for
+function views), either a number or a dict of numbers by HTTP method.
+The budget covers the whole request, including the session,
+the authenticated user and the templates.
+QueryBudgetMiddleware checks it on every request in development and
+QueryBudgetTestMixin lets the test suite check it against seeded data.
+"""
+
+import logging
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.urls import resolve
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter(object):
+    # Execute wrapper counting the queries run on the connection
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def count_queries():
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        yield counter
+
+
+def query_budget(budget):
+    """
+    Declare the query budget of a function view.
+
+    @query_budget(4)
+    def my_view(request):
+        ...
+    """
+    def decorator(view_func):
+        view_func.query_budget = budget
+        return view_func
+
+    return decorator
+
+
+def get_query_budget(view_func, method='GET'):
+    # Class based views expose their class on the as_view() function
+    view = getattr(view_func, 'view_class', view_func)
+    budget = getattr(view, 'query_budget', None)
+    if isinstance(budget, dict):
+        return budget.get(method.lower())
+    return budget
+
+
+class QueryBudgetMiddleware(object):
+    """
+    Count the queries of each request and report the views that go over
+    their budget. Only active with DEBUG, it raises QueryBudgetExceeded
+    if QUERY_BUDGET_RAISE is set and logs a warning otherwise.
+    Put it first in MIDDLEWARE to count the session and auth queries.
+    """
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with count_queries() as counter:
+            response = self.get_response(request)
+        budget = getattr(request, 'query_budget', None)
+        if budget is not None and counter.count > budget:
+            message = '{} ran {} queries, its budget is {}'.format(
+                request.path, counter.count, budget)
+            if getattr(settings, 'QUERY_BUDGET_RAISE', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_query_budget(view_func, request.method)
+
+
+class QueryBudgetTestMixin(object):
+    """
+    TestCase mixin checking the query count of the views
+    against their declared budget.
+    """
+    # Scales at which the seed functions populate the database
+    budget_sizes = (1, 4, 16)
+
+    def assertQueryBudget(self, url, method='get', data=None, **extra):
+        """
+        Request the url with the test client and fail if the view runs
+        more queries than its budget. Return the number of queries.
+        The cache is cleared first to measure the worst case.
+        """
+        match = resolve(urlparse(url).path)
+        budget = get_query_budget(match.func, method)
+        if budget is None:
+            self.fail('{} has no {} query budget'.format(
+                match.view_name, method.upper()))
+        cache.clear()
+        with count_queries() as counter:
+            response = getattr(self.client, method)(url, data, **extra)
+        self.assertLess(response.status_code, 400)
+        if counter.count > budget:
+            self.fail('{} ran {} queries, its budget is {}'.format(
+                match.view_name, counter.count, budget))
+        return counter.count
+
+    def assertQueryBudgetScales(self, seed, method='get', data=None):
+        """
+        Call seed(size) for each of the budget sizes, it must populate
+        the database at this scale and return the url to request.
+        Fail if the view goes over its budget at any scale or if its
+        query count grows with the data.
+        """
+        counts = {}
+        for size in self.budget_sizes:
+            url = seed(size)
+            counts[size] = self.assertQueryBudget(url, method, data)
+        if len(set(counts.values())) > 1:
+            self.fail('Query count grows with the data: {}'.format(counts))
+        return counts
@@ -0,0 +1,158 @@
+"""
+Cache helpers for the public pages of the platform.
+
+Cached entries are namespaced by a version number that lives in the cache
+itself. Bumping a version (see courses/signals.py) makes every entry built
+with the previous one unreachable, so nothing has to be deleted explicitly
+and the same code works with the local-memory and file-based backends,
+which can't delete keys by pattern.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from courses.models import Subject, Course, Content
+from courses.pagination import paginate
+
+CATALOG = 'catalog'
+
+
+def _version_key(name):
+    return 'courses:version:{}'.format(name)
+
+
+def get_version(name):
+    # Versions start from the current time so that an evicted version key
+    # never brings back entries built with an older one.
+    key = _version_key(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(name):
+    key = _version_key(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The key was never set or has been evicted
+        cache.set(key, int(time.time() * 1000), None)
+
+
+def course_version(course_id):
+    # Name of the version of a course, its modules and contents
+    return 'course:{}'.format(course_id)
+
+
+def touch_courses(course_ids):
+    """
+    Mark the courses as modified: a new last_modified
+    and a new cache version for each of them.
+    """
+    course_ids = set(course_ids)
+    if not course_ids:
+        return
+    Course.objects.filter(id__in=course_ids).update(
+        last_modified=timezone.now())
+    for course_id in course_ids:
+        bump_version(course_version(course_id))
+
+
+def touch_item_courses(model, item_ids):
+    # The courses of the contents of the items
+    touch_courses(
+        Content.objects.filter(
+            content_type=ContentType.objects.get_for_model(model),
+            object_id__in=item_ids).values_list('module__course_id',
+                                                flat=True))
+
+
+def catalog_key(slug=None, cursor=None):
+    # The cursor comes from the query string, not yet decoded: hashed, the
+    # key stays valid for memcached (no spaces, at most 250 characters)
+    cursor = hashlib.md5(cursor.encode()).hexdigest() if cursor else ''
+    return 'courses:catalog:{}:{}:{}'.format(get_version(CATALOG),
+                                             slug or '*', cursor)
+
+
+def catalog_courses():
+    """
+    Return the courses with their subject and owner.
+    """
+    # The number of modules is stored (see courses/counters.py), the
+    # pages of courses are read in the order of the index on created
+    return Course.objects.select_related('subject', 'owner')
+
+
+def catalog_subjects():
+    return list(Subject.objects.all())
+
+
+def catalog_page(slug=None, cursor=None):
+    """
+    Return the page of courses of a subject slug (all subjects when None)
+    at the cursor. Doesn't need the subject: it can run at the same time
+    as catalog_subjects() (see courses/async_views.py).
+    """
+    courses = catalog_courses()
+    if slug:
+        courses = courses.filter(subject__slug=slug)
+    return paginate(courses, cursor)
+
+
+def make_catalog(subjects, slug, page):
+    # Render the subjects sidebar, None if there is no subject with the slug
+    subject = None
+    if slug:
+        subject = next((s for s in subjects if s.slug == slug), None)
+        if subject is None:
+            return None
+    return {
+        'subject': subject,
+        'courses': page,
+        'sidebar': render_to_string('courses/course/subjects.html', {
+            'subjects': subjects,
+            'subject': subject
+        }),
+    }
+
+
+def build_catalog(slug=None, cursor=None):
+    """
+    Run the catalog queries for a subject slug (all subjects when None)
+    and the page of courses at the cursor, and render the subjects sidebar.
+    Return None if there is no subject with this slug, raise
+    InvalidCursor for an invalid cursor.
+    """
+    subjects = catalog_subjects()
+    if slug and not any(s.slug == slug for s in subjects):
+        return None
+    return make_catalog(subjects, slug, catalog_page(slug, cursor))
+
+
+def lookup_catalog(slug=None, cursor=None):
+    # The key of the catalog page and the cached page, None on a miss
+    key = catalog_key(slug, cursor)
+    return key, cache.get(key)
+
+
+def get_catalog(slug=None, cursor=None):
+    """
+    Return the cached catalog page for a subject slug and a cursor,
+    building it on a miss. A hit doesn't run any SQL query: the courses
+    are stored with their subject and owner already loaded.
+    """
+    key, catalog = lookup_catalog(slug, cursor)
+    if catalog is None:
+        catalog = build_catalog(slug, cursor)
+        if catalog is not None:
+            cache.set(key, catalog, settings.CATALOG_CACHE_TIMEOUT)
+    return catalog
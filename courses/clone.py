@@ -0,0 +1,122 @@
+"""
+Copy of a course for a new term.
+
+clone_course() copies a course with its modules, their contents and the
+Text, File, Image and Video items of the contents with a fixed number of
+queries whatever the size of the course: the source is read with one
+query by model (one by content type for the items, see load_items()) and
+the copies are inserted with one bulk insert by model, keeping the order
+of the modules and contents. The copied File and Image items point to
+the same stored files and image variants: the files aren't deleted with
+their items.
+
+The course is created first in the transaction: on SQLite the ids of the
+bulk inserted rows are read back after it (see courses.seed.bulk_insert)
+while no other connection can write.
+
+The bulk inserts don't send the signals: the counters of the copy are
+set when it is created, and its modules and texts are indexed for the
+search at the end. The copied images whose variants aren't made yet get
+their make_image_variants job, one query each, as a saved image would.
+The course itself is saved, with its signals.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+
+from courses.images import needs_variants
+from courses.models import Course, Module, Content, Image
+from courses.search import index_course_contents
+from courses.seed import bulk_insert
+from courses.tasks import make_image_variants
+
+COPY_TITLE = '{} (copy)'
+
+
+def copy_slug(slug):
+    """
+    Return an unused slug for a copy of the course with the given slug:
+    <slug>-copy, then <slug>-copy-2, <slug>-copy-3...
+    """
+    base = '{}-copy'.format(slug[:190])
+    used = set(
+        Course.objects.filter(slug__startswith=base).order_by().values_list(
+            'slug', flat=True))
+    slug, number = base, 1
+    while slug in used:
+        number += 1
+        slug = '{}-{}'.format(base, number)
+    return slug
+
+
+def copy_item(item, owner_id):
+    # A new row with the same values, created and updated are set again
+    # by the insert
+    fields = {
+        field.attname: getattr(item, field.attname)
+        for field in item._meta.concrete_fields if not field.primary_key
+    }
+    fields['owner_id'] = owner_id
+    return type(item)(**fields)
+
+
+@transaction.atomic
+def clone_course(course, owner=None, title=None, slug=None,
+                 batch_size=1000):
+    """
+    Copy the course, its modules, contents and items for owner (the
+    owner of the course if None) under the given title and slug
+    ("<title> (copy)" and copy_slug() if None). The students aren't
+    copied. Return the new course.
+    """
+    owner_id = owner.id if owner is not None else course.owner_id
+    modules = list(Module.objects.filter(course=course).order_by('id'))
+    # The contents whose item still exists
+    item_field = Content._meta.get_field('item')
+    contents = [
+        content for content in Content.objects.filter(
+            module_id__in=[module.id for module in modules]).order_by(
+                'id').with_items() if item_field.is_cached(content)
+    ]
+
+    clone = Course.objects.create(
+        owner_id=owner_id,
+        subject_id=course.subject_id,
+        title=title or COPY_TITLE.format(course.title)[:200],
+        slug=slug or copy_slug(course.slug),
+        overview=course.overview,
+        module_count=len(modules),
+        content_count=len(contents))
+
+    # The orders are copied, OrderField doesn't allocate them again
+    module_ids = dict(
+        zip([module.id for module in modules],
+            bulk_insert(Module, (Module(course=clone,
+                                        title=module.title,
+                                        description=module.description,
+                                        order=module.order)
+                                 for module in modules), batch_size)))
+
+    by_model = defaultdict(list)
+    for content in contents:
+        by_model[type(content.item)].append(content)
+    object_ids = {}
+    for model, model_contents in by_model.items():
+        ids = bulk_insert(model, (copy_item(content.item, owner_id)
+                                  for content in model_contents), batch_size)
+        object_ids.update(
+            zip([content.id for content in model_contents], ids))
+        if model is Image:
+            # The variants job of the source may not have run yet
+            for content, image_id in zip(model_contents, ids):
+                if needs_variants(content.item):
+                    make_image_variants.delay(image_id=image_id)
+    Content.objects.bulk_create(
+        (Content(module_id=module_ids[content.module_id],
+                 content_type_id=content.content_type_id,
+                 object_id=object_ids[content.id],
+                 order=content.order) for content in contents), batch_size)
+
+    index_course_contents(clone.id, batch_size)
+    return clone
@@ -0,0 +1,78 @@
+"""
+Conditional GET of the course pages.
+
+The pages of a course only change with the course, its subject, modules,
+contents and items, which all set its last_modified (see
+courses/signals.py), and with the user they are rendered for. The
+validators of a page are then:
+
+- Last-Modified: the last_modified of the course,
+- ETag: a hash of the last_modified, of the user id and of the
+  get_etag_parts() of the view, e.g. the enrollments of the user.
+
+ConditionalGetMixin reads last_modified with one query and answers a
+request holding the current validators with a 304 Not Modified, without
+loading the page data nor rendering its template.
+"""
+
+from django.utils.cache import (get_conditional_response,
+                                patch_cache_control)
+from django.utils.http import http_date, quote_etag
+
+from courses.api import make_etag
+
+
+def page_validators(last_modified, user, *parts):
+    # The ETag and Last-Modified timestamp of a course page
+    etag = quote_etag(make_etag(last_modified.isoformat(), user.pk, *parts))
+    return etag, int(last_modified.timestamp())
+
+
+def set_page_validators(response, etag, timestamp):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(timestamp)
+    # Revalidated by the browser on each visit, never shared
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class ConditionalGetMixin(object):
+    """
+    Mixin for the views of a course page. get_last_modified_queryset()
+    returns the courses the page may show, filtered by the URL arguments
+    and the access rules, the page is served normally if it is empty.
+    """
+    def get_last_modified_queryset(self):
+        raise NotImplementedError
+
+    def get_etag_parts(self, user):
+        # What else the page of the user depends on
+        return ()
+
+    def get_last_modified(self):
+        # Not sorted, first() would order the joined rows
+        values = list(
+            self.get_last_modified_queryset().order_by().values_list(
+                'last_modified', flat=True)[:1])
+        return values[0] if values else None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super(ConditionalGetMixin,
+                         self).dispatch(request, *args, **kwargs)
+        self.request, self.args, self.kwargs = request, args, kwargs
+        last_modified = self.get_last_modified()
+        if last_modified is None:
+            return super(ConditionalGetMixin,
+                         self).dispatch(request, *args, **kwargs)
+        etag, timestamp = page_validators(last_modified, request.user,
+                                          *self.get_etag_parts(request.user))
+        response = get_conditional_response(request,
+                                            etag=etag,
+                                            last_modified=timestamp)
+        if response is None:
+            response = super(ConditionalGetMixin,
+                             self).dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        return set_page_validators(response, etag, timestamp)
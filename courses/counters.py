@@ -0,0 +1,70 @@
+"""
+Stored counters of the subjects and courses.
+
+Subject.course_count and Course.module_count, content_count and
+student_count are read by the catalog and the course pages instead of
+aggregating the related rows on each request. The signals (see
+courses/signals.py) change them with F() expressions, in the UPDATE
+query itself, so concurrent changes don't lose any. The decrements of
+more than one row recount the counters from the rows instead, e.g. a
+module deleted with its contents.
+
+recount() computes them again in bulk, with one UPDATE query by model,
+to repair the drift of the changes made without the signals (queryset
+update() and delete(), raw SQL). See the recount_counters command.
+"""
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from courses.models import Subject, Course, Module, Content
+
+# counter: (model of the counted rows, lookup of the counting object)
+COUNTERS = {
+    Subject: {
+        'course_count': (Course, 'subject'),
+    },
+    Course: {
+        'module_count': (Module, 'course'),
+        'content_count': (Content, 'module__course'),
+        'student_count': (Course.students.through, 'course'),
+    },
+}
+
+
+def change_counter(model, ids, counter, delta):
+    """
+    Add delta to the counter of the objects with the given ids.
+    A decrement leaves a counter already too low at 0.
+    """
+    ids = set(ids)
+    if not ids or not delta:
+        return
+    objects = model.objects.filter(id__in=ids)
+    if delta < 0:
+        objects = objects.filter(**{counter + '__gte': -delta})
+    objects.update(**{counter: F(counter) + delta})
+
+
+def count_expression(model, counter):
+    # The number of related rows of each object, in a subquery
+    related, lookup = COUNTERS[model][counter]
+    total = related.objects.filter(**{
+        lookup: OuterRef('pk')
+    }).order_by().values(lookup).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(total), 0)
+
+
+def recount(model, ids=None, counters=None):
+    """
+    Set the counters (all the counters of the model when None) of the
+    objects with the given ids (all the objects when None) to the number
+    of their related rows. Return the number of updated objects.
+    """
+    objects = model.objects.all()
+    if ids is not None:
+        objects = objects.filter(id__in=set(ids))
+    return objects.update(**{
+        counter: count_expression(model, counter)
+        for counter in counters or COUNTERS[model]
+    })
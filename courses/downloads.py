@@ -0,0 +1,160 @@
+"""
+Serving of the File and Image items to their owner and to the students
+enrolled in a course using them.
+
+serve_item() answers conditional requests (If-None-Match) and single
+byte ranges (Range / If-Range). The file is streamed by
+DOWNLOAD_CHUNK_SIZE blocks so the memory used doesn't depend on its size.
+With DOWNLOAD_BACKEND set to 'x-accel-redirect' (nginx) or 'x-sendfile'
+(Apache, lighttpd) Django only checks the access and the front-end
+server transfers the bytes itself, ranges included.
+
+Only the raster images of INLINE_CONTENT_TYPES are shown inline. Any
+other file, e.g. an HTML or SVG file uploaded as an Image item, is sent
+as an application/octet-stream attachment: it isn't run as a page of
+the site.
+"""
+
+import hashlib
+import mimetypes
+import re
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+from courses.membership import get_enrolled_course_ids
+from courses.models import Content
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+INLINE_CONTENT_TYPES = frozenset(
+    ['image/png', 'image/jpeg', 'image/gif', 'image/webp'])
+
+
+def can_download(user, item):
+    # The owner or a student enrolled in a course using the item, from
+    # the enrolled course ids of the user (see courses/membership.py)
+    if not user.is_authenticated:
+        return False
+    if item.owner_id == user.pk:
+        return True
+    course_ids = get_enrolled_course_ids(user)
+    return bool(course_ids) and Content.objects.filter(
+        content_type=ContentType.objects.get_for_model(item),
+        object_id=item.pk,
+        module__course_id__in=course_ids).exists()
+
+
+def item_etag(item, file, size):
+    # Changes with the file and with the item
+    value = '{}:{}:{}'.format(file.name, size, item.updated.timestamp())
+    return quote_etag(hashlib.md5(value.encode()).hexdigest())
+
+
+def parse_range(header, size):
+    """
+    Return the (start, end) bytes, end included, of a single range header
+    or None to send the whole file. Raise ValueError if the range
+    can't be satisfied. Several ranges aren't supported, the whole file
+    is sent instead as allowed by RFC 7233.
+    """
+    match = RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # The last bytes
+        length = int(end)
+        if not length or not size:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def read_chunks(file, start, length, chunk_size):
+    # Yield the bytes of the range by chunks and close the file
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def serve_item(request, item, attachment=True, file=None):
+    """
+    Return the response serving the file of the item, or the given
+    file of the item (a variant of an image).
+    The caller checks the access with can_download().
+    """
+    file = file or item.file
+    size = file.size
+    etag = item_etag(item, file, size)
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        # 304 Not Modified or 412 Precondition Failed
+        return response
+
+    content_type = mimetypes.guess_type(file.name)[0] or \
+        'application/octet-stream'
+    if not attachment and content_type not in INLINE_CONTENT_TYPES:
+        attachment = True
+        content_type = 'application/octet-stream'
+    backend = settings.DOWNLOAD_BACKEND
+    if backend == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.DOWNLOAD_ACCEL_PREFIX + \
+            file.name
+    elif backend == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = file.path
+    else:
+        response = stream_file(request, file, size, etag, content_type)
+
+    response['ETag'] = etag
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = '{}; filename="{}"'.format(
+        'attachment' if attachment else 'inline',
+        file.name.rsplit('/', 1)[-1].replace('"', ''))
+    # Don't let shared caches keep a file checked for a user
+    patch_cache_control(response, private=True)
+    return response
+
+
+def stream_file(request, file, size, etag, content_type):
+    byte_range = None
+    header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    # A Range with an outdated If-Range gets the whole file
+    if header and (not if_range or if_range == etag):
+        try:
+            byte_range = parse_range(header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */{}'.format(size)
+            return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+    response = StreamingHttpResponse(
+        read_chunks(file.open('rb'), start, length,
+                    settings.DOWNLOAD_CHUNK_SIZE),
+        status=206 if byte_range else 200,
+        content_type=content_type)
+    response['Content-Length'] = str(length)
+    if byte_range:
+        response['Content-Range'] = 'bytes {}-{}/{}'.format(start, end, size)
+    return response
@@ -2,34 +2,149 @@
 We need a field that allows us to define an order for objects
 """
 
-from django.db import models
-from django.core.exceptions import ObjectDoesNotExist
+from django.db import models, transaction, router, connections
+from django.db.models import F, Max, Q
 
 
 class OrderField(models.PositiveIntegerField):
+    """
+    Give the next order of its group (the objects with the same values for
+    the fields in "for_fields") to the objects saved without one.
+
+    The row the group belongs to (e.g. the course of a module) is locked
+    with SELECT ... FOR UPDATE (the database with a no-op UPDATE on
+    SQLite) while the order is allocated, so concurrent inserts in a group
+    wait for each other instead of getting the same order. The lock lasts
+    until the end of the transaction: the models save themselves in one
+    with OrderedModelMixin.
+    """
     def __init__(self, for_fields=None, *args, **kwargs):
         self.for_fields = for_fields
         super(OrderField, self).__init__(*args, **kwargs)
 
+    def group_fields(self):
+        return [
+            self.model._meta.get_field(field).attname
+            for field in self.for_fields or []
+        ]
+
+    def get_group(self, model_instance):
+        return tuple(
+            getattr(model_instance, attname)
+            for attname in self.group_fields())
+
+    def lock_groups(self, groups, using):
+        # Lock the rows pointed by the first field of "for_fields".
+        # Needs a transaction. The databases without row locks (SQLite)
+        # lock the whole database on the first write of the transaction:
+        # a no-op update takes the lock before reading the last orders,
+        # a concurrent transaction which read them first would fail to
+        # write with "database is locked".
+        connection = connections[using]
+        if not self.for_fields or not connection.in_atomic_block:
+            return
+        field = self.model._meta.get_field(self.for_fields[0])
+        if not field.is_relation:
+            return
+        model = field.related_model
+        ids = sorted({group[0] for group in groups})
+        qs = model._base_manager.using(using).filter(pk__in=ids)
+        if connection.features.has_select_for_update:
+            list(qs.order_by('pk').select_for_update().values_list(
+                'pk', flat=True))
+        else:
+            pk = model._meta.pk.name
+            qs.update(**{pk: F(pk)})
+
+    def next_values(self, groups, using):
+        # Return the next order of each group, with a single query
+        attnames = self.group_fields()
+        self.lock_groups(groups, using)
+        qs = self.model._base_manager.using(using)
+        values = dict.fromkeys(groups, 0)
+        if not attnames:
+            # one group for the whole table
+            last = qs.aggregate(last=Max(self.attname))['last']
+            if last is not None:
+                values[()] = last + 1
+            return values
+        condition = Q()
+        for group in groups:
+            condition |= Q(**dict(zip(attnames, group)))
+        qs = qs.filter(condition).values(*attnames).order_by().annotate(
+            last=Max(self.attname))
+        for row in qs:
+            group = tuple(row[attname] for attname in attnames)
+            if row['last'] is not None:
+                values[group] = row['last'] + 1
+        return values
+
+    def allocate(self, objs, using=None):
+        """
+        Give consecutive orders to the objects without one, following the
+        last order of their group. Allocate all the orders with one query
+        whatever the number of objects and groups.
+        """
+        objs = [obj for obj in objs if getattr(obj, self.attname) is None]
+        if not objs:
+            return
+        using = using or router.db_for_write(self.model)
+        values = self.next_values({self.get_group(obj)
+                                   for obj in objs}, using)
+        for obj in objs:
+            group = self.get_group(obj)
+            setattr(obj, self.attname, values[group])
+            values[group] += 1
+
     def pre_save(self, model_instance, add):
         if getattr(model_instance, self.attname) is None:
             # no current value
-            try:
-                qs = self.model.objects.all()
-                if self.for_fields:
-                    # filter by objects with the same field values
-                    # for the fields in "for_fields"
-                    query = {
-                        field: getattr(model_instance, field)
-                        for field in self.for_fields
-                    }
-                    qs = qs.filter(**query)
-                    # get the order of the last item
-                    last_item = qs.latest(self.attname)
-                    value = last_item.order + 1
-            except ObjectDoesNotExist:
-                value = 0
-            setattr(model_instance, self.attname, value)
-            return value
-        else:
-            return super(OrderField, self).pre_save(model_instance, add)
+            self.allocate([model_instance], using=model_instance._state.db)
+        return super(OrderField, self).pre_save(model_instance, add)
+
+
+def get_order_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, OrderField)
+    ]
+
+
+class OrderedModelMixin(object):
+    # Save in a transaction so that the lock taken by the OrderField
+    # lasts until the row is inserted
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super(OrderedModelMixin, self).save(*args, **kwargs)
+
+
+class CounterFieldsMixin(object):
+    """
+    For the models with counter fields, kept up to date by UPDATE queries
+    (see courses/counters.py). Saving a loaded instance doesn't write its
+    counters, their values may be stale by then.
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        super(CounterFieldsMixin, self).save(*args, **kwargs)
+
+
+class OrderedQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # Allocate a block of consecutive orders by group with a
+        # single query instead of one query by object
+        objs = list(objs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            for field in get_order_fields(self.model):
+                field.allocate(objs, using=self.db)
+            return super(OrderedQuerySet,
+                         self).bulk_create(objs, *args, **kwargs)
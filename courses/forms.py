@@ -1,4 +1,4 @@
-# from django import forms
+from django import forms
 from django.forms.models import inlineformset_factory
 
 from courses.models import Course, Module
@@ -12,3 +12,11 @@ ModuleFormSet = inlineformset_factory(Course,
                                       fields=['title', 'description'],
                                       extra=2,
                                       can_delete=True)
+
+
+# The title and slug of the copy of a course (see courses/clone.py),
+# the slug must be unused
+class CourseCloneForm(forms.ModelForm):
+    class Meta:
+        model = Course
+        fields = ['title', 'slug']
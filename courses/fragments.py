@@ -0,0 +1,99 @@
+"""
+Cache of the rendered content items (see ItemBase.render()).
+
+The fragments are keyed on the model name, the primary key and the
+``updated`` timestamp of the item, so an edited item never renders from
+a stale entry. They are kept in a bounded LRU cache in each process and,
+when FRAGMENT_CACHE_ALIAS names one of the CACHES, in that shared cache
+too so that the processes don't all render the same items.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class LRUCache(object):
+    # Thread-safe dict evicting the least recently used entries
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+fragments = LRUCache(settings.FRAGMENT_CACHE_SIZE)
+
+
+def _shared_cache():
+    alias = settings.FRAGMENT_CACHE_ALIAS
+    return caches[alias] if alias else None
+
+
+def _shared_key(item, stamp):
+    return 'courses:fragment:{}:{}:{}'.format(item._meta.model_name,
+                                              item.pk, stamp)
+
+
+def _stamp(item):
+    return item.updated.timestamp()
+
+
+def render_fragment(item, render):
+    """
+    Return the cached fragment of the item, calling render()
+    to build it on a miss.
+    """
+    if item.pk is None or item.updated is None:
+        return render()
+    key = (item._meta.model_name, item.pk)
+    stamp = _stamp(item)
+    cached = fragments.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    shared = _shared_cache()
+    html = shared.get(_shared_key(item, stamp)) if shared else None
+    if html is None:
+        html = render()
+        if shared:
+            shared.set(_shared_key(item, stamp), html,
+                       settings.FRAGMENT_CACHE_TIMEOUT)
+    fragments.set(key, (stamp, html))
+    return html
+
+
+def invalidate_fragment(item):
+    # Drop the fragment of the item as it is currently saved
+    if item.pk is None or item.updated is None:
+        return
+    fragments.delete((item._meta.model_name, item.pk))
+    shared = _shared_cache()
+    if shared:
+        shared.delete(_shared_key(item, _stamp(item)))
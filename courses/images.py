@@ -0,0 +1,138 @@
+"""
+Derivatives of the Image items: a thumbnail and resized WebP and JPEG
+variants for responsive markup (see courses/content/image.html).
+
+The resizing runs outside of the request: post_save queues a job
+(see courses/tasks.py) which runs it in a pool of processes, outside of
+the GIL, and stores the result on the image (width, height and
+variants). make_variants() works on the files of the default
+FileSystemStorage, the pool processes don't touch the database.
+
+The variants field holds the name of the source file they were made
+from, so they are only made again when a new file is uploaded. Their
+names keep the whole name of the source, extension included: the storage
+gives each upload a free name, two sources never share their variants.
+
+    {'source': 'images/photo.png',
+     'widths': [320, 640],
+     'files': {'thumbnail': 'images/variants/photo.png-thumbnail.jpeg',
+               'jpeg-320': 'images/variants/photo.png-320.jpeg',
+               'webp-320': 'images/variants/photo.png-320.webp', ...}}
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = 'variants'
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_PROCESS_WORKERS)
+    return _executor
+
+
+def variant_name(name, suffix, extension):
+    # images/photo.png -> images/variants/photo.png-320.webp, not
+    # photo-320.webp which would also be the variant of images/photo.jpeg
+    directory, filename = os.path.split(name)
+    return os.path.join(directory, VARIANTS_DIR,
+                        '{}-{}.{}'.format(filename, suffix, extension))
+
+
+def make_variants(root, name, widths, formats, thumbnail_size, quality):
+    """
+    Make the variants of the image file name under root.
+    Return (width, height, variants). Runs in a worker process.
+    """
+    # Imported here, only the worker processes need Pillow
+    from PIL import Image as PILImage, ImageOps
+
+    with PILImage.open(os.path.join(root, name)) as original:
+        image = ImageOps.exif_transpose(original)
+        # WebP and JPEG variants without transparency
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        width, height = image.size
+        # Never upscale, the original width is the largest variant
+        widths = sorted({min(w, width) for w in widths})
+        files = {}
+        os.makedirs(os.path.join(root, os.path.dirname(name), VARIANTS_DIR),
+                    exist_ok=True)
+
+        def save(variant, suffix, extension, pil_format):
+            path = variant_name(name, suffix, extension)
+            variant.save(os.path.join(root, path), pil_format,
+                         quality=quality)
+            return path
+
+        thumbnail = image.copy()
+        thumbnail.thumbnail(thumbnail_size, PILImage.LANCZOS)
+        files['thumbnail'] = save(thumbnail, 'thumbnail', 'jpeg', 'JPEG')
+        for w in widths:
+            resized = image if w == width else image.resize(
+                (w, max(1, round(height * w / width))), PILImage.LANCZOS)
+            for extension in formats:
+                files['{}-{}'.format(extension, w)] = save(
+                    resized, w, extension, extension.upper())
+    return width, height, {'source': name, 'widths': widths, 'files': files}
+
+
+def variant_arguments(image):
+    return (str(settings.MEDIA_ROOT), image.file.name,
+            settings.IMAGE_VARIANT_WIDTHS, settings.IMAGE_VARIANT_FORMATS,
+            settings.IMAGE_THUMBNAIL_SIZE, settings.IMAGE_VARIANT_QUALITY)
+
+
+def needs_variants(image):
+    return bool(image.file) and \
+        image.variants.get('source') != image.file.name
+
+
+def save_variants(image_id, source, width, height, variants):
+    # update() doesn't send post_save; the new updated timestamp
+    # changes the key of the cached rendering of the image
+    from courses.models import Image
+    from courses.cache import touch_item_courses
+    if Image.objects.filter(id=image_id, file=source).update(
+            width=width, height=height, variants=variants,
+            updated=timezone.now()):
+        # The pages showing it
+        touch_item_courses(Image, [image_id])
+
+
+def store_result(image_id, source, get_result):
+    try:
+        width, height, variants = get_result()
+    except Exception as e:
+        # Not an image Pillow can read, don't try again for this file
+        logger.warning('No variants for %s: %s', source, e)
+        width, height = None, None
+        variants = {'source': source, 'error': str(e)}
+    save_variants(image_id, source, width, height, variants)
+
+
+def generate_variants(image):
+    # Make the variants of the image in this process
+    arguments = variant_arguments(image)
+    store_result(image.id, image.file.name,
+                 lambda: make_variants(*arguments))
+
+
+def process_variants(image):
+    # Make the variants of the image in the process pool,
+    # called by the make_image_variants job (see courses/tasks.py)
+    arguments = variant_arguments(image)
+    store_result(
+        image.id, image.file.name,
+        lambda: get_executor().submit(make_variants, *arguments).result())
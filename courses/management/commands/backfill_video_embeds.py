@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from courses.cache import touch_item_courses
+from courses.models import Video
+from courses.videos import EMBED_FIELDS, embed_fields
+
+
+class Command(BaseCommand):
+    help = ('Compute the embedding of the videos saved before it was '
+            'stored with them.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--all',
+                            action='store_true',
+                            help='Compute it again for every video')
+
+    def handle(self, *args, **options):
+        videos = Video.objects.order_by('id').only('id', 'url', 'updated',
+                                                   *EMBED_FIELDS)
+        if not options['all']:
+            videos = videos.filter(embed_html='')
+        count, last_id = 0, 0
+        while True:
+            # By ranges of ids, the videos still without embedding
+            # after their batch would be fetched again otherwise
+            batch = list(videos.filter(id__gt=last_id)
+                         [:options['batch_size']])
+            if not batch:
+                break
+            now = timezone.now()
+            for video in batch:
+                for name, value in embed_fields(video.url).items():
+                    setattr(video, name, value)
+                # Changes the key of their cached rendering
+                video.updated = now
+            Video.objects.bulk_update(batch, EMBED_FIELDS + ['updated'])
+            touch_item_courses(Video, [video.id for video in batch])
+            count += len(batch)
+            last_id = batch[-1].id
+        self.stdout.write(
+            self.style.SUCCESS('{} videos processed'.format(count)))
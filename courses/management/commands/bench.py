@@ -0,0 +1,187 @@
+import json
+import math
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import URLResolver, get_resolver, reverse
+
+from courses.budget import count_queries
+from courses.models import Content, File, Image, Text
+
+# Raise an exception on purpose
+SKIPPED = {'courses:sentry_debug'}
+
+# The item of the content URLs taking a model_name and an id
+ITEM_MODELS = {
+    'courses:item_download': File,
+    'courses:item_download_variant': Image,
+}
+
+
+def percentile(values, percent):
+    # Nearest rank on the sorted values
+    values = sorted(values)
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+
+def url_patterns(namespaces):
+    # (namespaced name, pattern) of the URLs of the applications
+    for resolver in get_resolver().url_patterns:
+        if isinstance(resolver, URLResolver) and \
+                resolver.namespace in namespaces:
+            for pattern in resolver.url_patterns:
+                yield '{}:{}'.format(resolver.namespace,
+                                     pattern.name), pattern
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True,
+                              text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ('Request every URL of the courses and students applications '
+            'with the test client and report their latency percentiles, '
+            'SQL queries and allocated memory as JSON. Run it on a '
+            'database filled by the seed command.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests',
+                            type=int,
+                            default=50,
+                            help='Measured requests per URL')
+        parser.add_argument('--output', help='Write the JSON to this file')
+        parser.add_argument('--compare',
+                            help='A previous JSON report to compare with')
+
+    def handle(self, *args, **options):
+        samples = self.get_samples()
+        results = {}
+        # Any host for the test client, whatever ALLOWED_HOSTS
+        with override_settings(ALLOWED_HOSTS=['*']):
+            for name, pattern in url_patterns(['courses', 'students']):
+                if name in SKIPPED:
+                    continue
+                results[name] = self.bench(name, pattern, samples,
+                                           options['requests'])
+        report = {
+            'commit': git_commit(),
+            'settings': settings.SETTINGS_MODULE,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'requests': options['requests'],
+            'urls': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        else:
+            self.stdout.write(output)
+        if options['compare']:
+            self.compare(options['compare'], report)
+
+    def get_samples(self):
+        # A course with contents, its owner and one of its students
+        content = Content.objects.filter(
+            module__course__students__isnull=False).select_related(
+                'module__course__owner', 'module__course__subject').order_by(
+                    '-id').first()
+        if content is None:
+            raise CommandError('No course with contents and students, '
+                               'run the seed command first.')
+        course = content.module.course
+        items = {}
+        for model in (Text, File, Image):
+            items[model] = model.objects.filter(
+                owner=course.owner).order_by('-id').first()
+        return {
+            'course': course,
+            'module': content.module,
+            'content': content,
+            'items': items,
+            'owner': course.owner,
+            'student': course.students.order_by('id').first(),
+        }
+
+    def url_kwargs(self, name, pattern, samples):
+        course, module = samples['course'], samples['module']
+        values = {
+            'pk': course.pk,
+            'slug': course.slug,
+            'subject': course.subject.slug,
+            'module_id': module.id,
+            'id': samples['content'].id,
+            'variant': 'thumbnail',
+        }
+        keys = pattern.pattern.converters
+        if 'model_name' in keys:
+            item = samples['items'][ITEM_MODELS.get(name, Text)]
+            if item is None:
+                return None
+            values.update(model_name=item._meta.model_name, id=item.id)
+        if any(key not in values for key in keys):
+            return None
+        return {key: values[key] for key in keys}
+
+    def bench(self, name, pattern, samples, requests):
+        kwargs = self.url_kwargs(name, pattern, samples)
+        if kwargs is None:
+            return {'error': 'No sample for the URL arguments'}
+        url = reverse(name, kwargs=kwargs)
+        # Not an internal IP, the debug toolbar stays hidden.
+        # The views failing on a GET are reported with their 500.
+        client = Client(raise_request_exception=False,
+                        REMOTE_ADDR='192.0.2.1')
+        user = samples['student'] if name.startswith('students:') \
+            else samples['owner']
+        client.force_login(user)
+        # Warm the caches
+        response = client.get(url)
+        timings = []
+        with count_queries() as counter:
+            for i in range(requests):
+                start = time.perf_counter()
+                client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+        tracemalloc.start()
+        client.get(url)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            'url': url,
+            'status': response.status_code,
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+            'queries': counter.count / requests,
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+    def compare(self, path, report):
+        with open(path) as f:
+            previous = json.load(f)
+        self.stderr.write('{:<40} {:>10} {:>10} {:>8} {:>9}'.format(
+            'URL (vs {})'.format(previous.get('commit')), 'p50 ms',
+            'before', 'change', 'queries'))
+        for name, result in report['urls'].items():
+            before = previous['urls'].get(name, {})
+            if 'p50_ms' not in result or 'p50_ms' not in before:
+                continue
+            change = (result['p50_ms'] / before['p50_ms'] - 1) * 100 \
+                if before['p50_ms'] else 0
+            self.stderr.write(
+                '{:<40} {:>10.3f} {:>10.3f} {:>+7.1f}% {:>4g}/{:<4g}'.format(
+                    name, result['p50_ms'], before['p50_ms'], change,
+                    result['queries'], before['queries']))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from courses.models import Image
+from courses.images import needs_variants, generate_variants
+
+
+class Command(BaseCommand):
+    help = ('Make the thumbnail and the resized variants of the images '
+            'uploaded before they were made on upload.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all',
+                            action='store_true',
+                            help='Make them again for every image')
+
+    def handle(self, *args, **options):
+        count = 0
+        for image in Image.objects.exclude(file='').iterator():
+            if options['all'] or needs_variants(image):
+                generate_variants(image)
+                count += 1
+        self.stdout.write(
+            self.style.SUCCESS('{} images processed'.format(count)))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from courses.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Recreate the search documents of the courses, modules and texts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        # The search keeps the old documents until it is done
+        with transaction.atomic():
+            count = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS('{} documents indexed'.format(count)))
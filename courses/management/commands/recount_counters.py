@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from courses.counters import COUNTERS, recount
+
+
+class Command(BaseCommand):
+    help = ('Recompute the stored counters of the subjects and courses '
+            'from their related rows.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            for model in COUNTERS:
+                count = recount(model)
+                self.stdout.write('{}: {} recounted'.format(
+                    model._meta.verbose_name_plural, count))
+        self.stdout.write(self.style.SUCCESS('Counters recounted'))
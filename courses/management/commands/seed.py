@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+from courses.seed import seed, PASSWORD
+
+
+class Command(BaseCommand):
+    help = ('Generate synthetic subjects, instructors, courses, modules, '
+            'contents and enrolled students with bulk inserts.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subjects', type=int, default=10)
+        parser.add_argument('--instructors', type=int, default=20)
+        parser.add_argument('--courses', type=int, default=200)
+        parser.add_argument('--modules',
+                            type=int,
+                            default=5,
+                            help='Modules per course')
+        parser.add_argument('--contents',
+                            type=int,
+                            default=4,
+                            help='Contents per module')
+        parser.add_argument('--students', type=int, default=500)
+        parser.add_argument('--enrollments',
+                            type=int,
+                            default=3,
+                            help='Courses per student')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed',
+                            type=int,
+                            help='Seed of the random generator')
+        parser.add_argument('--no-index',
+                            action='store_true',
+                            help="Don't rebuild the search index")
+
+    def handle(self, *args, **options):
+        counts = seed(subjects=max(options['subjects'], 1),
+                      instructors=max(options['instructors'], 1),
+                      courses=options['courses'],
+                      modules=options['modules'],
+                      contents=options['contents'],
+                      students=options['students'],
+                      enrollments=options['enrollments'],
+                      batch_size=options['batch_size'],
+                      seed=options['seed'],
+                      index=not options['no_index'])
+        for name, count in counts.items():
+            self.stdout.write('{}: {}'.format(name, count))
+        self.stdout.write(
+            self.style.SUCCESS(
+                'Seeded, the users have the password "{}"'.format(PASSWORD)))
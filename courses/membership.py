@@ -0,0 +1,132 @@
+"""
+Groups and permissions of the users, resolved once per request.
+
+get_user_access() loads the group names and the permissions of a user
+with two queries, keeps them on the user object for the rest of the
+request and in the cache for ACCESS_CACHE_TIMEOUT seconds.
+The has_group template filter and PermissionRequiredMixin both read it.
+The cache is invalidated by the signals in courses/signals.py when the
+groups or permissions of a user or a group change.
+
+get_enrolled_course_ids() does the same for the ids of the courses a
+student is enrolled in, with one query on the enrollments alone: the
+course lists and the player check the enrollment without joining them.
+They are only cached for ENROLLMENT_CACHE_TIMEOUT seconds with a cache
+shared by the processes (see production.py), the access to the courses
+depends on them. The signals invalidate them when the students of a
+course change and when a course or a user is deleted.
+"""
+
+from collections import namedtuple
+
+from django.conf import settings
+from django.contrib.auth import mixins
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db.models import Q
+
+from courses.cache import get_version, bump_version
+from courses.models import Course
+
+ACCESS = 'access'
+
+UserAccess = namedtuple('UserAccess', ['groups', 'perms'])
+
+NO_ACCESS = UserAccess(frozenset(), frozenset())
+
+
+def access_key(user_id):
+    # The version changes when a group or its permissions change
+    return 'courses:access:{}:{}'.format(get_version(ACCESS), user_id)
+
+
+def load_user_access(user):
+    groups = frozenset(user.groups.values_list('name', flat=True))
+    perms = Permission.objects.filter(Q(user=user) | Q(
+        group__user=user)).values_list('content_type__app_label',
+                                       'codename').distinct()
+    return UserAccess(
+        groups,
+        frozenset('{}.{}'.format(app_label, codename)
+                  for app_label, codename in perms))
+
+
+def get_user_access(user):
+    if not user.is_authenticated:
+        return NO_ACCESS
+    try:
+        return user._access
+    except AttributeError:
+        pass
+    key = access_key(user.pk)
+    access = cache.get(key)
+    if access is None:
+        access = load_user_access(user)
+        cache.set(key, access, settings.ACCESS_CACHE_TIMEOUT)
+    user._access = access
+    return access
+
+
+def invalidate_user_access(*user_ids):
+    cache.delete_many([access_key(user_id) for user_id in user_ids])
+
+
+def invalidate_all_access():
+    bump_version(ACCESS)
+
+
+def enrollments_key(user_id):
+    return 'courses:enrolled:{}'.format(user_id)
+
+
+def get_enrolled_course_ids(user):
+    if not user.is_authenticated:
+        return frozenset()
+    try:
+        return user._enrolled_course_ids
+    except AttributeError:
+        pass
+    timeout = settings.ENROLLMENT_CACHE_TIMEOUT
+    key = enrollments_key(user.pk)
+    course_ids = cache.get(key) if timeout else None
+    if course_ids is None:
+        course_ids = frozenset(
+            Course.students.through.objects.filter(
+                user_id=user.pk).values_list('course_id', flat=True))
+        if timeout:
+            cache.set(key, course_ids, timeout)
+    user._enrolled_course_ids = course_ids
+    return course_ids
+
+
+def is_enrolled(user, course_id):
+    # course_id may come from the URL
+    try:
+        course_id = int(course_id)
+    except (TypeError, ValueError):
+        return False
+    return course_id in get_enrolled_course_ids(user)
+
+
+def invalidate_enrollments(*user_ids):
+    cache.delete_many([enrollments_key(user_id) for user_id in user_ids])
+
+
+def user_in_group(user, group_name):
+    return group_name in get_user_access(user).groups
+
+
+def user_has_perms(user, perms):
+    # Same rules as ModelBackend.has_perm()
+    if not user.is_active:
+        return False
+    if user.is_superuser:
+        return True
+    return set(perms) <= get_user_access(user).perms
+
+
+class PermissionRequiredMixin(mixins.PermissionRequiredMixin):
+    # Check the permissions from get_user_access()
+    def has_permission(self):
+        return user_has_perms(self.request.user,
+                              self.get_permission_required())
@@ -0,0 +1,28 @@
+# Generated by Django 3.1.5 on 2026-10-18 19:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_course_students'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='height',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='variants',
+            field=models.JSONField(default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='width',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+    ]
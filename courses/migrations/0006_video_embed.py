@@ -0,0 +1,33 @@
+# Generated by Django 3.1.5 on 2026-10-18 19:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='embed_backend',
+            field=models.CharField(blank=True, editable=False, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='embed_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='embed_id',
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='embed_url',
+            field=models.URLField(blank=True, editable=False),
+        ),
+    ]
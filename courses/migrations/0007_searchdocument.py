@@ -0,0 +1,35 @@
+# Generated by Django 3.1.5 on 2026-10-18 19:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from courses.search import create_index, drop_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('courses', '0006_video_embed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('title', models.CharField(max_length=250)),
+                ('body', models.TextField(blank=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='courses.course')),
+                ('module', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='courses.module')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='searchdocument',
+            constraint=models.UniqueConstraint(fields=('content_type', 'object_id'), name='courses_searchdocument_object'),
+        ),
+        # Full text index depending on the database (see courses/search.py)
+        migrations.RunPython(create_index, drop_index),
+    ]
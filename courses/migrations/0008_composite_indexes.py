@@ -0,0 +1,37 @@
+# Generated by Django 3.1.5 on 2026-10-18 19:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_searchdocument'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(fields=['module', 'order'], name='courses_content_module_order'),
+        ),
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(fields=['content_type', 'object_id'], name='courses_content_item'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['-created', '-id'], name='courses_course_created'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['subject', '-created', '-id'], name='courses_course_subject_created'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['owner', '-created', '-id'], name='courses_course_owner_created'),
+        ),
+        migrations.AddIndex(
+            model_name='module',
+            index=models.Index(fields=['course', 'order'], name='courses_module_course_order'),
+        ),
+    ]
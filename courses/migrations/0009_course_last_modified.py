@@ -0,0 +1,18 @@
+# Generated by Django 3.1.5 on 2026-10-18 19:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='last_modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 3.1.5 on 2026-10-18 19:38
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count(model, lookup):
+    total = model.objects.filter(**{lookup: OuterRef('pk')}).order_by(
+        ).values(lookup).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(total), 0)
+
+
+def count_existing(apps, schema_editor):
+    # See courses/counters.py
+    Subject = apps.get_model('courses', 'Subject')
+    Course = apps.get_model('courses', 'Course')
+    Module = apps.get_model('courses', 'Module')
+    Content = apps.get_model('courses', 'Content')
+    Subject.objects.update(course_count=count(Course, 'subject'))
+    Course.objects.update(
+        module_count=count(Module, 'course'),
+        content_count=count(Content, 'module__course'),
+        student_count=count(Course.students.through, 'course'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_course_last_modified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='content_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='module_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='student_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='subject',
+            name='course_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='subject',
+            index=models.Index(fields=['title'], name='courses_subject_title'),
+        ),
+        migrations.RunPython(count_existing, migrations.RunPython.noop),
+    ]
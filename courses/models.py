@@ -5,7 +5,11 @@ module will contain a configurable number of contents. There will be contents
 of various types: text, file, image, or video.
 """
 
+from collections import defaultdict
+
 from django.db import models
+from django.db.models.fields.files import FieldFile
+from django.urls import reverse
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
@@ -13,21 +17,32 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.template.loader import render_to_string
 # from django.utils.safestring import mark_safe
 
-from courses.fields import OrderField
+from courses.fields import (OrderField, OrderedModelMixin, OrderedQuerySet,
+                            CounterFieldsMixin)
+from courses.fragments import render_fragment
+from courses.videos import EMBED_FIELDS, embed_fields
 
 
-class Subject(models.Model):
+class Subject(CounterFieldsMixin, models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True)
+    # Maintained by courses/signals.py
+    course_count = models.PositiveIntegerField(default=0, editable=False)
+
+    counter_fields = ('course_count', )
 
     class Meta:
         ordering = ['title']
+        indexes = [
+            # The sidebar of the catalog, read without any aggregation
+            models.Index(fields=['title'], name='courses_subject_title'),
+        ]
 
     def __str__(self):
         return self.title
 
 
-class Course(models.Model):
+class Course(CounterFieldsMixin, models.Model):
     # Instructor of the course
     owner = models.ForeignKey(User,
                               related_name='courses_created',
@@ -45,15 +60,42 @@ class Course(models.Model):
     slug = models.SlugField(max_length=200, unique=True)
     overview = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
+    # Also set when its subject, modules, contents or their items
+    # change (see courses/signals.py)
+    last_modified = models.DateTimeField(auto_now=True)
+    # Maintained by courses/signals.py
+    module_count = models.PositiveIntegerField(default=0, editable=False)
+    content_count = models.PositiveIntegerField(default=0, editable=False)
+    student_count = models.PositiveIntegerField(default=0, editable=False)
+
+    counter_fields = ('module_count', 'content_count', 'student_count')
 
     class Meta:
         ordering = ['-created']
+        indexes = [
+            # The catalog, the courses of a subject and of an instructor,
+            # newest first (see courses/pagination.py)
+            models.Index(fields=['-created', '-id'],
+                         name='courses_course_created'),
+            models.Index(fields=['subject', '-created', '-id'],
+                         name='courses_course_subject_created'),
+            models.Index(fields=['owner', '-created', '-id'],
+                         name='courses_course_owner_created'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Remember the subject, the counters of both subjects
+        # change when it does
+        instance = super(Course, cls).from_db(db, field_names, values)
+        instance._loaded_subject_id = instance.__dict__.get('subject_id')
+        return instance
 
-class Module(models.Model):
+
+class Module(OrderedModelMixin, models.Model):
     # A course can have several modules
     course = models.ForeignKey(Course,
                                related_name='modules',
@@ -63,14 +105,66 @@ class Module(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
 
+    objects = OrderedQuerySet.as_manager()
+
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['course', 'order'],
+                         name='courses_module_course_order'),
+        ]
 
     def __str__(self):
         return '{}. {}'.format(self.order, self.title)
 
 
-class Content(models.Model):
+class ContentQuerySet(OrderedQuerySet):
+    def __init__(self, *args, **kwargs):
+        super(ContentQuerySet, self).__init__(*args, **kwargs)
+        self._with_items = False
+
+    def _clone(self):
+        clone = super(ContentQuerySet, self)._clone()
+        clone._with_items = self._with_items
+        return clone
+
+    def with_items(self):
+        # Load the items of the contents with one query by content type
+        # when the queryset is evaluated, instead of one query by content.
+        # Also works through prefetch_related(Prefetch('contents', ...)).
+        clone = self._chain()
+        clone._with_items = True
+        return clone
+
+    def _fetch_all(self):
+        fetched = self._result_cache is not None
+        super(ContentQuerySet, self)._fetch_all()
+        if self._with_items and not fetched and \
+                self._iterable_class is models.query.ModelIterable:
+            load_items(self._result_cache)
+
+
+def load_items(contents):
+    # Group the contents by content type and load all the items
+    # of each type with a single query
+    ids = defaultdict(set)
+    for content in contents:
+        ids[content.content_type_id].add(content.object_id)
+    items = {}
+    for content_type_id, object_ids in ids.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        for pk, item in model._base_manager.in_bulk(object_ids).items():
+            items[content_type_id, pk] = item
+    # Put the items in the cache of the generic foreign key
+    field = Content._meta.get_field('item')
+    for content in contents:
+        item = items.get((content.content_type_id, content.object_id))
+        if item is not None:
+            field.set_cached_value(content, item)
+    return contents
+
+
+class Content(OrderedModelMixin, models.Model):
     # Generic relation to associate any kind of content.
     module = models.ForeignKey(Module,
                                related_name='contents',
@@ -83,8 +177,17 @@ class Content(models.Model):
     item = GenericForeignKey('content_type', 'object_id')
     order = OrderField(blank=True, for_fields=['module'])
 
+    objects = ContentQuerySet.as_manager()
+
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['module', 'order'],
+                         name='courses_content_module_order'),
+            # The content of an item, through the generic relation
+            models.Index(fields=['content_type', 'object_id'],
+                         name='courses_content_item'),
+        ]
 
 
 class ItemBase(models.Model):
@@ -102,6 +205,11 @@ class ItemBase(models.Model):
         return self.title
 
     def render(self):
+        # The rendered item is cached until it is updated
+        # (see courses/fragments.py)
+        return render_fragment(self, self.render_template)
+
+    def render_template(self):
         # This method uses the render_to_string() function for rendering
         # a template and returning the rendered content as a string.
         # Each kind of content is rendered using a template named after
@@ -121,7 +229,105 @@ class File(ItemBase):
 
 class Image(ItemBase):
     file = models.FileField(upload_to='images')
+    # Set by the variants processing (see courses/images.py)
+    width = models.PositiveIntegerField(null=True, editable=False)
+    height = models.PositiveIntegerField(null=True, editable=False)
+    variants = models.JSONField(default=dict, editable=False)
+
+    def variant_file(self, key):
+        # The FieldFile of a variant, KeyError if there is none
+        name = self.variants.get('files', {})[key]
+        return FieldFile(self, self._meta.get_field('file'), name)
+
+    def variant_url(self, key):
+        return reverse('courses:item_download_variant',
+                       args=['image', self.id, key])
+
+    def srcset(self, extension):
+        files = self.variants.get('files', {})
+        keys = [(w, '{}-{}'.format(extension, w))
+                for w in self.variants.get('widths', [])]
+        return ', '.join('{} {}w'.format(self.variant_url(key), w)
+                         for w, key in keys if key in files)
+
+    @property
+    def jpeg_srcset(self):
+        return self.srcset('jpeg')
+
+    @property
+    def webp_srcset(self):
+        return self.srcset('webp')
+
+    @property
+    def thumbnail_url(self):
+        if 'thumbnail' in self.variants.get('files', {}):
+            return self.variant_url('thumbnail')
 
 
 class Video(ItemBase):
     url = models.URLField()
+    # Computed from the url when saved (see courses/videos.py)
+    embed_backend = models.CharField(max_length=50, blank=True, editable=False)
+    embed_id = models.CharField(max_length=200, blank=True, editable=False)
+    embed_url = models.URLField(blank=True, editable=False)
+    embed_html = models.TextField(blank=True, editable=False)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Remember the url, the embedding is only computed again
+        # when it changes
+        instance = super(Video, cls).from_db(db, field_names, values)
+        instance._loaded_url = instance.__dict__.get('url')
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            if 'url' in update_fields:
+                self.update_embed()
+                kwargs['update_fields'] = set(update_fields) | set(
+                    EMBED_FIELDS)
+        elif self.url != getattr(self, '_loaded_url', None):
+            self.update_embed()
+        super(Video, self).save(*args, **kwargs)
+        self._loaded_url = self.url
+
+    def update_embed(self):
+        for name, value in embed_fields(self.url).items():
+            setattr(self, name, value)
+
+
+class SearchDocument(models.Model):
+    """
+    The searchable text of a course, a module or a text content,
+    indexed by SQLite FTS5 or PostgreSQL full text search
+    (see courses/search.py).
+    On SQLite, triggers copy the rows to the FTS5 table: a migration
+    rebuilding this table (most AlterField) must create them again.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    # Deleted with the course or the module they belong to
+    course = models.ForeignKey(Course,
+                               related_name='search_documents',
+                               on_delete=models.CASCADE)
+    module = models.ForeignKey(Module,
+                               related_name='search_documents',
+                               null=True,
+                               on_delete=models.CASCADE)
+    title = models.CharField(max_length=250)
+    body = models.TextField(blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id'],
+                                    name='courses_searchdocument_object')
+        ]
+
+    def __str__(self):
+        return self.title
+
+    @property
+    def kind(self):
+        # course, module or text, the content types are cached
+        return ContentType.objects.get_for_id(self.content_type_id).model
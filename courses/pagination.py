@@ -0,0 +1,135 @@
+"""
+Keyset pagination of the course lists.
+
+A page is fetched with a WHERE on the (created, id) of the last course
+of the previous page instead of an OFFSET, so the page N costs the same
+as the first one, and no COUNT query is run. The lists are ordered from
+the newest course, id breaking the ties of created.
+
+The cursors are opaque to the clients: the direction and the key of the
+course the page starts after (or before), encoded in base64.
+"""
+
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from binascii import Error as DecodeError
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(direction, course):
+    value = '{}|{}|{}'.format(direction, course.created.isoformat(),
+                              course.id)
+    # Without the padding, safe in the URLs
+    return urlsafe_b64encode(value.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Return (direction, created, id) for a cursor,
+    raise InvalidCursor if it can't be decoded.
+    """
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        direction, created, id = urlsafe_b64decode(
+            (cursor + padding).encode()).decode().split('|')
+        created = parse_datetime(created)
+        id = int(id)
+    except (DecodeError, UnicodeError, ValueError):
+        raise InvalidCursor('Invalid cursor {!r}'.format(cursor))
+    if direction not in (NEXT, PREVIOUS) or created is None:
+        raise InvalidCursor('Invalid cursor {!r}'.format(cursor))
+    return direction, created, id
+
+
+class KeysetPage(object):
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<KeysetPage of {} courses>'.format(len(self))
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def paginate(queryset, cursor=None, per_page=None):
+    """
+    Return the KeysetPage of the courses of the queryset at the cursor,
+    the first page when it is None.
+    """
+    per_page = per_page or settings.COURSES_PER_PAGE
+    if not cursor:
+        courses = list(queryset.order_by('-created', '-id')[:per_page + 1])
+        return _page(courses[:per_page],
+                     has_next=len(courses) > per_page,
+                     has_previous=False)
+    direction, created, id = decode_cursor(cursor)
+    if direction == NEXT:
+        courses = list(
+            queryset.filter(
+                Q(created__lt=created) | Q(created=created, id__lt=id)
+            ).order_by('-created', '-id')[:per_page + 1])
+        return _page(courses[:per_page],
+                     has_next=len(courses) > per_page,
+                     has_previous=True)
+    # Fetched from the cursor upwards, then put back in the list order
+    courses = list(
+        queryset.filter(
+            Q(created__gt=created) | Q(created=created, id__gt=id)
+        ).order_by('created', 'id')[:per_page + 1])
+    return _page(courses[per_page - 1::-1],
+                 has_next=True,
+                 has_previous=len(courses) > per_page)
+
+
+def _page(courses, has_next, has_previous):
+    # One more course than the page size is fetched to know if there is
+    # a page after it in the fetching direction
+    page = KeysetPage(courses)
+    if courses and has_next:
+        page.next_cursor = encode_cursor(NEXT, courses[-1])
+    if courses and has_previous:
+        page.previous_cursor = encode_cursor(PREVIOUS, courses[0])
+    return page
+
+
+class KeysetPaginationMixin(object):
+    """
+    Keyset pagination for the ListViews of courses, the cursor is taken
+    from the "cursor" GET parameter. The context has the usual page_obj,
+    is_paginated and object_list, without a paginator.
+    """
+    def paginate_queryset(self, queryset, page_size):
+        try:
+            page = paginate(queryset, self.request.GET.get('cursor'),
+                            page_size)
+        except InvalidCursor as e:
+            raise Http404(str(e))
+        return (None, page, page.object_list, page.has_other_pages())
+
+    def get_paginate_by(self, queryset):
+        return settings.COURSES_PER_PAGE
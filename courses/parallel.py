@@ -0,0 +1,91 @@
+"""
+Concurrent data loads of the async views.
+
+The ORM is synchronous, its queries can't run on the event loop of an
+ASGI server. The async views (see courses/async_views.py) run them in a
+pool of ASYNC_VIEW_THREADS threads instead, the independent ones at the
+same time: the latency of a page is then the one of its slowest load
+rather than the sum of all of them. Each thread of the pool has its own
+database connection, the size of the pool bounds the connections opened
+by the async views.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_VIEW_THREADS,
+                thread_name_prefix='async-views')
+    return _executor
+
+
+def _call(func):
+    # As around a request: the connection of the thread is closed
+    # when broken or older than CONN_MAX_AGE
+    close_old_connections()
+    try:
+        return func()
+    finally:
+        close_old_connections()
+
+
+async def run(func, *args, **kwargs):
+    """
+    Call func(*args, **kwargs) in the pool and return its result
+    without blocking the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(), _call, functools.partial(func, *args, **kwargs))
+
+
+async def gather(*funcs):
+    """
+    Call the functions, without arguments, at the same time in the pool
+    and return their results in order. Raise the first exception raised.
+    """
+    return await asyncio.gather(*(run(func) for func in funcs))
+
+
+def load_user(request):
+    # The session and the user of the request are loaded lazily,
+    # on the first access
+    request.user.is_authenticated
+    return request.user
+
+
+class AsyncViewMixin(object):
+    """
+    Mixin for the class-based views with async handlers. Django runs a
+    view on the event loop when it is a coroutine function, which the
+    function returned by View.as_view() isn't.
+
+    The handlers must not touch the database themselves, nor the lazy
+    request.user: see run(), gather() and load_user().
+    """
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super(AsyncViewMixin, cls).as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            # Not a coroutine for the methods without handler
+            if asyncio.iscoroutine(response):
+                response = await response
+            return response
+
+        functools.update_wrapper(async_view, view)
+        return async_view
@@ -0,0 +1,74 @@
+"""
+Query plans of the SQL queries run by the views.
+
+QueryPlanTestMixin runs a request, then EXPLAINs each SELECT it ran and
+fails on the plans scanning a whole table or sorting in a temporary
+B-tree, the queries that get slower as the tables grow. Only the SQLite
+plans are checked: the PostgreSQL planner prefers sequential scans on
+the small tables of the tests whatever the indexes.
+"""
+
+import re
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# "SCAN courses_course" but not "SCAN courses_course USING INDEX ..."
+SQLITE_FULL_SCAN = re.compile(r'^SCAN (TABLE )?(?P<table>\w+)(?!.*USING)')
+SQLITE_TEMP_SORT = re.compile(r'USE TEMP B-TREE')
+
+
+def explain(sql, params=None):
+    # The plan of a query, one line per step
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def plan_problems(plan, allowed_scans=()):
+    """
+    Return the steps of a SQLite plan scanning a table (other than the
+    allowed ones) or sorting in a temporary B-tree.
+    """
+    # SCAN CONSTANT ROW is a SELECT without a table
+    allowed = set(allowed_scans) | {'CONSTANT'}
+    problems = []
+    for step in plan:
+        match = SQLITE_FULL_SCAN.match(step)
+        if match and match.group('table') not in allowed:
+            problems.append(step)
+        elif SQLITE_TEMP_SORT.search(step):
+            problems.append(step)
+    return problems
+
+
+class QueryPlanTestMixin(object):
+    """
+    TestCase mixin checking the query plans of the views.
+
+    allowed_scans lists the tables the view reads entirely by design,
+    like the subjects of the catalog sidebar. Only the queries on the
+    tables of plan_apps are checked, not the session, user and permission
+    queries of Django.
+    """
+    plan_apps = ['courses', 'students']
+
+    def assertIndexedQueries(self, url, allowed_scans=(), **extra):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Query plans are only checked on SQLite')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200)
+        errors = []
+        for query in context.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT') or not any(
+                    'FROM "{}_'.format(app) in sql for app in self.plan_apps):
+                continue
+            # The captured queries have their parameters interpolated
+            problems = plan_problems(explain(sql), allowed_scans)
+            if problems:
+                errors.append('{}\n  {}'.format(sql, '\n  '.join(problems)))
+        if errors:
+            self.fail('Unindexed queries for {}:\n{}'.format(
+                url, '\n'.join(errors)))
@@ -0,0 +1,252 @@
+"""
+Full text search of the courses, modules and text contents.
+
+Each of them has a SearchDocument row holding its title and body.
+The index depends on the database:
+
+- SQLite: an FTS5 table (porter stemming) kept in sync with the
+  documents by triggers, ranked with bm25();
+- PostgreSQL: a GIN index on the weighted tsvector of the documents,
+  ranked with ts_rank();
+- others: a scan with icontains, unranked.
+
+The index is created by the 0007 migration with create_index().
+The documents are updated by the index_object job queued from the
+signals (see courses/signals.py and courses/tasks.py), rebuild_index()
+recreates them all.
+
+The models are imported in the functions, the migrations import
+this module.
+"""
+
+import re
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.db.models import Q
+
+FTS_TABLE = 'courses_searchdocument_fts'
+
+SQLITE_INDEX = [
+    "CREATE VIRTUAL TABLE {fts} USING fts5(title, body, "
+    "content='courses_searchdocument', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER {fts}_insert AFTER INSERT ON courses_searchdocument "
+    "BEGIN INSERT INTO {fts}(rowid, title, body) "
+    "VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER {fts}_delete AFTER DELETE ON courses_searchdocument "
+    "BEGIN INSERT INTO {fts}({fts}, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER {fts}_update AFTER UPDATE ON courses_searchdocument "
+    "BEGIN INSERT INTO {fts}({fts}, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO {fts}(rowid, title, body) "
+    "VALUES (new.id, new.title, new.body); END",
+    # The documents indexed before the table existed
+    "INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+]
+
+SQLITE_DROP_INDEX = [
+    'DROP TRIGGER IF EXISTS {fts}_insert',
+    'DROP TRIGGER IF EXISTS {fts}_delete',
+    'DROP TRIGGER IF EXISTS {fts}_update',
+    'DROP TABLE IF EXISTS {fts}',
+]
+
+# The same expression in the index and in the queries
+PG_VECTOR = ("(setweight(to_tsvector('english', title), 'A') || "
+             "setweight(to_tsvector('english', body), 'B'))")
+
+PG_INDEX = [
+    'CREATE INDEX courses_searchdocument_vector '
+    'ON courses_searchdocument USING GIN ({})'.format(PG_VECTOR)
+]
+
+PG_DROP_INDEX = ['DROP INDEX IF EXISTS courses_searchdocument_vector']
+
+
+def _execute(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement.format(fts=FTS_TABLE))
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _execute(schema_editor, SQLITE_INDEX)
+    elif vendor == 'postgresql':
+        _execute(schema_editor, PG_INDEX)
+
+
+def drop_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _execute(schema_editor, SQLITE_DROP_INDEX)
+    elif vendor == 'postgresql':
+        _execute(schema_editor, PG_DROP_INDEX)
+
+
+def get_terms(query):
+    # Only the words, the syntax of the full text queries isn't exposed
+    return re.findall(r'\w+', query.lower())[:settings.SEARCH_MAX_TERMS]
+
+
+def _ranked_ids(terms, limit):
+    # [(document id, rank)], best first
+    if connection.vendor == 'sqlite':
+        # All the terms, the last one as a prefix
+        match = ' '.join('"{}"'.format(term) for term in terms) + '*'
+        sql = ('SELECT rowid, bm25({fts}, 10.0, 1.0) AS rank FROM {fts} '
+               'WHERE {fts} MATCH %s ORDER BY rank LIMIT %s').format(
+                   fts=FTS_TABLE)
+        params = [match, limit]
+    elif connection.vendor == 'postgresql':
+        sql = ('SELECT id, ts_rank({vector}, query) AS rank '
+               'FROM courses_searchdocument, '
+               "to_tsquery('english', %s) query "
+               'WHERE {vector} @@ query ORDER BY rank DESC LIMIT %s').format(
+                   vector=PG_VECTOR)
+        params = [' & '.join(terms) + ':*', limit]
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def search(query, limit=None):
+    """
+    Return the SearchDocuments matching all the words of the query,
+    the best ranked first, with their course.
+    """
+    from courses.models import SearchDocument
+
+    terms = get_terms(query)
+    if not terms:
+        return []
+    limit = limit or settings.SEARCH_RESULTS
+    documents = SearchDocument.objects.select_related('course')
+    ranked = _ranked_ids(terms, limit)
+    if ranked is None:
+        # No full text index on this database
+        for term in terms:
+            documents = documents.filter(
+                Q(title__icontains=term) | Q(body__icontains=term))
+        return list(documents.order_by('id')[:limit])
+    found = documents.in_bulk([id for id, rank in ranked])
+    return [found[id] for id, rank in ranked if id in found]
+
+
+def document_fields(obj):
+    """
+    Return the fields of the SearchDocument of a Course, Module or Text,
+    or None if it has none (a text not used by a module).
+    """
+    from courses.models import Course, Module, Text, Content
+
+    if isinstance(obj, Course):
+        return {'course_id': obj.id, 'module_id': None,
+                'title': obj.title, 'body': obj.overview}
+    if isinstance(obj, Module):
+        return {'course_id': obj.course_id, 'module_id': obj.id,
+                'title': obj.title, 'body': obj.description}
+    if isinstance(obj, Text):
+        content = Content.objects.filter(
+            content_type=ContentType.objects.get_for_model(Text),
+            object_id=obj.id).select_related('module').first()
+        if content is None:
+            return None
+        return {'course_id': content.module.course_id,
+                'module_id': content.module_id,
+                'title': obj.title, 'body': obj.content}
+    raise TypeError('{!r} is not searchable'.format(obj))
+
+
+def index_object(obj):
+    # Create, update or delete the document of the object
+    from courses.models import SearchDocument
+
+    key = {'content_type': ContentType.objects.get_for_model(obj),
+           'object_id': obj.id}
+    fields = document_fields(obj)
+    if fields is None:
+        unindex_object(obj)
+    else:
+        SearchDocument.objects.update_or_create(defaults=fields, **key)
+
+
+def unindex_object(obj):
+    from courses.models import SearchDocument
+
+    SearchDocument.objects.filter(
+        content_type=ContentType.objects.get_for_model(obj),
+        object_id=obj.id).delete()
+
+
+def rebuild_index(batch_size=1000):
+    """
+    Recreate all the documents. Return their number.
+    """
+    from courses.models import Course, Module, Content, SearchDocument
+
+    SearchDocument.objects.all().delete()
+    count = 0
+    for model in (Course, Module):
+        content_type = ContentType.objects.get_for_model(model)
+        objects = model.objects.order_by('id').iterator(batch_size)
+        count += _bulk_index(content_type, objects, batch_size)
+    return count + _index_texts(Content.objects.all(), batch_size)
+
+
+def index_course_contents(course_id, batch_size=1000):
+    """
+    Create the documents of the modules of a course and of the texts of
+    their contents, inserted without the signals (see courses/clone.py).
+    Return their number.
+    """
+    from courses.models import Module, Content
+
+    modules = Module.objects.filter(course_id=course_id).order_by(
+        'id').iterator(batch_size)
+    count = _bulk_index(ContentType.objects.get_for_model(Module), modules,
+                        batch_size)
+    return count + _index_texts(
+        Content.objects.filter(module__course_id=course_id), batch_size)
+
+
+def _index_texts(contents, batch_size):
+    # The texts used by the contents, with their course and module
+    from courses.models import Text
+
+    content_type = ContentType.objects.get_for_model(Text)
+    contents = contents.filter(content_type=content_type)
+    used = {
+        object_id: (course_id, module_id)
+        for object_id, course_id, module_id in contents.values_list(
+            'object_id', 'module__course_id', 'module_id')
+    }
+    texts = Text.objects.filter(id__in=contents.values(
+        'object_id')).order_by('id').iterator(batch_size)
+    return _bulk_index(content_type, texts, batch_size, used)
+
+
+def _bulk_index(content_type, objects, batch_size, used=None):
+    from courses.models import SearchDocument
+
+    batch, count = [], 0
+    for obj in objects:
+        if used is None:
+            fields = document_fields(obj)
+        else:
+            course_id, module_id = used[obj.id]
+            fields = {'course_id': course_id, 'module_id': module_id,
+                      'title': obj.title, 'body': obj.content}
+        batch.append(SearchDocument(content_type=content_type,
+                                    object_id=obj.id, **fields))
+        if len(batch) == batch_size:
+            SearchDocument.objects.bulk_create(batch)
+            count += len(batch)
+            batch = []
+    SearchDocument.objects.bulk_create(batch)
+    return count + len(batch)
@@ -0,0 +1,221 @@
+"""
+Synthetic data at the scale of production, for the benchmarks.
+
+seed() creates subjects, instructors, courses with their modules and
+a mix of Text, File, Image and Video contents, and students enrolled
+in some of the courses, with bulk inserts. Every run gets its own
+token in the slugs and usernames so that it can run again on the same
+database. The File and Image items all share two sample files stored
+once in MEDIA_ROOT.
+
+The signals aren't sent by the bulk inserts: the counters are recounted,
+the catalog cache version bumped and the search index rebuilt at the
+end instead.
+"""
+
+import io
+import random
+import uuid
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User, Group, Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image as PILImage
+
+from courses.cache import CATALOG, bump_version
+from courses.counters import recount
+from courses.models import (Subject, Course, Module, Content, Text, File,
+                            Image, Video)
+from courses.search import rebuild_index
+from courses.videos import embed_fields
+
+PASSWORD = 'seed'
+
+WORDS = ('python django web data science machine learning music theory '
+         'physics mathematics algebra calculus history design database '
+         'network security cloud testing language basics advanced '
+         'project practice introduction guide').split()
+
+SAMPLE_FILE = 'files/seed-sample.txt'
+SAMPLE_IMAGE = 'images/seed-sample.png'
+
+# A few YouTube ids, their embedding is computed once
+VIDEO_URLS = [
+    'https://www.youtube.com/watch?v={}'.format(code)
+    for code in ('MAjhrDNUzY0', 'rfscVS0vtbw', 'F5mRW0jo-U4', 'UrsmFxEIp5k')
+]
+
+ITEM_MODELS = [Text, File, Image, Video]
+
+
+def words(rng, count):
+    return ' '.join(rng.choice(WORDS) for i in range(count))
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def bulk_insert(model, objects, batch_size):
+    """
+    Insert the objects, return their ids in the same order.
+    SQLite doesn't return the ids of the inserted rows, they are
+    read back as the ids after the last one before the insert.
+    """
+    objects = list(objects)
+    if connection.features.can_return_rows_from_bulk_insert:
+        model.objects.bulk_create(objects, batch_size)
+        return [obj.id for obj in objects]
+    last_id = model.objects.order_by('-id').values_list(
+        'id', flat=True).first() or 0
+    model.objects.bulk_create(objects, batch_size)
+    return list(
+        model.objects.filter(id__gt=last_id).order_by('id').values_list(
+            'id', flat=True))
+
+
+def sample_files():
+    # The files shared by all the File and Image items
+    if not default_storage.exists(SAMPLE_FILE):
+        default_storage.save(SAMPLE_FILE,
+                             ContentFile(b'A sample file.\n' * 1000))
+    if not default_storage.exists(SAMPLE_IMAGE):
+        buffer = io.BytesIO()
+        PILImage.new('RGB', (640, 480), 'steelblue').save(buffer, 'PNG')
+        default_storage.save(SAMPLE_IMAGE, ContentFile(buffer.getvalue()))
+
+
+def instructors_group():
+    group, created = Group.objects.get_or_create(name='Instructors')
+    if created:
+        models = ['course', 'module', 'content'] + [
+            model._meta.model_name for model in ITEM_MODELS
+        ]
+        group.permissions.set(
+            Permission.objects.filter(content_type__app_label='courses',
+                                      content_type__model__in=models))
+    return group
+
+
+def create_users(prefix, count, batch_size):
+    password = make_password(PASSWORD)
+    return bulk_insert(User, (User(username='{}-{}'.format(prefix, i),
+                                   password=password)
+                              for i in range(count)), batch_size)
+
+
+def create_items(rng, owner_ids, batch_size):
+    """
+    Create an item of a random type for each owner id,
+    return their (content type id, item id) in the same order.
+    """
+    kinds = [rng.choice(ITEM_MODELS) for owner_id in owner_ids]
+    embeds = {url: embed_fields(url) for url in VIDEO_URLS}
+    content_types, ids = {}, {}
+    for model in ITEM_MODELS:
+        objects = []
+        for kind, owner_id in zip(kinds, owner_ids):
+            if kind is not model:
+                continue
+            fields = {'owner_id': owner_id,
+                      'title': words(rng, 3).capitalize()}
+            if model is Text:
+                fields['content'] = words(rng, 80)
+            elif model is File:
+                fields['file'] = SAMPLE_FILE
+            elif model is Image:
+                fields.update(file=SAMPLE_IMAGE, width=640, height=480)
+            else:
+                url = rng.choice(VIDEO_URLS)
+                fields.update(embeds[url], url=url)
+            objects.append(model(**fields))
+        content_types[model] = ContentType.objects.get_for_model(model).id
+        ids[model] = iter(bulk_insert(model, objects, batch_size))
+    return [(content_types[kind], next(ids[kind])) for kind in kinds]
+
+
+@transaction.atomic
+def seed(subjects=10, instructors=20, courses=200, modules=5, contents=4,
+         students=500, enrollments=3, batch_size=1000, seed=None,
+         index=True):
+    """
+    Create the given numbers of subjects, instructors, courses, students,
+    modules and contents per module, and enrollments per student.
+    Return the number of created rows by model name.
+    """
+    rng = random.Random(seed)
+    token = uuid.uuid4().hex[:6]
+    sample_files()
+
+    subject_ids = bulk_insert(
+        Subject, (Subject(title='{} {}'.format(words(rng, 2).title(), i),
+                          slug='seed-{}-{}'.format(token, i))
+                  for i in range(subjects)), batch_size)
+    instructor_ids = create_users('seed-{}-instructor'.format(token),
+                                  instructors, batch_size)
+    group = instructors_group()
+    User.groups.through.objects.bulk_create(
+        (User.groups.through(user_id=id, group_id=group.id)
+         for id in instructor_ids), batch_size)
+
+    owner_ids = [rng.choice(instructor_ids) for i in range(courses)]
+    course_ids = bulk_insert(
+        Course, (Course(owner_id=owner_id,
+                        subject_id=rng.choice(subject_ids),
+                        title=words(rng, 4).capitalize(),
+                        slug='seed-{}-{}'.format(token, i),
+                        overview=words(rng, 40))
+                 for i, owner_id in enumerate(owner_ids)), batch_size)
+    module_ids = bulk_insert(
+        Module, (Module(course_id=course_id,
+                        title=words(rng, 3).capitalize(),
+                        description=words(rng, 20),
+                        order=order) for course_id in course_ids
+                 for order in range(modules)), batch_size)
+
+    # The items belong to the instructor of their course
+    items = iter(create_items(
+        rng, [owner_id for owner_id in owner_ids
+              for i in range(modules * contents)], batch_size))
+    Content.objects.bulk_create(
+        (Content(module_id=module_id,
+                 content_type_id=content_type_id,
+                 object_id=object_id,
+                 order=order) for module_id in module_ids
+         for order, (content_type_id, object_id) in zip(
+             range(contents), items)), batch_size)
+
+    student_ids = create_users('seed-{}-student'.format(token), students,
+                               batch_size)
+    Enrollment = Course.students.through
+    for batch in batches(student_ids, batch_size):
+        Enrollment.objects.bulk_create(
+            (Enrollment(course_id=course_id, user_id=student_id)
+             for student_id in batch for course_id in rng.sample(
+                 course_ids, min(enrollments, len(course_ids)))),
+            batch_size)
+
+    recount(Subject, subject_ids)
+    for batch in batches(course_ids, batch_size):
+        recount(Course, batch)
+    bump_version(CATALOG)
+    if index:
+        rebuild_index(batch_size)
+    return {
+        'subjects': len(subject_ids),
+        'instructors': len(instructor_ids),
+        'courses': len(course_ids),
+        'modules': len(module_ids),
+        'contents': len(module_ids) * contents,
+        'students': len(student_ids),
+        'enrollments': len(student_ids) * min(enrollments, len(course_ids)),
+    }
@@ -0,0 +1,50 @@
+"""
+Sessions read from the cache, written to the cache and the database.
+
+SessionStore is Django's cached_db store (the SESSION_ENGINE is this
+module): a request reads its session from the cache, from the database
+on a miss, and a modified session is written to both.
+
+A session marked as modified with the same data as loaded, e.g. a view
+setting a key to its current value, is not written again. Unless
+SESSION_SAVE_EVERY_REQUEST is set: its saves extend the expiry date.
+"""
+
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+
+
+class SessionStore(cached_db.SessionStore):
+    # The serialized data as loaded or last saved
+    _saved_data = None
+
+    def dump(self, session):
+        return self.serializer().dumps(session)
+
+    def load(self):
+        data = super().load()
+        if self.session_key is not None:
+            self._saved_data = self.dump(data)
+        return data
+
+    def is_unchanged(self):
+        return (not settings.SESSION_SAVE_EVERY_REQUEST
+                and self.session_key is not None
+                and self._saved_data is not None
+                and self._saved_data == self.dump(self._session))
+
+    def save(self, must_create=False):
+        if not must_create and self.is_unchanged():
+            return
+        super().save(must_create)
+        self._saved_data = self.dump(self._session)
+
+    def delete(self, session_key=None):
+        super().delete(session_key)
+        if session_key is None or session_key == self.session_key:
+            self._saved_data = None
+
+    def cycle_key(self):
+        # The data are saved under a new key
+        self._saved_data = None
+        super().cycle_key()
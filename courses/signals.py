@@ -0,0 +1,289 @@
+import threading
+
+from django.contrib.auth.models import User, Group
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import (post_save, pre_delete, post_delete,
+                                      m2m_changed)
+from django.dispatch import receiver
+
+from courses.models import (Subject, Course, Module, Content, Text, File,
+                            Image, Video)
+from courses.cache import (CATALOG, bump_version, course_version,
+                           touch_courses, touch_item_courses)
+from courses.counters import change_counter, recount
+from courses.auth import invalidate_users
+from courses.membership import (invalidate_user_access, invalidate_all_access,
+                                invalidate_enrollments)
+from courses.images import needs_variants
+from courses.search import unindex_object
+from courses.tasks import (make_image_variants, warm_catalog,
+                           update_search_document)
+
+
+# Any change on the subjects, courses or modules makes the cached
+# catalog pages stale.
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+def invalidate_catalog(sender, **kwargs):
+    bump_version(CATALOG)
+
+
+# Any change on a course, its subject, modules, contents or their items
+# makes a new version of the course: its last_modified (see
+# courses/conditional.py) and its cache version (see courses/api.py).
+# The deleted items are touched by the deletion of their contents.
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def bump_course(sender, instance, **kwargs):
+    # last_modified is auto_now
+    bump_version(course_version(instance.id))
+
+
+@receiver(post_save, sender=Subject)
+def touch_subject_courses(sender, instance, created, **kwargs):
+    if not created:
+        touch_courses(instance.courses.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+def touch_module_course(sender, instance, **kwargs):
+    touch_courses([instance.course_id])
+
+
+@receiver(post_save, sender=Content)
+def touch_content_course(sender, instance, **kwargs):
+    touch_courses([instance.module.course_id])
+
+
+# The ids of the modules being deleted in this thread: the cascade
+# deletes their contents first, the deleted module touches and recounts
+# its course once.
+_deleting = threading.local()
+
+
+def deleting_module_ids():
+    if not hasattr(_deleting, 'module_ids'):
+        _deleting.module_ids = set()
+    return _deleting.module_ids
+
+
+@receiver(pre_delete, sender=Module)
+def remember_deleted_module(sender, instance, **kwargs):
+    deleting_module_ids().add(instance.id)
+
+
+@receiver(post_delete, sender=Content)
+def uncount_course_content(sender, instance, **kwargs):
+    if instance.module_id in deleting_module_ids():
+        return
+    if Content._meta.get_field('module').is_cached(instance):
+        course_ids = [instance.module.course_id]
+    else:
+        course_ids = list(
+            Module.objects.filter(id=instance.module_id).values_list(
+                'course_id', flat=True))
+    touch_courses(course_ids)
+    change_counter(Course, course_ids, 'content_count', -1)
+
+
+@receiver(post_save, sender=Text)
+@receiver(post_save, sender=File)
+@receiver(post_save, sender=Image)
+@receiver(post_save, sender=Video)
+def touch_content_item_courses(sender, instance, created, **kwargs):
+    # A new item isn't in a module yet
+    if not created:
+        touch_item_courses(sender, [instance.id])
+
+
+# The stored counters (see courses/counters.py). A deleted content
+# decrements its course, see above, a deleted module recounts it.
+@receiver(post_save, sender=Course)
+def count_subject_courses(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_loaded_subject_id', None)
+    if created:
+        change_counter(Subject, [instance.subject_id], 'course_count', 1)
+    elif previous is not None and previous != instance.subject_id:
+        change_counter(Subject, [previous], 'course_count', -1)
+        change_counter(Subject, [instance.subject_id], 'course_count', 1)
+    instance._loaded_subject_id = instance.subject_id
+
+
+@receiver(post_delete, sender=Course)
+def uncount_subject_course(sender, instance, **kwargs):
+    change_counter(Subject, [instance.subject_id], 'course_count', -1)
+
+
+@receiver(post_save, sender=Module)
+def count_course_module(sender, instance, created, **kwargs):
+    if created:
+        change_counter(Course, [instance.course_id], 'module_count', 1)
+
+
+@receiver(post_delete, sender=Module)
+def recount_course_modules(sender, instance, **kwargs):
+    # The contents of the module are gone with it
+    deleting_module_ids().discard(instance.id)
+    recount(Course, [instance.course_id], ['module_count', 'content_count'])
+
+
+@receiver(post_save, sender=Content)
+def count_course_content(sender, instance, created, **kwargs):
+    if created:
+        change_counter(Course, [instance.module.course_id], 'content_count',
+                       1)
+
+
+@receiver(m2m_changed, sender=Course.students.through)
+def count_course_students(sender, instance, action, reverse, pk_set,
+                          **kwargs):
+    # The added primary keys are the new enrollments only, the removed
+    # ones may not have been enrolled: recount.
+    if not reverse:
+        if action == 'post_add':
+            change_counter(Course, [instance.pk], 'student_count',
+                           len(pk_set))
+        elif action in ('post_remove', 'post_clear'):
+            recount(Course, [instance.pk], ['student_count'])
+    elif action == 'pre_clear':
+        # The courses of the user before they are cleared
+        instance._cleared_course_ids = list(
+            instance.courses_joined.values_list('id', flat=True))
+    elif action == 'post_add':
+        change_counter(Course, pk_set, 'student_count', 1)
+    elif action == 'post_remove':
+        recount(Course, pk_set, ['student_count'])
+    elif action == 'post_clear':
+        recount(Course, instance._cleared_course_ids, ['student_count'])
+
+
+# Enrolled course ids of the students (see courses/membership.py)
+@receiver(m2m_changed, sender=Course.students.through)
+def invalidate_course_students(sender, instance, action, reverse, pk_set,
+                               **kwargs):
+    if reverse:
+        # The courses of a student changed
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_enrollments(instance.pk)
+    elif action == 'pre_clear':
+        instance._cleared_student_ids = list(
+            instance.students.values_list('id', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        invalidate_enrollments(*pk_set)
+    elif action == 'post_clear':
+        invalidate_enrollments(*instance._cleared_student_ids)
+
+
+@receiver(pre_delete, sender=Course)
+def remember_course_students(sender, instance, **kwargs):
+    # The enrollments are deleted without m2m_changed, and SQLite may
+    # give the id of the course to the next one
+    instance._student_ids = list(
+        instance.students.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Course)
+def invalidate_deleted_course_students(sender, instance, **kwargs):
+    invalidate_enrollments(*getattr(instance, '_student_ids', ()))
+
+
+@receiver(pre_delete, sender=User)
+def remember_user_courses(sender, instance, **kwargs):
+    # The enrollments are deleted without m2m_changed
+    instance._joined_course_ids = list(
+        instance.courses_joined.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=User)
+def uncount_user_enrollments(sender, instance, **kwargs):
+    change_counter(Course, getattr(instance, '_joined_course_ids', ()),
+                   'student_count', -1)
+
+
+# Build the new catalog pages in the background
+@receiver(post_save, sender=Subject)
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def queue_catalog_warming(sender, instance, **kwargs):
+    if sender is Subject:
+        warm_catalog.delay(subject_id=instance.id)
+    else:
+        warm_catalog.delay(subject_id=instance.subject_id)
+
+
+# Resize the uploaded images in the background
+@receiver(post_save, sender=Image)
+def queue_image_variants(sender, instance, **kwargs):
+    if needs_variants(instance):
+        make_image_variants.delay(image_id=instance.id)
+
+
+# Keep the search documents up to date (see courses/search.py).
+# The documents of a course and its modules are deleted with them.
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Module)
+@receiver(post_save, sender=Text)
+def queue_search_update(sender, instance, **kwargs):
+    update_search_document.delay(model=sender._meta.model_name,
+                                 object_id=instance.id)
+
+
+@receiver(post_save, sender=Content)
+def queue_text_search_update(sender, instance, created, **kwargs):
+    # A text added to a module becomes searchable
+    content_type = ContentType.objects.get_for_id(instance.content_type_id)
+    if created and content_type.model_class() is Text:
+        update_search_document.delay(model='text',
+                                     object_id=instance.object_id)
+
+
+@receiver(post_delete, sender=Text)
+def delete_text_search_document(sender, instance, **kwargs):
+    unindex_object(instance)
+
+
+# Groups and permissions of the users (see courses/membership.py)
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_user_groups(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        # The groups or permissions of a user changed
+        invalidate_user_access(instance.pk)
+    elif pk_set:
+        # Users added to or removed from a group or permission
+        invalidate_user_access(*pk_set)
+    else:
+        # A group or permission cleared of all its users
+        invalidate_all_access()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_group_permissions(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_all_access()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_groups(sender, **kwargs):
+    invalidate_all_access()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    # The cached user of the sessions (see courses/auth.py)
+    invalidate_users(instance.pk)
+    # Don't let a new user get the access or the courses of a deleted one
+    # with the same id
+    if kwargs.get('created', True):
+        invalidate_user_access(instance.pk)
+        invalidate_enrollments(instance.pk)
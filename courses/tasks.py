@@ -0,0 +1,40 @@
+"""
+The background jobs of the courses, queued by courses/signals.py
+and run by `manage.py run_jobs` (see jobs/queue.py).
+"""
+
+from django.apps import apps
+
+from courses.models import Subject, Image
+from courses.cache import get_catalog
+from courses.images import needs_variants, process_variants
+from courses.search import index_object
+from jobs.queue import job
+
+
+@job
+def make_image_variants(image_id):
+    image = Image.objects.filter(id=image_id).first()
+    # Deleted, or its file already processed by another job
+    if image is not None and needs_variants(image):
+        process_variants(image)
+
+
+@job
+def warm_catalog(subject_id=None):
+    # Build the catalog pages invalidated by a change
+    get_catalog()
+    slug = Subject.objects.filter(id=subject_id).values_list(
+        'slug', flat=True).first()
+    if slug is not None:
+        get_catalog(slug)
+
+
+@job
+def update_search_document(model, object_id):
+    # model: course, module or text
+    obj = apps.get_model('courses', model).objects.filter(
+        id=object_id).first()
+    # Deleted since, its document is deleted with it
+    if obj is not None:
+        index_object(obj)
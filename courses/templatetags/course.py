@@ -1,5 +1,6 @@
 from django import template
-from django.contrib.auth.models import Group
+
+from courses.membership import user_in_group, is_enrolled
 
 register = template.Library()
 
@@ -22,6 +23,19 @@ def has_group(user, group_name):
     {% endif %}
 
     return Boolean (True/False)
+
+    The groups of the user are loaded once per request and cached
+    (see courses/membership.py), a missing group is just False.
+    """
+    return user_in_group(user, group_name)
+
+
+@register.filter
+def enrolled_in(user, course):
+    """
+    {% if request.user|enrolled_in:course %}
+
+    The ids of the courses of the user are loaded once per request and
+    cached (see courses/membership.py).
     """
-    group = Group.objects.get(name=group_name)
-    return group in user.groups.all()
+    return is_enrolled(user, course.id)
@@ -0,0 +1,143 @@
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.core.cache import cache
+
+from courses.budget import QueryBudgetTestMixin
+from courses.models import Subject, Module, Content, Video
+from courses.tests.utils import create_instructor, seed_course
+
+
+class ApiTest(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.instructor = create_instructor()
+        self.subject = Subject.objects.create(title='Programing',
+                                              slug='programing')
+        self.course = seed_course(self.instructor,
+                                  modules=2,
+                                  contents=2,
+                                  subject=self.subject)
+        self.outline_url = reverse('courses:api_course_outline',
+                                   args=[self.course.id])
+
+    def get_etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def assertNotModified(self, url, etag):
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_subject_list(self):
+        url = reverse('courses:api_subject_list')
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertFalse(response['ETag'].startswith('W/'))
+        self.assertEqual(json.loads(response.content)['subjects'], [{
+            'id': self.subject.id,
+            'title': 'Programing',
+            'slug': 'programing',
+            'courses_url': reverse('courses:api_course_list',
+                                   args=['programing']),
+            'total_courses': 1,
+        }])
+        self.assertNotModified(url, response['ETag'])
+
+        Subject.objects.create(title='Music', slug='music')
+        self.assertNotEqual(self.get_etag(url), response['ETag'])
+
+    @override_settings(COURSES_PER_PAGE=1)
+    def test_course_list(self):
+        other = seed_course(self.instructor, modules=0, subject=self.subject)
+        url = reverse('courses:api_course_list', args=['programing'])
+        data = json.loads(self.client.get(url).content)
+        self.assertEqual([c['id'] for c in data['courses']], [other.id])
+        self.assertIsNone(data['previous'])
+        response = self.client.get(data['next'])
+        data = json.loads(response.content)
+        self.assertEqual(data['courses'][0]['id'], self.course.id)
+        self.assertEqual(data['courses'][0]['total_modules'], 2)
+        self.assertIsNone(data['next'])
+        # One ETag by page
+        self.assertNotEqual(self.get_etag(url), response['ETag'])
+        self.assertNotModified(data['previous'],
+                               self.get_etag(data['previous']))
+
+        response = self.client.get(
+            reverse('courses:api_course_list', args=['music']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_outline(self):
+        response = self.client.get(self.outline_url)
+        data = json.loads(response.content)
+        self.assertEqual(data['subject']['slug'], 'programing')
+        self.assertEqual([m['title'] for m in data['modules']],
+                         ['Module 0', 'Module 1'])
+        self.assertEqual(data['modules'][0]['contents'][1]['type'], 'text')
+        self.assertEqual(data['modules'][0]['contents'][1]['title'],
+                         'Text 1')
+        self.assertNotModified(self.outline_url, response['ETag'])
+
+        response = self.client.get(
+            reverse('courses:api_course_outline', args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_outline_deleted_item(self):
+        content = self.course.modules.first().contents.first()
+        content.item.delete()
+        with self.assertNumQueries(4):
+            response = self.client.get(self.outline_url)
+        data = json.loads(response.content)
+        self.assertNotIn(content.id, [
+            c['id'] for m in data['modules'] for c in m['contents']
+        ])
+
+    def test_outline_queries_are_fixed(self):
+        def seed(size):
+            course = seed_course(self.instructor,
+                                 modules=size,
+                                 contents=size)
+            module = course.modules.first()
+            video = Video.objects.create(owner=self.instructor,
+                                         title='Video',
+                                         url='https://example.com/v')
+            Content.objects.create(module=module, item=video)
+            return reverse('courses:api_course_outline', args=[course.id])
+
+        self.assertQueryBudgetScales(seed)
+
+    def test_outline_etag_changes(self):
+        etag = self.get_etag(self.outline_url)
+        module = self.course.modules.first()
+        content = module.contents.first()
+
+        content.item.title = 'Renamed'
+        content.item.save()
+        etag, previous = self.get_etag(self.outline_url), etag
+        self.assertNotEqual(etag, previous)
+
+        Module.objects.create(course=self.course, title='Module 2')
+        etag, previous = self.get_etag(self.outline_url), etag
+        self.assertNotEqual(etag, previous)
+
+        self.client.login(username='instructor', password='B3nB3n256*')
+        orders = {str(c.id): i for i, c in
+                  enumerate(reversed(list(module.contents.all())))}
+        self.client.post(reverse('courses:content_order'),
+                         json.dumps(orders),
+                         content_type='application/json')
+        etag, previous = self.get_etag(self.outline_url), etag
+        self.assertNotEqual(etag, previous)
+
+        self.client.post(
+            reverse('courses:module_content_delete', args=[content.id]))
+        etag, previous = self.get_etag(self.outline_url), etag
+        self.assertNotEqual(etag, previous)
+
+        # Other courses don't change it
+        seed_course(self.instructor)
+        self.assertNotModified(self.outline_url, etag)
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User, AnonymousUser
+from django.core.cache import cache
+from django.http import Http404
+from django.test import TransactionTestCase, RequestFactory
+from django.urls import reverse
+
+from courses import async_views
+from courses.budget import get_query_budget
+from courses.conditional import page_validators
+from courses.models import Subject, Course
+from courses.parallel import gather
+from courses.tests.utils import create_instructor, seed_course
+from students import async_views as student_async_views
+
+
+# The views load their data in other threads, with their own database
+# connections: the data must be committed.
+class AsyncViewsTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.instructor = create_instructor()
+        self.student = User.objects.create_user(username='student',
+                                                password='B3nB3n256*')
+        self.subject = Subject.objects.create(title='Programing',
+                                              slug='programing')
+        self.course = seed_course(self.instructor,
+                                  modules=2,
+                                  contents=2,
+                                  students=[self.student],
+                                  subject=self.subject)
+
+    def get(self, view_class, user=None, headers=None, **kwargs):
+        request = self.factory.get('/', **(headers or {}))
+        request.user = user or AnonymousUser()
+        response = async_to_sync(view_class.as_view())(request, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    def test_gather(self):
+        # Both functions wait for each other
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait(value):
+            barrier.wait()
+            return value
+
+        results = async_to_sync(gather)(lambda: wait(1), lambda: wait(2))
+        self.assertEqual(results, [1, 2])
+
+    def test_views_are_async(self):
+        view = async_views.CourseDetailView.as_view()
+        self.assertTrue(asyncio.iscoroutinefunction(view))
+        self.assertEqual(get_query_budget(view), 3)
+
+    def test_catalog(self):
+        for i in range(2):
+            # A miss then a hit
+            response = self.get(async_views.CourseListView)
+            self.assertContains(response, self.course.title)
+            self.assertContains(response, '2 modules.')
+        response = self.get(async_views.CourseListView, subject='programing')
+        self.assertContains(response, self.course.title)
+        with self.assertRaises(Http404):
+            self.get(async_views.CourseListView, subject='unknown')
+
+    def test_course_detail(self):
+        response = self.get(async_views.CourseDetailView,
+                            slug=self.course.slug)
+        self.assertContains(response, self.course.title)
+        etag, timestamp = page_validators(
+            Course.objects.get(id=self.course.id).last_modified,
+            AnonymousUser(), None, [])
+        self.assertEqual(response['ETag'], etag)
+        response = self.get(async_views.CourseDetailView,
+                            headers={'HTTP_IF_NONE_MATCH': etag},
+                            slug=self.course.slug)
+        self.assertEqual(response.status_code, 304)
+        with self.assertRaises(Http404):
+            self.get(async_views.CourseDetailView, slug='unknown')
+
+    def test_player(self):
+        view = student_async_views.StudentCourseDetailView
+        modules = list(self.course.modules.all())
+        response = self.get(view, self.student, pk=self.course.id)
+        self.assertContains(response, modules[0].title)
+        self.assertEqual(response.context_data['module'], modules[0])
+        self.assertEqual(len(response.context_data['contents']), 2)
+
+        response = self.get(view,
+                            self.student,
+                            pk=self.course.id,
+                            module_id=modules[1].id)
+        self.assertEqual(response.context_data['module'], modules[1])
+        etag = response['ETag']
+        response = self.get(view,
+                            self.student,
+                            headers={'HTTP_IF_NONE_MATCH': etag},
+                            pk=self.course.id,
+                            module_id=modules[1].id)
+        self.assertEqual(response.status_code, 304)
+
+        other = seed_course(self.instructor)
+        with self.assertRaises(Http404):
+            self.get(view,
+                     self.student,
+                     pk=self.course.id,
+                     module_id=other.modules.get().id)
+        with self.assertRaises(Http404):
+            self.get(view, self.student, pk=self.course.id, module_id='abc')
+        with self.assertRaises(Http404):
+            self.get(view, self.student, pk=other.id)
+        response = self.get(view, pk=self.course.id)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith(reverse('login')))
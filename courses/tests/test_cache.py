@@ -0,0 +1,140 @@
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from courses.models import Subject, Course, Module, Text
+from courses.cache import CATALOG, get_version, get_catalog
+from courses.fragments import LRUCache, fragments, invalidate_fragment
+
+
+class CatalogCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Set up non-modified objects used by all test methods
+        cls.subject1_id = Subject.objects.create(title='Programing',
+                                                 slug='programing').pk
+        cls.admin = User.objects.create(username="admin",
+                                        email="admin@protonmail.com",
+                                        first_name="Administrator",
+                                        is_superuser=True)
+
+    def setUp(self):
+        cache.clear()
+        self.subject1 = Subject.objects.get(id=self.subject1_id)
+        self.course1 = Course.objects.create(subject=self.subject1,
+                                             owner=self.admin,
+                                             title='Course 1',
+                                             slug='course-1')
+
+    def test_cache_hit_runs_no_query(self):
+        url = reverse('courses:course_list_subject', args=['programing'])
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Course 1')
+        self.assertContains(response, 'Programing')
+
+    def test_unknown_subject(self):
+        response = self.client.get(
+            reverse('courses:course_list_subject', args=['music']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_version_bumped_by_signals(self):
+        version = get_version(CATALOG)
+        module = Module.objects.create(course=self.course1, title='Module 1')
+        self.assertGreater(get_version(CATALOG), version)
+
+        version = get_version(CATALOG)
+        module.delete()
+        self.assertGreater(get_version(CATALOG), version)
+
+        version = get_version(CATALOG)
+        Subject.objects.create(title='Music', slug='music')
+        self.assertGreater(get_version(CATALOG), version)
+
+    def test_catalog_invalidated_on_change(self):
+        self.assertEqual(len(get_catalog()['courses']), 1)
+        Course.objects.create(subject=self.subject1,
+                              owner=self.admin,
+                              title='Course 2',
+                              slug='course-2')
+        self.assertEqual(len(get_catalog()['courses']), 2)
+        self.course1.title = 'Renamed course'
+        self.course1.save()
+        response = self.client.get(reverse('course_list'))
+        self.assertContains(response, 'Renamed course')
+
+
+class FileBasedCatalogCacheTest(CatalogCacheTest):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        settings = override_settings(
+            CACHES={
+                'default': {
+                    'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                    'LOCATION': self.cache_dir.name,
+                }
+            })
+        settings.enable()
+        self.addCleanup(settings.disable)
+        super(FileBasedCatalogCacheTest, self).setUp()
+
+
+class LRUCacheTest(TestCase):
+    def test_evicts_least_recently_used(self):
+        lru = LRUCache(2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        self.assertEqual(lru.get('a'), 1)
+        lru.set('c', 3)
+        self.assertEqual(len(lru), 2)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('a'), 1)
+        self.assertEqual(lru.get('c'), 3)
+
+
+class FragmentCacheTest(TestCase):
+    def setUp(self):
+        fragments.clear()
+        cache.clear()
+        user = User.objects.create(username="admin")
+        self.text = Text.objects.create(title='Text 1',
+                                        content='A text',
+                                        owner=user)
+
+    def test_render_once(self):
+        with mock.patch.object(Text, 'render_template',
+                               return_value='<p>A text</p>') as render:
+            self.assertEqual(self.text.render(), '<p>A text</p>')
+            self.assertEqual(self.text.render(), '<p>A text</p>')
+            self.assertEqual(render.call_count, 1)
+
+    def test_updated_item_is_rendered_again(self):
+        self.assertEqual(self.text.render(), '<p>A text</p>')
+        self.text.content = 'Another text'
+        self.text.save()
+        self.assertEqual(self.text.render(), '<p>Another text</p>')
+
+    def test_invalidate(self):
+        self.text.render()
+        invalidate_fragment(self.text)
+        with mock.patch.object(Text, 'render_template',
+                               return_value='<p>A text</p>') as render:
+            self.text.render()
+            self.assertEqual(render.call_count, 1)
+
+    @override_settings(FRAGMENT_CACHE_ALIAS='default')
+    def test_shared_cache(self):
+        self.text.render()
+        # Another process with an empty LRU cache
+        fragments.clear()
+        with mock.patch.object(Text, 'render_template') as render:
+            self.assertEqual(self.text.render(), '<p>A text</p>')
+            self.assertFalse(render.called)
@@ -0,0 +1,160 @@
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from courses.budget import QueryBudgetTestMixin
+from courses.clone import clone_course, copy_slug
+from courses.models import (Course, Module, Content, Text, File, Image,
+                            Video, SearchDocument)
+from courses.search import search
+from courses.tasks import make_image_variants
+from courses.tests.utils import create_instructor, seed_course
+from jobs.models import Job
+
+
+def add_items(course, owner):
+    # A File, an Image and a Video content in the first module
+    module = course.modules.order_by('order')[0]
+    for item in (File.objects.create(owner=owner, title='Slides',
+                                     file='files/slides.pdf'),
+                 Image.objects.create(owner=owner,
+                                      title='Diagram',
+                                      file='images/diagram.png',
+                                      width=640,
+                                      height=480,
+                                      variants={
+                                          'source': 'images/diagram.png'
+                                      }),
+                 Video.objects.create(owner=owner,
+                                      title='Talk',
+                                      url='https://example.com/talk')):
+        Content.objects.create(module=module, item=item)
+
+
+def outline(course):
+    # The ordered modules and the items of their ordered contents
+    return [(module.title, module.order, [
+        (type(content.item), content.item.title, content.order)
+        for content in module.contents.order_by('order').with_items()
+    ]) for module in course.modules.order_by('order')]
+
+
+class CloneCourseTest(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.instructor = create_instructor()
+        self.student = User.objects.create_user(username='student')
+        self.course = seed_course(self.instructor,
+                                  modules=3,
+                                  contents=2,
+                                  students=[self.student])
+        add_items(self.course, self.instructor)
+        # Not in the order of their ids
+        module = self.course.modules.order_by('order')[0]
+        module.order = 10
+        module.save()
+
+    def test_clone(self):
+        other = create_instructor(username='other')
+        clone = clone_course(self.course, owner=other)
+        self.assertEqual(clone.title, '{} (copy)'.format(self.course.title))
+        self.assertEqual(clone.slug, '{}-copy'.format(self.course.slug))
+        self.assertEqual(clone.owner, other)
+        self.assertEqual(clone.subject, self.course.subject)
+        self.assertEqual(outline(clone), outline(self.course))
+        self.assertEqual(clone.students.count(), 0)
+        clone.refresh_from_db()
+        self.assertEqual(
+            (clone.module_count, clone.content_count, clone.student_count),
+            (3, 9, 0))
+
+        # New items of the new owner, sharing the files
+        items = [content.item for content in Content.objects.filter(
+            module__course=clone).with_items()]
+        self.assertEqual(len(items), 9)
+        self.assertTrue(all(item.owner == other for item in items))
+        self.assertEqual(Text.objects.count(), 12)
+        image = Image.objects.get(title='Diagram', owner=other)
+        self.assertEqual(image.file.name, 'images/diagram.png')
+        self.assertEqual((image.width, image.height, image.variants),
+                         (640, 480, {'source': 'images/diagram.png'}))
+        video = Video.objects.get(owner=other)
+        self.assertEqual(video.embed_url,
+                         Video.objects.get(owner=self.instructor).embed_url)
+
+        # The modules and texts are searchable
+        self.assertEqual(
+            SearchDocument.objects.filter(course=clone,
+                                          module__isnull=False).count(),
+            3 + 6)
+        self.assertIn(clone.modules.order_by('order')[0].title,
+                      [document.title for document in search('Module')])
+
+    def test_image_variants_queued(self):
+        jobs = Job.objects.filter(name=make_image_variants.job_name)
+        # Made for the source
+        clone_course(self.course)
+        self.assertFalse(jobs.exists())
+        Image.objects.filter(title='Diagram').update(variants={})
+        clone = clone_course(self.course)
+        image = Image.objects.get(title='Diagram', id__in=[
+            content.object_id
+            for content in Content.objects.filter(module__course=clone)
+        ])
+        self.assertEqual(image.variants, {})
+        self.assertEqual([job.kwargs for job in jobs],
+                         [{'image_id': image.id}])
+
+    def test_constant_queries(self):
+        counts = set()
+        for size in (1, 4):
+            course = seed_course(self.instructor, modules=size,
+                                 contents=size)
+            add_items(course, self.instructor)
+            # A bulk insert by model, the ids read back on SQLite
+            with self.assertNumQueries(34) as context:
+                clone_course(course)
+            counts.add(len(context.captured_queries))
+        self.assertEqual(counts, {34})
+
+    def test_copy_slug(self):
+        clone_course(self.course)
+        self.assertEqual(copy_slug(self.course.slug),
+                         '{}-copy-2'.format(self.course.slug))
+        clone = clone_course(self.course, title='Next term', slug='next')
+        self.assertEqual((clone.title, clone.slug), ('Next term', 'next'))
+
+    def test_clone_view(self):
+        self.client.login(username='instructor', password='B3nB3n256*')
+        url = reverse('courses:course_clone', args=[self.course.id])
+        self.assertQueryBudget(url)
+        self.assertContains(self.client.get(url),
+                            '{}-copy'.format(self.course.slug))
+        self.assertQueryBudget(url, 'post', {
+            'title': 'Next term',
+            'slug': 'next-term'
+        })
+        clone = Course.objects.get(slug='next-term')
+        self.assertEqual(outline(clone), outline(self.course))
+        # The slug is taken
+        response = self.client.post(url, {
+            'title': 'Next term',
+            'slug': 'next-term'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Course.objects.filter(title='Next term').count(), 1)
+
+        # Only the owner
+        create_instructor(username='other')
+        self.client.login(username='other', password='B3nB3n256*')
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_admin_action(self):
+        admin = site._registry[Course]
+        admin.message_user = lambda request, message: None
+        admin.clone_courses(None, Course.objects.filter(id=self.course.id))
+        clone = Course.objects.get(slug='{}-copy'.format(self.course.slug))
+        self.assertEqual(clone.owner, self.instructor)
+        self.assertEqual(Module.objects.filter(course=clone).count(), 3)
@@ -0,0 +1,126 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.core.cache import cache
+
+from courses.models import Subject, Module
+from courses.tests.utils import create_instructor, seed_course
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.instructor = create_instructor()
+        self.student = User.objects.create_user(username='student',
+                                                password='B3nB3n256*')
+        self.course = seed_course(self.instructor,
+                                  modules=2,
+                                  contents=2,
+                                  students=[self.student])
+        self.detail_url = reverse('courses:course_detail',
+                                  args=[self.course.slug])
+        self.player_url = reverse('students:student_course_detail',
+                                  args=[self.course.id])
+
+    def get_etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('Last-Modified', response)
+        return response['ETag']
+
+    def assertNotModified(self, url, etag, queries):
+        # The last_modified lookup and no rendering
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_course_detail(self):
+        etag = self.get_etag(self.detail_url)
+        self.assertNotModified(self.detail_url, etag, 1)
+
+        self.client.login(username='student', password='B3nB3n256*')
+        # An other page once logged in, session, user and enrolled
+        # courses queries
+        self.assertNotEqual(self.get_etag(self.detail_url), etag)
+        self.assertNotModified(self.detail_url,
+                               self.get_etag(self.detail_url), 4)
+
+        response = self.client.get(
+            reverse('courses:course_detail', args=['unknown']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_csrf_secret(self):
+        # A new login sets a new CSRF secret, the enroll form of the page
+        # has to be rendered again with it
+        self.client.login(username='student', password='B3nB3n256*')
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = 'a' * 64
+        etag = self.get_etag(self.detail_url)
+        self.assertNotModified(self.detail_url, etag, 4)
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = 'b' * 64
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_enrollment(self):
+        other = User.objects.create_user(username='other',
+                                         password='B3nB3n256*')
+        self.client.login(username='other', password='B3nB3n256*')
+        etag = self.get_etag(self.detail_url)
+        self.assertContains(self.client.get(self.detail_url), 'Enroll now')
+        self.course.students.add(other)
+        # The enroll button became a link to the player
+        self.assertNotEqual(self.get_etag(self.detail_url), etag)
+        response = self.client.get(self.detail_url)
+        self.assertNotContains(response, 'Enroll now')
+        self.assertContains(response, self.player_url)
+        # And a badge in the catalog
+        self.assertContains(self.client.get(reverse('course_list')),
+                            'courses__items-enrolled')
+
+    def test_player(self):
+        self.client.login(username='student', password='B3nB3n256*')
+        etag = self.get_etag(self.player_url)
+        self.assertNotModified(self.player_url, etag, 4)
+
+        # Not enrolled, no validators
+        other = seed_course(self.instructor)
+        response = self.client.get(
+            reverse('students:student_course_detail', args=[other.id]))
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response)
+
+    def test_changes(self):
+        self.client.login(username='student', password='B3nB3n256*')
+        etag = self.get_etag(self.player_url)
+        module = self.course.modules.first()
+        content = module.contents.first()
+
+        def changed():
+            nonlocal etag
+            etag, previous = self.get_etag(self.player_url), etag
+            return etag != previous
+
+        self.course.title = 'Renamed'
+        self.course.save()
+        self.assertTrue(changed())
+        module.title = 'Renamed'
+        module.save()
+        self.assertTrue(changed())
+        content.item.title = 'Renamed'
+        content.item.save()
+        self.assertTrue(changed())
+        Module.objects.create(course=self.course, title='Module 2')
+        self.assertTrue(changed())
+        subject = Subject.objects.get(id=self.course.subject_id)
+        subject.title = 'Renamed'
+        subject.save()
+        self.assertTrue(changed())
+        module.delete()
+        self.assertTrue(changed())
+
+        # Other courses don't change it
+        seed_course(self.instructor)
+        self.assertNotModified(self.player_url, etag, 4)
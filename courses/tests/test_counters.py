@@ -0,0 +1,116 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from courses.models import Subject, Course, Module, Content, Text
+from courses.tests.utils import create_instructor, seed_course
+
+
+class CountersTest(TestCase):
+    def setUp(self):
+        self.instructor = create_instructor()
+        self.subject = Subject.objects.create(title='Programing',
+                                              slug='programing')
+        self.course = seed_course(self.instructor,
+                                  modules=2,
+                                  contents=3,
+                                  subject=self.subject)
+        self.students = [
+            User.objects.create_user(username='student{}'.format(i))
+            for i in range(3)
+        ]
+
+    def assertCounters(self, module_count, content_count, student_count):
+        course = Course.objects.get(id=self.course.id)
+        self.assertEqual(
+            (course.module_count, course.content_count, course.student_count),
+            (module_count, content_count, student_count))
+
+    def assertCourseCount(self, subject, course_count):
+        self.assertEqual(
+            Subject.objects.get(id=subject.id).course_count, course_count)
+
+    def test_courses(self):
+        self.assertCourseCount(self.subject, 1)
+        other = Subject.objects.create(title='Music', slug='music')
+        course = Course.objects.get(id=self.course.id)
+        course.subject = other
+        course.save()
+        self.assertCourseCount(self.subject, 0)
+        self.assertCourseCount(other, 1)
+        course.delete()
+        self.assertCourseCount(other, 0)
+
+    def test_modules_and_contents(self):
+        self.assertCounters(2, 6, 0)
+        module = Module.objects.create(course=self.course, title='Module 2')
+        text = Text.objects.create(owner=self.instructor, title='Text')
+        Content.objects.create(module=module, item=text)
+        self.assertCounters(3, 7, 0)
+        # With its contents
+        self.course.modules.first().delete()
+        self.assertCounters(2, 4, 0)
+
+        self.client.login(username='instructor', password='B3nB3n256*')
+        self.client.post(
+            reverse('courses:module_content_delete',
+                    args=[module.contents.get().id]))
+        self.assertCounters(2, 3, 0)
+
+    def test_deleted_contents(self):
+        module = self.course.modules.first()
+        # Without its module loaded
+        Content.objects.get(id=module.contents.first().id).delete()
+        self.assertCounters(2, 5, 0)
+        module.contents.all().delete()
+        self.assertCounters(2, 3, 0)
+        # The contents of a deleted course
+        Course.objects.get(id=self.course.id).delete()
+        self.assertFalse(Content.objects.filter(module=module).exists())
+
+    def test_students(self):
+        self.course.students.add(*self.students)
+        self.course.students.add(self.students[0])
+        self.assertCounters(2, 6, 3)
+        self.course.students.remove(self.students[0], self.students[0])
+        self.assertCounters(2, 6, 2)
+        self.course.students.clear()
+        self.assertCounters(2, 6, 0)
+
+        # From the users
+        other = seed_course(self.instructor)
+        for student in self.students:
+            student.courses_joined.add(self.course, other)
+        self.assertCounters(2, 6, 3)
+        self.students[0].courses_joined.remove(self.course)
+        self.assertCounters(2, 6, 2)
+        self.students[1].courses_joined.clear()
+        self.assertCounters(2, 6, 1)
+        self.assertEqual(Course.objects.get(id=other.id).student_count, 2)
+        self.students[2].delete()
+        self.assertCounters(2, 6, 0)
+
+    def test_save_keeps_counters(self):
+        course = Course.objects.get(id=self.course.id)
+        Module.objects.create(course=self.course, title='Module 2')
+        course.title = 'Renamed'
+        course.save()
+        self.assertCounters(3, 6, 0)
+
+    def test_recount(self):
+        Course.objects.update(module_count=10, content_count=0,
+                              student_count=5)
+        Subject.objects.update(course_count=0)
+        out = StringIO()
+        call_command('recount_counters', stdout=out)
+        self.assertIn('Counters recounted', out.getvalue())
+        self.assertCounters(2, 6, 0)
+        self.assertCourseCount(self.subject, 1)
+
+    def test_templates(self):
+        response = self.client.get(reverse('course_list'))
+        self.assertContains(response, '1 courses')
+        self.assertContains(response, '2 modules.')
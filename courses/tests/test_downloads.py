@@ -0,0 +1,162 @@
+import shutil
+import tempfile
+
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+
+from courses.models import Content, File, Image
+from courses.downloads import parse_range
+from courses.tests.utils import create_instructor, seed_course
+
+DATA = bytes(range(256)) * 1024
+
+
+class ParseRangeTest(SimpleTestCase):
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=900-5000', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-5000', 1000), (0, 999))
+        # Several ranges or an unknown unit get the whole file
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 1000))
+        self.assertIsNone(parse_range('items=0-1', 1000))
+        for header in ('bytes=1000-', 'bytes=5-4', 'bytes=-0'):
+            with self.assertRaises(ValueError):
+                parse_range(header, 1000)
+
+
+@override_settings(DOWNLOAD_CHUNK_SIZE=4096)
+class ItemDownloadViewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(ItemDownloadViewTest, cls).setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root)
+        super(ItemDownloadViewTest, cls).tearDownClass()
+
+    def setUp(self):
+        self.instructor = create_instructor()
+        self.student = User.objects.create_user(username='student')
+        self.course = seed_course(self.instructor, students=[self.student])
+        self.item = File(owner=self.instructor, title='Lecture')
+        self.item.file.save('lecture.pdf', ContentFile(DATA))
+        Content.objects.create(module=self.course.modules.get(),
+                               item=self.item)
+        self.url = reverse('courses:item_download',
+                           args=['file', self.item.id])
+
+    def get(self, user=None, **headers):
+        self.client.force_login(user or self.student)
+        return self.client.get(self.url, **headers)
+
+    def test_download(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), DATA)
+        self.assertEqual(response['Content-Length'], str(len(DATA)))
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertTrue(response['Content-Disposition'].startswith(
+            'attachment'))
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_owner(self):
+        response = self.get(self.instructor)
+        self.assertEqual(response.status_code, 200)
+
+    def test_not_enrolled(self):
+        other = User.objects.create_user(username='other')
+        self.assertEqual(self.get(other).status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    @override_settings(ENROLLMENT_CACHE_TIMEOUT=60)
+    def test_enrolled_course_ids(self):
+        self.assertEqual(self.get().status_code, 200)
+        # The session, the user and the item, the enrolled course ids
+        # from the cache
+        with self.assertNumQueries(4):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.course.students.remove(self.student)
+        self.assertEqual(self.get().status_code, 404)
+
+    def test_unknown_model(self):
+        self.client.force_login(self.student)
+        response = self.client.get(
+            reverse('courses:item_download', args=['text', self.item.id]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_range(self):
+        response = self.get(HTTP_RANGE='bytes=1000-9999')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content),
+                         DATA[1000:10000])
+        self.assertEqual(response['Content-Range'],
+                         'bytes 1000-9999/{}'.format(len(DATA)))
+        self.assertEqual(response['Content-Length'], '9000')
+
+    def test_unsatisfiable_range(self):
+        response = self.get(HTTP_RANGE='bytes={}-'.format(len(DATA)))
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'],
+                         'bytes */{}'.format(len(DATA)))
+
+    def test_if_range(self):
+        etag = self.get()['ETag']
+        response = self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        response = self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_none_match(self):
+        etag = self.get()['ETag']
+        self.assertEqual(
+            self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # A new file changes the ETag
+        self.item.file.save('lecture-v2.pdf', ContentFile(DATA[:10]))
+        self.assertEqual(
+            self.get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @override_settings(DOWNLOAD_BACKEND='x-accel-redirect')
+    def test_x_accel_redirect(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['X-Accel-Redirect'],
+                         '/protected-media/' + self.item.file.name)
+
+    @override_settings(DOWNLOAD_BACKEND='x-sendfile')
+    def test_x_sendfile(self):
+        response = self.get()
+        self.assertEqual(response['X-Sendfile'], self.item.file.path)
+
+    def test_image_inline(self):
+        image = Image(owner=self.instructor, title='Diagram')
+        image.file.save('diagram.png', ContentFile(b'png'))
+        self.client.force_login(self.instructor)
+        response = self.client.get(
+            reverse('courses:item_download', args=['image', image.id]))
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertTrue(response['Content-Disposition'].startswith('inline'))
+
+    def test_image_not_inline(self):
+        # Not shown as a page of the site
+        for name in ('page.html', 'drawing.svg', 'unknown'):
+            image = Image(owner=self.instructor, title='Diagram')
+            image.file.save(name, ContentFile(b'<script></script>'))
+            self.client.force_login(self.instructor)
+            response = self.client.get(
+                reverse('courses:item_download', args=['image', image.id]))
+            self.assertEqual(response['Content-Type'],
+                             'application/octet-stream')
+            self.assertTrue(
+                response['Content-Disposition'].startswith('attachment'))
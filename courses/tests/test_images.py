@@ -0,0 +1,157 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+
+from PIL import Image as PILImage
+
+from courses.models import Image
+from courses.images import make_variants, needs_variants, generate_variants
+from courses.tasks import make_image_variants
+from courses.tests.utils import create_instructor
+from jobs.models import Job
+
+
+def image_file(size, mode='RGBA', image_format='PNG'):
+    data = io.BytesIO()
+    PILImage.new(mode, size, 'red').save(data, image_format)
+    return ContentFile(data.getvalue())
+
+
+@override_settings(IMAGE_VARIANT_WIDTHS=(320, 640, 1280),
+                   IMAGE_VARIANT_FORMATS=('webp', 'jpeg'),
+                   IMAGE_THUMBNAIL_SIZE=(160, 160))
+class ImageVariantsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(ImageVariantsTest, cls).setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root)
+        super(ImageVariantsTest, cls).tearDownClass()
+
+    def setUp(self):
+        self.instructor = create_instructor()
+        self.image = Image(owner=self.instructor, title='Diagram')
+        self.image.file.save('diagram.png', image_file((2000, 1000)))
+
+    def open_variant(self, name):
+        return PILImage.open(os.path.join(self.media_root, name))
+
+    def test_make_variants(self):
+        width, height, variants = make_variants(self.media_root,
+                                                self.image.file.name,
+                                                (320, 640, 1280),
+                                                ('webp', 'jpeg'), (160, 160),
+                                                80)
+        self.assertEqual((width, height), (2000, 1000))
+        self.assertEqual(variants['source'], self.image.file.name)
+        self.assertEqual(variants['widths'], [320, 640, 1280])
+        self.assertEqual(len(variants['files']), 7)
+        with self.open_variant(variants['files']['webp-640']) as variant:
+            self.assertEqual(variant.format, 'WEBP')
+            self.assertEqual(variant.size, (640, 320))
+        with self.open_variant(variants['files']['jpeg-1280']) as variant:
+            self.assertEqual(variant.format, 'JPEG')
+            self.assertEqual(variant.size, (1280, 640))
+        with self.open_variant(variants['files']['thumbnail']) as variant:
+            self.assertEqual(variant.size, (160, 80))
+
+    def test_no_upscale(self):
+        self.image.file.save('small.jpeg', image_file((100, 50), 'RGB',
+                                                      'JPEG'))
+        width, height, variants = make_variants(self.media_root,
+                                                self.image.file.name,
+                                                (320, 640), ('jpeg', ),
+                                                (160, 160), 80)
+        self.assertEqual(variants['widths'], [100])
+        self.assertEqual(set(variants['files']), {'thumbnail', 'jpeg-100'})
+
+    def test_same_stem(self):
+        other = Image(owner=self.instructor, title='Photo')
+        other.file.save('diagram.jpeg',
+                        image_file((1000, 500), 'RGB', 'JPEG'))
+        generate_variants(self.image)
+        generate_variants(other)
+        self.image.refresh_from_db()
+        other.refresh_from_db()
+        files = self.image.variants['files']
+        other_files = other.variants['files']
+        self.assertFalse(set(files.values()) & set(other_files.values()))
+        with self.open_variant(files['webp-1280']) as variant:
+            self.assertEqual(variant.size, (1280, 640))
+        with self.open_variant(other_files['thumbnail']) as variant:
+            self.assertEqual(variant.size, (160, 80))
+
+    def test_generate_variants(self):
+        updated = self.image.updated
+        self.assertTrue(needs_variants(self.image))
+        generate_variants(self.image)
+        self.image.refresh_from_db()
+        self.assertEqual((self.image.width, self.image.height), (2000, 1000))
+        self.assertFalse(needs_variants(self.image))
+        # The cached rendering of the image is replaced
+        self.assertGreater(self.image.updated, updated)
+
+        html = self.image.render()
+        self.assertIn('loading="lazy"', html)
+        self.assertIn('width="2000" height="1000"', html)
+        self.assertIn(
+            '{} 640w'.format(
+                reverse('courses:item_download_variant',
+                        args=['image', self.image.id, 'webp-640'])), html)
+        self.assertIn('image/webp', html)
+
+    def test_not_an_image(self):
+        self.image.file.save('notes.png', ContentFile(b'not an image'))
+        generate_variants(self.image)
+        self.image.refresh_from_db()
+        self.assertIn('error', self.image.variants)
+        self.assertIsNone(self.image.width)
+        # Not tried again for the same file
+        self.assertFalse(needs_variants(self.image))
+        self.assertNotIn('srcset', self.image.render())
+
+    def test_queued_on_upload(self):
+        jobs = Job.objects.filter(name=make_image_variants.job_name)
+        self.assertEqual(jobs.get().kwargs, {'image_id': self.image.id})
+        make_image_variants(image_id=self.image.id)
+        self.image.refresh_from_db()
+        self.assertEqual(self.image.width, 2000)
+        # Not queued again until a new file is uploaded
+        jobs.delete()
+        self.image.title = 'New title'
+        self.image.save()
+        self.assertFalse(jobs.exists())
+        self.image.file.save('photo.png', image_file((10, 10)))
+        self.assertTrue(jobs.exists())
+
+    def test_download_variant(self):
+        generate_variants(self.image)
+        self.client.force_login(self.instructor)
+        response = self.client.get(
+            reverse('courses:item_download_variant',
+                    args=['image', self.image.id, 'webp-320']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        response = self.client.get(
+            reverse('courses:item_download_variant',
+                    args=['image', self.image.id, 'webp-4000']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('make_image_variants', stdout=out)
+        self.assertIn('1 images processed', out.getvalue())
+        call_command('make_image_variants', stdout=out)
+        self.assertIn('0 images processed', out.getvalue())
@@ -1,8 +1,11 @@
-from django.test import TestCase
+import threading
+
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
 from django.contrib.auth.models import User
+from django.db import connection
 # from django.urls import reverse
 
-from courses.models import Subject, Course, Module, Text
+from courses.models import Subject, Course, Module, Content, Text, Video
 
 
 class SubjectModelTest(TestCase):
@@ -207,6 +210,23 @@ class ModuleModelTest(TestCase):
 
         self.assertEqual(module5.order, 0)
 
+    def test_bulk_create_ordering(self):
+        course2 = Course.objects.create(subject=self.subject1,
+                                        owner=self.user,
+                                        title='Course 2',
+                                        slug='course-2')
+        modules = [
+            Module(course=course, title='Module')
+            for course in [self.course1, course2, self.course1]
+        ] + [Module(course=course2, title='Module', order=7)]
+        # One query allocates the orders of every course, plus the
+        # lock of the courses
+        with self.assertNumQueries(3):
+            Module.objects.bulk_create(modules)
+        self.assertEqual([m.order for m in modules], [1, 0, 2, 7])
+        module = Module.objects.create(course=course2, title='Module')
+        self.assertEqual(module.order, 8)
+
 
 class ContentModelTest(TestCase):
     @classmethod
@@ -234,3 +254,82 @@ class ContentModelTest(TestCase):
     def test_render_correct_template(self):
         self.assertEquals(self.text_content.render(),
                           '<p>A long text content.</p>')
+
+    def test_with_items(self):
+        subject = Subject.objects.get(id=self.subject1_id)
+        course = Course.objects.create(subject=subject,
+                                       owner=self.user,
+                                       title='Course 1',
+                                       slug='course-1')
+        module = Module.objects.create(course=course, title='Module 1')
+        items = [self.text_content]
+        for i in range(3):
+            items.append(
+                Video.objects.create(title='video {}'.format(i),
+                                     url='https://youtu.be/{}'.format(i),
+                                     owner=self.user))
+            items.append(
+                Text.objects.create(title='text {}'.format(i),
+                                    content='text',
+                                    owner=self.user))
+        for item in items:
+            Content.objects.create(module=module, item=item)
+
+        # One query for the contents and one by content type
+        with self.assertNumQueries(3):
+            contents = list(module.contents.with_items())
+            self.assertEqual([content.item for content in contents], items)
+
+
+class ConcurrentOrderingTest(TransactionTestCase):
+    # Needs a database that accepts concurrent connections: PostgreSQL, or
+    # SQLite with a test database in a file (see elearning/settings/
+    # local.py), the in-memory SQLite test database doesn't.
+
+    def insert_concurrently(self, threads=8):
+        user = User.objects.create(username="admin")
+        subject = Subject.objects.create(title='Programing',
+                                         slug='programing')
+        course = Course.objects.create(subject=subject,
+                                       owner=user,
+                                       title='Course 1',
+                                       slug='course-1')
+        module = Module.objects.create(course=course, title='Module 1')
+        barrier = threading.Barrier(threads)
+        errors = []
+
+        def insert():
+            try:
+                barrier.wait()
+                for i in range(25):
+                    text = Text.objects.create(title='text',
+                                               content='text',
+                                               owner=user)
+                    Content.objects.create(module=module, item=text)
+                Content.objects.bulk_create([
+                    Content(module=module, item=text) for i in range(25)
+                ])
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=insert) for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        orders = list(module.contents.values_list('order', flat=True))
+        self.assertEqual(orders, list(range(threads * 50)))
+
+    @skipUnlessDBFeature('test_db_allows_multiple_connections',
+                         'has_select_for_update')
+    def test_concurrent_inserts_get_distinct_orders(self):
+        self.insert_concurrently()
+
+    def test_concurrent_inserts_sqlite_file(self):
+        if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+            self.skipTest('Needs a SQLite test database in a file')
+        self.insert_concurrently()
@@ -0,0 +1,140 @@
+import warnings
+
+from django.core.cache.backends.base import CacheKeyWarning
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.core.cache import cache
+
+from courses.models import Subject, Course
+from courses.pagination import (paginate, encode_cursor, decode_cursor,
+                                InvalidCursor, NEXT)
+from courses.tests.utils import create_instructor, seed_course
+
+
+class KeysetPaginationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = create_instructor()
+        cls.subject = Subject.objects.create(title='Programing',
+                                             slug='programing')
+        for i in range(7):
+            seed_course(cls.instructor, modules=0, subject=cls.subject)
+        # Ties on created are broken by the id
+        Course.objects.update(created=timezone.now())
+        cls.ids = list(
+            Course.objects.order_by('-created',
+                                    '-id').values_list('id', flat=True))
+
+    def ids_of(self, page):
+        return [course.id for course in page]
+
+    def test_cursor(self):
+        course = Course.objects.first()
+        direction, created, id = decode_cursor(encode_cursor(NEXT, course))
+        self.assertEqual((direction, created, id),
+                         (NEXT, course.created, course.id))
+        for cursor in ['', 'abc', encode_cursor(NEXT, course)[:-4]]:
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(cursor)
+
+    def test_forward_and_backward(self):
+        courses = Course.objects.all()
+        page1 = paginate(courses, per_page=3)
+        self.assertEqual(self.ids_of(page1), self.ids[:3])
+        self.assertFalse(page1.has_previous())
+        page2 = paginate(courses, page1.next_cursor, per_page=3)
+        self.assertEqual(self.ids_of(page2), self.ids[3:6])
+        page3 = paginate(courses, page2.next_cursor, per_page=3)
+        self.assertEqual(self.ids_of(page3), self.ids[6:])
+        self.assertFalse(page3.has_next())
+
+        back = paginate(courses, page3.previous_cursor, per_page=3)
+        self.assertEqual(self.ids_of(back), self.ids[3:6])
+        self.assertTrue(back.has_previous())
+        back = paginate(courses, back.previous_cursor, per_page=3)
+        self.assertEqual(self.ids_of(back), self.ids[:3])
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_stable_when_courses_are_added(self):
+        courses = Course.objects.all()
+        page1 = paginate(courses, per_page=3)
+        seed_course(self.instructor, modules=0, subject=self.subject)
+        page2 = paginate(courses, page1.next_cursor, per_page=3)
+        self.assertEqual(self.ids_of(page2), self.ids[3:6])
+
+    def test_same_queries_for_every_page(self):
+        courses = Course.objects.all()
+        with self.assertNumQueries(1):
+            page = paginate(courses, per_page=2)
+        while page.has_next():
+            with self.assertNumQueries(1):
+                page = paginate(courses, page.next_cursor, per_page=2)
+
+    @override_settings(COURSES_PER_PAGE=3)
+    def test_catalog(self):
+        cache.clear()
+        other = seed_course(self.instructor, modules=0)
+        url = reverse('courses:course_list_subject', args=['programing'])
+        response = self.client.get(url)
+        page = response.context['courses']
+        self.assertEqual(self.ids_of(page), self.ids[:3])
+        self.assertContains(response, '?cursor={}'.format(page.next_cursor))
+
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {'cursor': page.next_cursor})
+        self.assertEqual(self.ids_of(response.context['courses']),
+                         self.ids[3:6])
+        # Cached per cursor
+        with self.assertNumQueries(0):
+            self.client.get(url, {'cursor': page.next_cursor})
+
+        response = self.client.get(reverse('course_list'))
+        self.assertEqual(self.ids_of(response.context['courses']),
+                         [other.id] + self.ids[:2])
+
+        response = self.client.get(url, {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_catalog_cursor_cache_key(self):
+        # Not a valid memcached key as is
+        url = reverse('courses:course_list_subject', args=['programing'])
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            for cursor in ['a cursor with spaces', 'a' * 300]:
+                response = self.client.get(url, {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+        self.assertFalse([
+            warning for warning in caught
+            if issubclass(warning.category, CacheKeyWarning)
+        ])
+
+    @override_settings(COURSES_PER_PAGE=3)
+    def test_manage_course_list(self):
+        self.client.login(username='instructor', password='B3nB3n256*')
+        url = reverse('courses:manage_course_list')
+        response = self.client.get(url)
+        page = response.context['page_obj']
+        self.assertTrue(response.context['is_paginated'])
+        self.assertEqual(self.ids_of(response.context['object_list']),
+                         self.ids[:3])
+        response = self.client.get(url, {'cursor': page.next_cursor})
+        self.assertEqual(self.ids_of(response.context['object_list']),
+                         self.ids[3:6])
+        response = self.client.get(url, {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(COURSES_PER_PAGE=3)
+    def test_student_course_list(self):
+        student = create_instructor(username='student')
+        for course in Course.objects.all():
+            course.students.add(student)
+        self.client.login(username='student', password='B3nB3n256*')
+        url = reverse('students:student_course_list')
+        page = self.client.get(url).context['page_obj']
+        response = self.client.get(url, {'cursor': page.next_cursor})
+        page = response.context['page_obj']
+        self.assertEqual(self.ids_of(page), self.ids[3:6])
+        self.assertContains(response,
+                            '?cursor={}'.format(page.previous_cursor))
@@ -0,0 +1,145 @@
+from django.test import TestCase, SimpleTestCase
+from django.urls import reverse
+
+from courses import urls
+from courses.models import Subject
+from courses.budget import QueryBudgetTestMixin, get_query_budget
+from courses.tests.utils import create_instructor, seed_course
+
+
+class QueryBudgetDeclaredTest(SimpleTestCase):
+    def test_every_view_has_a_budget(self):
+        for pattern in urls.urlpatterns:
+            self.assertIsNotNone(get_query_budget(pattern.callback),
+                                 '{} has no query budget'.format(pattern.name))
+
+
+class PublicViewsQueryBudgetTest(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = create_instructor()
+
+    def test_course_list(self):
+        def seed(size):
+            for i in range(size):
+                seed_course(self.instructor, modules=size, contents=0)
+            return reverse('course_list')
+
+        self.assertQueryBudgetScales(seed)
+
+    def test_course_list_subject(self):
+        subject = Subject.objects.create(title='Programing',
+                                         slug='programing')
+
+        def seed(size):
+            for i in range(size):
+                seed_course(self.instructor,
+                            modules=size,
+                            contents=0,
+                            subject=subject)
+            return reverse('courses:course_list_subject',
+                           args=[subject.slug])
+
+        self.assertQueryBudgetScales(seed)
+
+    def test_course_detail(self):
+        def seed(size):
+            course = seed_course(self.instructor, modules=size, contents=0)
+            return reverse('courses:course_detail', args=[course.slug])
+
+        self.assertQueryBudgetScales(seed)
+
+
+class InstructorViewsQueryBudgetTest(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = create_instructor()
+
+    def setUp(self):
+        self.client.force_login(self.instructor)
+
+    def test_manage_course_list(self):
+        def seed(size):
+            for i in range(size):
+                seed_course(self.instructor, modules=size, contents=0)
+            return reverse('courses:manage_course_list')
+
+        self.assertQueryBudgetScales(seed)
+
+    def test_course_create(self):
+        self.assertQueryBudget(reverse('courses:course_create'))
+
+    def test_course_edit_and_delete(self):
+        for name in ['courses:course_edit', 'courses:course_delete']:
+
+            def seed(size):
+                course = seed_course(self.instructor, modules=size)
+                return reverse(name, args=[course.id])
+
+            self.assertQueryBudgetScales(seed)
+
+    def test_course_module_update(self):
+        def seed(size):
+            course = seed_course(self.instructor, modules=size, contents=0)
+            return reverse('courses:course_module_update', args=[course.id])
+
+        self.assertQueryBudgetScales(seed)
+
+    def test_module_content_list(self):
+        def seed(size):
+            course = seed_course(self.instructor, modules=size, contents=size)
+            module = course.modules.first()
+            return reverse('courses:module_content_list', args=[module.id])
+
+        self.assertQueryBudgetScales(seed)
+
+    def test_module_content_create_and_update(self):
+        course = seed_course(self.instructor)
+        module = course.modules.get()
+        text = module.contents.get().item
+        self.assertQueryBudget(
+            reverse('courses:module_content_create',
+                    args=[module.id, 'text']))
+        self.assertQueryBudget(
+            reverse('courses:module_content_update',
+                    args=[module.id, 'text', text.id]))
+
+    def test_module_content_delete(self):
+        course = seed_course(self.instructor)
+        content = course.modules.get().contents.get()
+        self.assertQueryBudget(reverse('courses:module_content_delete',
+                                       args=[content.id]),
+                               method='post')
+
+    def test_module_order(self):
+        def seed(size):
+            course = seed_course(self.instructor, modules=size, contents=0)
+            modules = course.modules.all()
+            return reverse('courses:module_order'), {
+                m.id: i
+                for i, m in enumerate(reversed(modules))
+            }
+
+        self.assertOrderBudgetScales(seed)
+
+    def test_content_order(self):
+        def seed(size):
+            course = seed_course(self.instructor, modules=1, contents=size)
+            contents = course.modules.get().contents.all()
+            return reverse('courses:content_order'), {
+                c.id: i
+                for i, c in enumerate(reversed(contents))
+            }
+
+        self.assertOrderBudgetScales(seed)
+
+    def assertOrderBudgetScales(self, seed):
+        counts = {}
+        for size in self.budget_sizes:
+            url, data = seed(size)
+            counts[size] = self.assertQueryBudget(
+                url,
+                method='post',
+                data=data,
+                content_type='application/json')
+        self.assertEqual(len(set(counts.values())), 1, counts)
@@ -0,0 +1,84 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+
+from courses.models import Subject, Course, Module, Content, Text
+from courses.plans import QueryPlanTestMixin, plan_problems
+from courses.tests.utils import create_instructor
+
+SUBJECTS = 20
+COURSES = 2000
+MODULES = 4
+CONTENTS = 3
+
+
+class QueryPlanTest(QueryPlanTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Enough rows for the missing indexes to show in the plans
+        cls.instructor = create_instructor()
+        cls.student = User.objects.create_user(username='student',
+                                               password='B3nB3n256*')
+        # SQLite doesn't set the ids of the bulk created rows
+        Subject.objects.bulk_create(
+            Subject(title='Subject {}'.format(i), slug='subject-{}'.format(i))
+            for i in range(SUBJECTS))
+        subjects = list(Subject.objects.order_by('id'))
+        Course.objects.bulk_create(
+            Course(owner=cls.instructor,
+                   subject=subjects[i % SUBJECTS],
+                   title='Course {}'.format(i),
+                   slug='course-{}'.format(i),
+                   overview='') for i in range(COURSES))
+        courses = list(Course.objects.order_by('id'))
+        Module.objects.bulk_create(
+            Module(course=course, title='Module {}'.format(i), order=i)
+            for course in courses for i in range(MODULES))
+        modules = list(Module.objects.order_by('id')[:50])
+        Text.objects.bulk_create(
+            Text(owner=cls.instructor, title='Text', content='Text')
+            for i in range(len(modules) * CONTENTS))
+        texts = list(Text.objects.order_by('id'))
+        text_type = ContentType.objects.get_for_model(Text)
+        Content.objects.bulk_create(
+            Content(module=module,
+                    content_type=text_type,
+                    object_id=texts[i * CONTENTS + j].id,
+                    order=j) for i, module in enumerate(modules)
+            for j in range(CONTENTS))
+        cls.course = courses[0]
+        cls.course.students.add(cls.student)
+        cls.module = modules[0]
+
+    def test_plan_problems(self):
+        self.assertEqual(
+            plan_problems([
+                'SCAN courses_course', 'SCAN courses_subject',
+                'SEARCH courses_module USING INDEX x (course_id=?)',
+                'SCAN courses_course USING INDEX courses_course_created',
+                'USE TEMP B-TREE FOR ORDER BY', 'SCAN CONSTANT ROW'
+            ], allowed_scans=['courses_subject']),
+            ['SCAN courses_course', 'USE TEMP B-TREE FOR ORDER BY'])
+
+    def test_course_list(self):
+        self.assertIndexedQueries(reverse('course_list'),
+                                  allowed_scans=['courses_subject'])
+        self.assertIndexedQueries(
+            reverse('courses:course_list_subject', args=['subject-3']),
+            allowed_scans=['courses_subject'])
+
+    def test_manage_course_list(self):
+        self.client.login(username='instructor', password='B3nB3n256*')
+        self.assertIndexedQueries(reverse('courses:manage_course_list'))
+
+    def test_module_content_list(self):
+        self.client.login(username='instructor', password='B3nB3n256*')
+        self.assertIndexedQueries(
+            reverse('courses:module_content_list', args=[self.module.id]))
+
+    def test_student_course_detail(self):
+        self.client.login(username='student', password='B3nB3n256*')
+        self.assertIndexedQueries(
+            reverse('students:student_course_detail_module',
+                    args=[self.course.id, self.module.id]))
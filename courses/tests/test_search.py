@@ -0,0 +1,101 @@
+from io import StringIO
+
+from django.test import TestCase
+from django.urls import reverse
+from django.core.management import call_command
+
+from courses.models import Module, Content, Text, SearchDocument
+from courses.search import search, get_terms
+from courses.tests.utils import create_instructor, seed_course
+from jobs.worker import work_once
+
+
+def run_jobs():
+    while work_once():
+        pass
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        self.instructor = create_instructor()
+        self.course = seed_course(self.instructor, modules=0)
+        self.course.title = 'Python programming'
+        self.course.overview = 'Learn the basics of the language.'
+        self.course.save()
+        self.module = Module.objects.create(
+            course=self.course,
+            title='Decorators',
+            description='Functions wrapping functions in Python.')
+        self.text = Text.objects.create(
+            owner=self.instructor,
+            title='Closures',
+            content='A closure keeps the variables of its scope.')
+        Content.objects.create(module=self.module, item=self.text)
+        run_jobs()
+
+    def titles(self, query):
+        return [document.title for document in search(query)]
+
+    def test_get_terms(self):
+        self.assertEqual(get_terms('"Python" AND NOT (closures*)'),
+                         ['python', 'and', 'not', 'closures'])
+        self.assertEqual(get_terms('  '), [])
+
+    def test_indexed_from_signals(self):
+        self.assertEqual(SearchDocument.objects.count(), 3)
+        self.assertEqual(self.titles('closure variables'), ['Closures'])
+        self.assertEqual(self.titles('basics'), ['Python programming'])
+
+    def test_ranking(self):
+        # A match in the title ranks first
+        self.assertEqual(self.titles('python'),
+                         ['Python programming', 'Decorators'])
+
+    def test_stemming_and_prefix(self):
+        self.assertEqual(self.titles('wrapped'), ['Decorators'])
+        self.assertEqual(self.titles('decor'), ['Decorators'])
+
+    def test_incremental_updates(self):
+        self.module.title = 'Generators'
+        self.module.save()
+        run_jobs()
+        self.assertEqual(self.titles('decorators'), [])
+        self.assertEqual(self.titles('generators'), ['Generators'])
+
+        self.text.delete()
+        self.assertEqual(self.titles('closure'), [])
+        self.module.delete()
+        self.assertEqual(self.titles('generators'), [])
+        self.course.delete()
+        self.assertFalse(SearchDocument.objects.exists())
+
+    def test_unused_text_not_indexed(self):
+        Text.objects.create(owner=self.instructor,
+                            title='Draft',
+                            content='Not in a module')
+        run_jobs()
+        self.assertEqual(self.titles('draft'), [])
+
+    def test_rebuild_command(self):
+        SearchDocument.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_search_index', '--batch-size=2', stdout=out)
+        self.assertIn('3 documents indexed', out.getvalue())
+        self.assertEqual(self.titles('closure'), ['Closures'])
+
+    def test_search_view(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('courses:search'),
+                                       {'q': 'python'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r.title for r in response.context['results']],
+                         ['Python programming', 'Decorators'])
+        self.assertContains(response,
+                            reverse('courses:course_detail',
+                                    args=[self.course.slug]))
+        # The texts are only shown to the students
+        response = self.client.get(reverse('courses:search'),
+                                   {'q': 'closure'})
+        self.assertNotContains(response, 'variables of its scope')
+        response = self.client.get(reverse('courses:search'), {'q': ''})
+        self.assertEqual(response.context['results'], [])
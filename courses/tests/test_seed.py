@@ -0,0 +1,69 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+
+from django.test import TestCase, override_settings
+from django.core.management import call_command, CommandError
+
+from courses.models import Subject, Course, Module, Content, SearchDocument
+from courses.seed import seed
+
+
+class SeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(SeedTest, cls).setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super(SeedTest, cls).tearDownClass()
+
+    def test_seed(self):
+        counts = seed(subjects=2, instructors=2, courses=5, modules=3,
+                      contents=4, students=6, enrollments=2, batch_size=4,
+                      seed=1)
+        self.assertEqual(counts['courses'], 5)
+        self.assertEqual(Subject.objects.count(), 2)
+        self.assertEqual(Module.objects.count(), 15)
+        self.assertEqual(Content.objects.count(), 60)
+        self.assertEqual(Course.students.through.objects.count(), 12)
+        # Ordered contents, owned by the instructor of their course
+        for content in Content.objects.select_related('module__course'):
+            self.assertEqual(content.item.owner_id,
+                             content.module.course.owner_id)
+        self.assertEqual(
+            sorted(Content.objects.filter(module=Module.objects.first())
+                   .values_list('order', flat=True)), [0, 1, 2, 3])
+        self.assertEqual(SearchDocument.objects.filter(
+            module__isnull=True).count(), 5)
+
+        # Again on the same database
+        seed(subjects=1, instructors=1, courses=1, students=1)
+        self.assertEqual(Course.objects.count(), 6)
+
+    def test_bench(self):
+        with self.assertRaises(CommandError):
+            call_command('bench', stdout=StringIO())
+        call_command('seed', '--courses=3', '--students=3', '--modules=2',
+                     '--contents=4', '--seed=2', '--no-index',
+                     stdout=StringIO())
+        out = StringIO()
+        call_command('bench', '--requests=3', stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['requests'], 3)
+        urls = report['urls']
+        self.assertNotIn('courses:sentry_debug', urls)
+        for name in ['courses:course_detail', 'courses:manage_course_list',
+                     'courses:module_content_list',
+                     'students:student_course_detail',
+                     'students:student_course_list']:
+            self.assertEqual(urls[name]['status'], 200, name)
+            self.assertLessEqual(urls[name]['p50_ms'], urls[name]['p99_ms'])
+            self.assertGreater(urls[name]['queries'], 0)
+            self.assertGreater(urls[name]['peak_memory_kb'], 0)
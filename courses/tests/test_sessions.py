@@ -0,0 +1,137 @@
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.contrib.auth.models import User, Group
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from courses.auth import CachedModelBackend
+from courses.sessions import SessionStore
+from courses.tests.utils import create_instructor
+
+
+class SessionStoreTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        session = SessionStore()
+        session['key'] = 'value'
+        session.save()
+        self.session_key = session.session_key
+
+    def test_read_from_cache(self):
+        session = SessionStore(self.session_key)
+        with self.assertNumQueries(0):
+            self.assertEqual(session['key'], 'value')
+        cache.clear()
+        session = SessionStore(self.session_key)
+        with self.assertNumQueries(1):
+            self.assertEqual(session['key'], 'value')
+
+    def test_unchanged_not_saved(self):
+        session = SessionStore(self.session_key)
+        session['key'] = 'value'
+        self.assertTrue(session.modified)
+        with self.assertNumQueries(0):
+            session.save()
+
+        session['key'] = 'other'
+        session.save()
+        # Written through to the database
+        cache.clear()
+        self.assertEqual(SessionStore(self.session_key)['key'], 'other')
+
+    @override_settings(SESSION_SAVE_EVERY_REQUEST=True)
+    def test_saved_every_request(self):
+        session = SessionStore(self.session_key)
+        session['key'] = 'value'
+        with self.assertNumQueries(3):
+            # The UPDATE in a savepoint
+            session.save()
+
+    def test_cycle_key(self):
+        session = SessionStore(self.session_key)
+        session.cycle_key()
+        self.assertNotEqual(session.session_key, self.session_key)
+        self.assertTrue(
+            Session.objects.filter(session_key=session.session_key).exists())
+        self.assertFalse(
+            Session.objects.filter(session_key=self.session_key).exists())
+
+
+# The sessions and users settings of production.py
+@override_settings(SESSION_ENGINE='courses.sessions',
+                   AUTHENTICATION_BACKENDS=[
+                       'courses.auth.CachedModelBackend',
+                       'django.contrib.auth.backends.ModelBackend',
+                   ])
+class CachedUserTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='student',
+                                             password='B3nB3n256*')
+        self.backend = CachedModelBackend()
+
+    def test_get_user(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.backend.get_user(self.user.id), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.id), self.user)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.backend.get_user(self.user.id))
+        self.user.delete()
+        self.assertIsNone(self.backend.get_user(self.user.id))
+
+    def test_logged_in_request(self):
+        self.client.login(username='student', password='B3nB3n256*')
+        url = reverse('students:student_course_list')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.context['user'], self.user)
+        tables = ('"django_session"', '"auth_user"')
+        self.assertFalse([
+            query['sql'] for query in queries
+            if any(table in query['sql'] for table in tables)
+        ])
+
+    def test_password_change_logs_out(self):
+        self.client.login(username='student', password='B3nB3n256*')
+        url = reverse('students:student_course_list')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.user.set_password('0th3r256*')
+        self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith(reverse('login')))
+
+    def test_logout(self):
+        self.client.login(username='student', password='B3nB3n256*')
+        url = reverse('students:student_course_list')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        session_key = self.client.session.session_key
+        self.client.post(reverse('logout'))
+        # The session is gone from the cache and the database
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = session_key
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_group_change(self):
+        create_instructor(username='other')
+        self.client.login(username='student', password='B3nB3n256*')
+        url = reverse('courses:course_create')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.user.groups.add(Group.objects.get(name='Instructors'))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_session_of_model_backend(self):
+        # Opened before the cached backend, still logged in
+        self.client.force_login(
+            self.user, 'django.contrib.auth.backends.ModelBackend')
+        url = reverse('students:student_course_list')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.client.login(username='student', password='B3nB3n256*')
+        self.assertEqual(self.client.session[BACKEND_SESSION_KEY],
+                         'courses.auth.CachedModelBackend')
@@ -1,7 +1,9 @@
 from django.test import TestCase
-from django.contrib.auth.models import User
+from django.contrib.auth.models import User, Group, Permission, AnonymousUser
+from django.core.cache import cache
 
-from courses.templatetags.course import model_name
+from courses.templatetags.course import model_name, has_group
+from courses.membership import user_has_perms
 from courses.models import Subject, Course, Module
 
 
@@ -37,3 +39,50 @@ class ModelNameTest(TestCase):
         name = model_name(self.subject1)
         self.assertEquals(name, self.subject1._meta.model_name)
         self.assertEquals(None, model_name(no_meta))
+
+
+class HasGroupTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(name='Instructors')
+        self.user = User.objects.create(username='instructor')
+        self.user.groups.add(self.group)
+
+    def fresh_user(self):
+        # The user as loaded by the next request
+        return User.objects.get(id=self.user.id)
+
+    def test_has_group(self):
+        self.assertTrue(has_group(self.user, 'Instructors'))
+        self.assertFalse(has_group(self.user, 'Students'))
+        self.assertFalse(has_group(AnonymousUser(), 'Instructors'))
+
+    def test_resolved_once(self):
+        user = self.fresh_user()
+        with self.assertNumQueries(2):
+            has_group(user, 'Instructors')
+            has_group(user, 'Students')
+        # Next requests read the cache
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertTrue(has_group(user, 'Instructors'))
+
+    def test_invalidated_by_group_changes(self):
+        self.assertTrue(has_group(self.fresh_user(), 'Instructors'))
+        self.user.groups.remove(self.group)
+        self.assertFalse(has_group(self.fresh_user(), 'Instructors'))
+        self.group.user_set.add(self.user)
+        self.assertTrue(has_group(self.fresh_user(), 'Instructors'))
+        self.group.user_set.clear()
+        self.assertFalse(has_group(self.fresh_user(), 'Instructors'))
+
+    def test_permissions(self):
+        self.assertFalse(
+            user_has_perms(self.fresh_user(), ['courses.add_course']))
+        self.group.permissions.add(
+            Permission.objects.get(codename='add_course'))
+        self.assertTrue(
+            user_has_perms(self.fresh_user(), ['courses.add_course']))
+        self.assertFalse(
+            user_has_perms(self.fresh_user(),
+                           ['courses.add_course', 'courses.delete_course']))
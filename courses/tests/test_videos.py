@@ -0,0 +1,79 @@
+from io import StringIO
+from unittest import mock
+
+from django.test import TestCase
+from django.core.management import call_command
+
+from courses.models import Video
+from courses.tests.utils import create_instructor
+
+YOUTUBE = 'https://www.youtube.com/watch?v=jNQXAC9IVRw'
+
+
+class VideoEmbedTest(TestCase):
+    def setUp(self):
+        self.instructor = create_instructor()
+
+    def create_video(self, url=YOUTUBE):
+        return Video.objects.create(owner=self.instructor,
+                                    title='Video',
+                                    url=url)
+
+    def test_computed_on_save(self):
+        video = self.create_video()
+        self.assertEqual(video.embed_backend, 'YoutubeBackend')
+        self.assertEqual(video.embed_id, 'jNQXAC9IVRw')
+        self.assertTrue(
+            video.embed_url.startswith('https://www.youtube.com/embed/'))
+        self.assertIn('<iframe width="640" height="480"', video.embed_html)
+
+        video.url = 'https://vimeo.com/76979871'
+        video.save()
+        video.refresh_from_db()
+        self.assertEqual(video.embed_backend, 'VimeoBackend')
+        self.assertEqual(video.embed_id, '76979871')
+
+    def test_computed_when_url_changes(self):
+        video = Video.objects.get(id=self.create_video().id)
+        with mock.patch('courses.models.embed_fields') as compute:
+            video.title = 'Other'
+            video.save()
+            video.save(update_fields=['title'])
+        compute.assert_not_called()
+
+        video.url = 'https://vimeo.com/76979871'
+        video.save(update_fields=['url'])
+        video.refresh_from_db()
+        self.assertEqual(video.embed_backend, 'VimeoBackend')
+        with mock.patch('courses.models.embed_fields') as compute:
+            video.save()
+        compute.assert_not_called()
+
+    def test_unknown_backend(self):
+        video = self.create_video('https://example.com/video')
+        self.assertEqual(video.embed_html, '')
+        self.assertIn('href="https://example.com/video"', video.render())
+
+    def test_render_stored_markup(self):
+        video = Video.objects.get(id=self.create_video().id)
+        with mock.patch('courses.videos.detect_backend') as detect:
+            html = video.render()
+        detect.assert_not_called()
+        self.assertIn(video.embed_html, html)
+
+    def test_backfill_command(self):
+        for i in range(5):
+            self.create_video()
+        self.create_video('https://example.com/video')
+        Video.objects.update(embed_backend='', embed_id='', embed_url='',
+                             embed_html='')
+        out = StringIO()
+        call_command('backfill_video_embeds', '--batch-size=2', stdout=out)
+        self.assertIn('6 videos processed', out.getvalue())
+        self.assertEqual(
+            Video.objects.filter(embed_backend='YoutubeBackend').count(), 5)
+        # Only the videos without embedding, unless --all
+        call_command('backfill_video_embeds', stdout=out)
+        self.assertIn('1 videos processed', out.getvalue())
+        call_command('backfill_video_embeds', '--all', stdout=out)
+        self.assertIn('6 videos processed', out.getvalue())
@@ -9,6 +9,7 @@ from django.contrib.auth.models import User, Group, Permission
 # from django.contrib.staticfiles.testing import StaticLiveServerTestCase
 
 from courses.models import Subject, Course
+from courses.tests.utils import create_instructor, seed_course
 
 
 class CourseListViewTest(TestCase):
@@ -216,6 +217,57 @@ class ManageCourseListViewTest(TestCase):
                                 'courses/manage/course/manage_list.html')
 
 
+class OrderViewsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = create_instructor()
+        cls.other = create_instructor(username='other')
+        cls.course = seed_course(cls.instructor, modules=3, contents=3)
+        cls.other_course = seed_course(cls.other, modules=1)
+
+    def setUp(self):
+        self.client.login(username='instructor', password='B3nB3n256*')
+
+    def post_json(self, name, data):
+        return self.client.post(reverse(name),
+                                data,
+                                content_type='application/json')
+
+    def test_module_order(self):
+        modules = list(self.course.modules.all())
+        orders = {str(m.id): i for i, m in enumerate(reversed(modules))}
+        response = self.post_json('courses:module_order', orders)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'saved': 'OK', 'order': orders})
+        self.assertEqual(list(self.course.modules.all()),
+                         list(reversed(modules)))
+
+    def test_content_order(self):
+        module = self.course.modules.first()
+        contents = list(module.contents.all())
+        orders = {c.id: i for i, c in enumerate(reversed(contents))}
+        response = self.post_json('courses:content_order', orders)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(module.contents.all()), list(reversed(contents)))
+
+    def test_foreign_ids_rejected(self):
+        modules = list(self.course.modules.all())
+        other_module = self.other_course.modules.get()
+        orders = {m.id: 5 for m in modules}
+        orders[other_module.id] = 0
+        response = self.post_json('courses:module_order', orders)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()['ids'], [other_module.id])
+        # Nothing was applied
+        self.assertEqual([m.order for m in self.course.modules.all()],
+                         [0, 1, 2])
+
+    def test_invalid_payload(self):
+        for data in [['a'], {'a': 1}, {'1': -1}]:
+            response = self.post_json('courses:module_order', data)
+            self.assertEqual(response.status_code, 400)
+
+
 # Some functionnals tests with selenium
 
 # class SeleniumTest(StaticLiveServerTestCase):
@@ -0,0 +1,48 @@
+from itertools import count
+
+from django.contrib.auth.models import User, Group, Permission
+
+from courses.models import Subject, Course, Module, Content, Text
+
+_sequence = count()
+
+
+def create_instructor(username='instructor', password='B3nB3n256*'):
+    # An user in the Instructors group with the courses permissions
+    group, created = Group.objects.get_or_create(name='Instructors')
+    if created:
+        group.permissions.set(
+            Permission.objects.filter(codename__in=[
+                'add_course', 'change_course', 'delete_course'
+            ]))
+    instructor = User.objects.create_user(username=username,
+                                          password=password)
+    instructor.groups.add(group)
+    return instructor
+
+
+def seed_course(owner, modules=1, contents=1, students=(), subject=None):
+    """
+    Create a course with the given number of modules,
+    each module holding the given number of text contents.
+    """
+    n = next(_sequence)
+    if subject is None:
+        subject = Subject.objects.create(title='Subject {}'.format(n),
+                                         slug='subject-{}'.format(n))
+    course = Course.objects.create(owner=owner,
+                                   subject=subject,
+                                   title='Course {}'.format(n),
+                                   slug='course-{}'.format(n),
+                                   overview='Overview')
+    for i in range(modules):
+        module = Module.objects.create(course=course,
+                                       title='Module {}'.format(i))
+        for j in range(contents):
+            text = Text.objects.create(owner=owner,
+                                       title='Text {}'.format(j),
+                                       content='Content {}'.format(j))
+            Content.objects.create(module=module, item=text)
+    for student in students:
+        course.students.add(student)
+    return course
@@ -1,9 +1,13 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import api, async_views, views
 
 app_name = 'courses'
 
+# The public read views, async under an ASGI server
+read_views = async_views if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
     # Courses urls
     path('my_courses/',
@@ -14,11 +18,17 @@ urlpatterns = [
     path('<pk>/delete/',
          views.CourseDeleteView.as_view(),
          name='course_delete'),
+    path('<pk>/clone/', views.CourseCloneView.as_view(),
+         name='course_clone'),
+    path('<pk>/students/import/',
+         views.CourseStudentsImportView.as_view(),
+         name='course_students_import'),
     path('subject/<slug:subject>/',
-         views.CourseListView.as_view(),
+         read_views.CourseListView.as_view(),
          name='course_list_subject'),
+    path('search/', views.SearchView.as_view(), name='search'),
     path('<slug:slug>/',
-         views.CourseDetailView.as_view(),
+         read_views.CourseDetailView.as_view(),
          name='course_detail'),
 
     # Modules & Contents urls
@@ -37,6 +47,23 @@ urlpatterns = [
     path('content/<int:id>/delete/',
          views.ContentDeleteView.as_view(),
          name='module_content_delete'),
+    path('content/<model_name>/<int:id>/download/',
+         views.ItemDownloadView.as_view(),
+         name='item_download'),
+    path('content/<model_name>/<int:id>/download/<variant>/',
+         views.ItemDownloadView.as_view(),
+         name='item_download_variant'),
+
+    # Read-only JSON API (see courses/api.py)
+    path('api/subjects/',
+         api.SubjectListApiView.as_view(),
+         name='api_subject_list'),
+    path('api/subjects/<slug:subject>/courses/',
+         api.CourseListApiView.as_view(),
+         name='api_course_list'),
+    path('api/courses/<int:pk>/outline/',
+         api.CourseOutlineApiView.as_view(),
+         name='api_course_outline'),
 
     # Ajax json views
     path('module/order/', views.ModuleOrderView.as_view(),
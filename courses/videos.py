@@ -0,0 +1,43 @@
+"""
+Embedding of the Video items, computed once when a video is saved.
+
+django-embed-video's {% video %} tag detects the backend of the URL,
+parses the video id and renders the iframe on every rendering.
+embed_fields() does it once and the result is stored on the video
+(embed_backend, embed_id, embed_url and embed_html), so rendering a
+video only outputs the stored markup.
+"""
+
+import logging
+
+import requests
+from django.conf import settings
+from embed_video.backends import detect_backend, EmbedVideoException
+from embed_video.templatetags.embed_video_tags import VideoNode
+
+logger = logging.getLogger(__name__)
+
+EMBED_FIELDS = ['embed_backend', 'embed_id', 'embed_url', 'embed_html']
+
+NO_EMBED = dict.fromkeys(EMBED_FIELDS, '')
+
+
+def embed_fields(url):
+    """
+    Return the values of the embed fields for the video URL,
+    empty if no backend recognizes it.
+    """
+    try:
+        backend = detect_backend(url)
+        # The pages are served over HTTPS
+        backend.is_secure = True
+        width, height = VideoNode.get_size(settings.VIDEO_EMBED_SIZE)
+        return {
+            'embed_backend': backend.backend,
+            'embed_id': backend.code,
+            'embed_url': backend.url,
+            'embed_html': backend.get_embed_code(width=width, height=height),
+        }
+    except (EmbedVideoException, requests.RequestException) as e:
+        logger.warning('No embedding for the video %s: %r', url, e)
+        return NO_EMBED
@@ -1,20 +1,36 @@
+import csv
+import io
+
 from django.urls import reverse_lazy
 from django.views.generic.list import ListView
-from django.views.generic.detail import DetailView
-from django.views.generic.edit import CreateView, UpdateView, DeleteView
+from django.views.generic.detail import DetailView, SingleObjectMixin
+from django.views.generic.edit import (CreateView, UpdateView, DeleteView,
+                                       FormView)
 from django.views.generic.base import TemplateResponseMixin, View
 from django.shortcuts import redirect, get_object_or_404
-from django.contrib.auth.mixins import (LoginRequiredMixin,
-                                        PermissionRequiredMixin)
+from django.http import Http404
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.forms.models import modelform_factory
 from django.apps import apps
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
 
 from braces.views import CsrfExemptMixin, JsonRequestResponseMixin
 
-from courses.models import Course, Module, Content, Subject
-from courses.forms import ModuleFormSet
-from students.forms import CourseEnrollForm
+from courses.models import Course, Module, Content
+from courses.forms import ModuleFormSet, CourseCloneForm
+from courses.cache import get_catalog, touch_courses
+from courses.clone import COPY_TITLE, clone_course, copy_slug
+from courses.conditional import ConditionalGetMixin
+from courses.fragments import invalidate_fragment
+from courses.downloads import can_download, serve_item
+from courses.search import search
+from courses.pagination import KeysetPaginationMixin, InvalidCursor
+from courses.budget import query_budget
+from courses.membership import (PermissionRequiredMixin,
+                                get_enrolled_course_ids)
+from students.forms import CourseEnrollForm, EnrollmentImportForm
+from students.enrollment import bulk_enroll
 
 # CBV and Mixins for CMS features
 
@@ -46,28 +62,114 @@ class OwnerCourseEditMixin(OwnerCourseMixin, OwnerEditMixin):
     template_name = 'courses/manage/course/form.html'
 
 
-class ManageCourseListView(OwnerCourseMixin, ListView):
+class ManageCourseListView(OwnerCourseMixin, KeysetPaginationMixin,
+                           ListView):
+    query_budget = 5
     template_name = 'courses/manage/course/manage_list.html'
 
+    def get_queryset(self):
+        qs = super(ManageCourseListView, self).get_queryset()
+        # Id of the first module of each course
+        # for the "Manage contents" link
+        first_module = Module.objects.filter(
+            course=OuterRef('pk')).values('id')[:1]
+        return qs.annotate(first_module=Subquery(first_module))
+
 
 class CourseCreateView(OwnerCourseEditMixin, PermissionRequiredMixin,
                        CreateView):
+    query_budget = {'get': 5, 'post': 10}
     permission_required = 'courses.add_course'
 
 
 class CourseUpdateView(OwnerCourseEditMixin, PermissionRequiredMixin,
                        UpdateView):
+    query_budget = {'get': 6, 'post': 11}
     permission_required = 'courses.change_course'
 
 
 class CourseDeleteView(OwnerCourseMixin, PermissionRequiredMixin, DeleteView):
+    query_budget = {'get': 5, 'post': 13}
     template_name = 'courses/manage/course/delete.html'
     success_url = reverse_lazy('courses:manage_course_list')
     permission_required = 'courses.delete_course'
 
 
+# Copy a course with its modules and contents for a new term
+# (see courses/clone.py)
+class CourseCloneView(OwnerCourseMixin, PermissionRequiredMixin,
+                      SingleObjectMixin, FormView):
+    # The copy is made with a fixed number of queries whatever the size
+    # of the course, at most 4 content types of items
+    query_budget = {'get': 6, 'post': 40}
+    template_name = 'courses/manage/course/clone.html'
+    form_class = CourseCloneForm
+    permission_required = 'courses.add_course'
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return super(CourseCloneView, self).get(request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return super(CourseCloneView, self).post(request, *args, **kwargs)
+
+    def get_initial(self):
+        return {
+            'title': COPY_TITLE.format(self.object.title),
+            'slug': copy_slug(self.object.slug)
+        }
+
+    def form_valid(self, form):
+        clone = clone_course(self.object,
+                             owner=self.request.user,
+                             title=form.cleaned_data['title'],
+                             slug=form.cleaned_data['slug'])
+        return redirect('courses:course_edit', clone.id)
+
+
+# Enroll students in a course from a CSV file (see students/enrollment.py)
+class CourseStudentsImportView(LoginRequiredMixin, TemplateResponseMixin,
+                               View):
+    # The POST budget depends on the size of the file
+    query_budget = {'get': 5}
+    template_name = 'courses/manage/course/students_import.html'
+
+    def get_course(self, pk):
+        return get_object_or_404(Course, id=pk, owner=self.request.user)
+
+    def get(self, request, pk):
+        return self.render_to_response({
+            'course': self.get_course(pk),
+            'form': EnrollmentImportForm()
+        })
+
+    def post(self, request, pk):
+        course = self.get_course(pk)
+        form = EnrollmentImportForm(data=request.POST, files=request.FILES)
+        report = None
+        if form.is_valid():
+            lines = io.TextIOWrapper(form.cleaned_data['csv_file'].file,
+                                     encoding='utf-8-sig',
+                                     newline='')
+            try:
+                report = bulk_enroll(
+                    course,
+                    lines,
+                    create_missing=form.cleaned_data['create_missing'])
+            except (ValueError, csv.Error) as e:
+                # Also raised for files which aren't UTF-8
+                form.add_error('csv_file', str(e))
+        return self.render_to_response({
+            'course': course,
+            'form': form,
+            'report': report
+        })
+
+
 # Handles the formset to add, update, and delete modules for a specific course.
 class CourseModuleUpdateView(TemplateResponseMixin, View):
+    query_budget = 6
     template_name = 'courses/manage/module/formset.html'
     course = None
 
@@ -99,6 +201,7 @@ class CourseModuleUpdateView(TemplateResponseMixin, View):
 # More generic approach to create a view that handles creating or updating
 # objects of any content model. Here for create/edit content for module
 class ContentCreateUpdateView(TemplateResponseMixin, View):
+    query_budget = {'get': 6, 'post': 8}
     module = None
     model = None
     obj = None
@@ -136,6 +239,9 @@ class ContentCreateUpdateView(TemplateResponseMixin, View):
                              data=request.POST,
                              files=request.FILES)
         if form.is_valid():
+            if self.obj:
+                # Drop the rendered fragment of the edited item
+                invalidate_fragment(self.obj)
             obj = form.save(commit=False)
             obj.owner = request.user
             obj.save()
@@ -148,70 +254,181 @@ class ContentCreateUpdateView(TemplateResponseMixin, View):
 
 # List contents for a specific module
 class ModuleContentListView(TemplateResponseMixin, View):
+    # At most one query by content type for the items
+    query_budget = 11
     template_name = 'courses/manage/module/content_list.html'
 
     def get(self, request, module_id):
-        module = get_object_or_404(Module,
+        module = get_object_or_404(Module.objects.select_related('course'),
                                    id=module_id,
                                    course__owner=request.user)
-        return self.render_to_response({'module': module})
+        return self.render_to_response({
+            'module': module,
+            'contents': module.contents.with_items()
+        })
 
 
 # Delete a content
 class ContentDeleteView(View):
+    query_budget = 10
+
     def post(self, request, id):
         content = get_object_or_404(Content,
                                     id=id,
                                     module__course__owner=request.user)
         module = content.module
+        invalidate_fragment(content.item)
         content.item.delete()
+        # Touches the course and decrements its content count
         content.delete()
         return redirect('courses:module_content_list', module.id)
 
 
-# Ajax views to reorder courses modules and modules contents
-class ModuleOrderView(CsrfExemptMixin, JsonRequestResponseMixin, View):
-    def post(self, request):
-        for id, order in self.request_json.items():
-            Module.objects.filter(
-                id=id, course__owner=request.user).update(order=order)
-        return self.render_json_response({'saved': 'OK'})
+# Serve the File and Image items to their owner and to the students
+class ItemDownloadView(LoginRequiredMixin, View):
+    # The enrolled course ids of a student, unless cached
+    query_budget = 5
+    # model name: Content-Disposition attachment
+    models = {'file': True, 'image': False}
+
+    def get(self, request, model_name, id, variant=None):
+        if model_name not in self.models:
+            raise Http404('No item matches the given query.')
+        model = apps.get_model(app_label='courses', model_name=model_name)
+        item = get_object_or_404(model, id=id)
+        if not can_download(request.user, item):
+            raise Http404('No item matches the given query.')
+        file = None
+        if variant is not None:
+            # The resized images (see courses/images.py)
+            try:
+                file = item.variant_file(variant)
+            except (AttributeError, KeyError):
+                raise Http404('No variant matches the given query.')
+        return serve_item(request,
+                          item,
+                          attachment=self.models[model_name],
+                          file=file)
+
 
+# Ajax views to reorder courses modules and modules contents
+class OrderView(CsrfExemptMixin, JsonRequestResponseMixin, View):
+    """
+    Save the order of objects from a JSON object mapping their ids to
+    their new order. The ownership of all the objects is checked with one
+    query, then they are updated together in a transaction.
+    """
+    model = None
+    # Lookups from the model to the course and to its owner
+    course_lookup = None
+    owner_lookup = None
+    # BEGIN is executed as a query on SQLite
+    query_budget = 5
+
+    def get_orders(self):
+        try:
+            orders = {
+                int(id): int(order)
+                for id, order in self.request_json.items()
+            }
+        except (AttributeError, TypeError, ValueError):
+            return None
+        if any(order < 0 for order in orders.values()):
+            return None
+        return orders
 
-class ContentOrderView(CsrfExemptMixin, JsonRequestResponseMixin, View):
     def post(self, request):
-        for id, order in self.request_json.items():
-            Content.objects.filter(
-                id=id, module__course__owner=request.user).update(order=order)
-        return self.render_json_response({'saved': 'OK'})
+        orders = self.get_orders()
+        if orders is None:
+            return self.render_bad_request_response({
+                'error': 'Expected a JSON object mapping ids to orders.'
+            })
+        with transaction.atomic(savepoint=False):
+            owned = dict(
+                self.model.objects.filter(id__in=orders, **{
+                    self.owner_lookup: request.user
+                }).values_list('id', self.course_lookup))
+            foreign = sorted(set(orders) - set(owned))
+            if foreign:
+                return self.render_json_response(
+                    {
+                        'error': 'Unknown ids.',
+                        'ids': foreign
+                    }, status=403)
+            # One UPDATE ... CASE statement by batch
+            # (the whole payload in practice)
+            objs = [
+                self.model(id=id, order=order)
+                for id, order in orders.items()
+            ]
+            self.model.objects.bulk_update(objs, ['order'])
+        # bulk_update doesn't send the signals
+        touch_courses(owned.values())
+        return self.render_json_response({'saved': 'OK', 'order': orders})
+
+
+class ModuleOrderView(OrderView):
+    model = Module
+    course_lookup = 'course_id'
+    owner_lookup = 'course__owner'
+
+
+class ContentOrderView(OrderView):
+    model = Content
+    course_lookup = 'module__course_id'
+    owner_lookup = 'module__course__owner'
 
 
 # Publics views to let students views courses modules and enroll to courses
 
 
 class CourseListView(TemplateResponseMixin, View):
+    query_budget = 2
     # This view is used by two differents urls
     # (/ and 'course/subject/<slug:subject>/)
     model = Course
     template_name = 'courses/course/list.html'
 
     def get(self, request, subject=None):
-        subjects = Subject.objects.annotate(total_courses=Count('courses'))
-        courses = Course.objects.annotate(total_modules=Count('modules'))
-        if subject:
-            subject = get_object_or_404(Subject, slug=subject)
-            courses = courses.filter(subject=subject)
+        # The subjects, page of courses and rendered sidebar are cached
+        # per subject slug and cursor (see courses/cache.py)
+        try:
+            catalog = get_catalog(subject, request.GET.get('cursor'))
+        except InvalidCursor as e:
+            raise Http404(str(e))
+        if catalog is None:
+            raise Http404('No subject matches the given query.')
+        return self.render_to_response(catalog)
+
+
+# Public full text search of the courses, modules and texts
+class SearchView(TemplateResponseMixin, View):
+    query_budget = 2
+    template_name = 'courses/course/search.html'
+
+    def get(self, request):
+        query = request.GET.get('q', '').strip()
         return self.render_to_response({
-            'subjects': subjects,
-            'subject': subject,
-            'courses': courses
+            'query': query,
+            'results': search(query)
         })
 
 
-class CourseDetailView(DetailView):
+class CourseDetailView(ConditionalGetMixin, DetailView):
+    query_budget = 4
     model = Course
     template_name = 'courses/course/detail.html'
 
+    def get_last_modified_queryset(self):
+        return Course.objects.filter(slug=self.kwargs['slug'])
+
+    def get_etag_parts(self, user):
+        # The enroll form holds a token of the CSRF secret, a new one is
+        # set at each login. The enroll button becomes a link to the
+        # course once enrolled.
+        return (self.request.META.get('CSRF_COOKIE'),
+                sorted(get_enrolled_course_ids(user)))
+
     def get_context_data(self, **kwargs):
         # Include the enrollment form in the context
         # for rendering the templates.
@@ -222,6 +439,7 @@ class CourseDetailView(DetailView):
 
 
 # dumy error to test sentry
+@query_budget(0)
 def trigger_error(request):
     division_by_zero = 1 / 0
     division_by_zero = division_by_zero + 1
@@ -2,6 +2,9 @@
 ASGI config for elearning project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Set ASYNC_VIEWS in the settings it runs with: the catalog, course and player
+pages are then served by async views which don't block the event loop
+(see courses/async_views.py).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
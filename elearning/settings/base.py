@@ -26,13 +26,14 @@ ALLOWED_HOSTS = []
 
 # Application definition
 
+# The development only apps and middleware, such as the debug toolbar,
+# are added by the local settings.
 INSTALLED_APPS = [
-    # Django debug toolbar
-    'debug_toolbar',
     # Django embeded video
     'embed_video',
     'courses.apps.CoursesConfig',
     'students.apps.StudentsConfig',
+    'jobs.apps.JobsConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -49,8 +50,6 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    # Django debug toolbar
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
 ROOT_URLCONF = 'elearning.urls'
@@ -78,8 +77,8 @@ WSGI_APPLICATION = 'elearning.wsgi.application'
 
 AUTH_PASSWORD_VALIDATORS = [
     {
-        'NAME':
-        'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+        'NAME': ('django.contrib.auth.password_validation.'
+                 'UserAttributeSimilarityValidator'),
     },
     {
         'NAME':
@@ -119,3 +118,76 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 LOGIN_REDIRECT_URL = reverse_lazy('students:student_course_list')
 LOGOUT_REDIRECT_URL = reverse_lazy('course_list')
+
+# Cache
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'elearning',
+    }
+}
+
+# Lifetime of the cached catalog pages, they are also invalidated
+# whenever a subject, course or module changes.
+CATALOG_CACHE_TIMEOUT = 60 * 60
+
+# Rendered content items kept in each process, and the optional
+# shared cache (one of CACHES) holding them for all the processes.
+FRAGMENT_CACHE_SIZE = 1000
+FRAGMENT_CACHE_ALIAS = None
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Lifetime of the cached groups and permissions of the users
+ACCESS_CACHE_TIMEOUT = 5 * 60
+# Lifetime of the cached ids of the courses of the students, 0 to read
+# them from the database on each request. Only with a cache shared by
+# the processes (see production.py): they decide the access to the
+# courses.
+ENROLLMENT_CACHE_TIMEOUT = 0
+
+# Lifetime of the cached users of the sessions, with the
+# CachedModelBackend of courses/auth.py (see production.py)
+USER_CACHE_TIMEOUT = 5 * 60
+
+# Serving of the File and Image items (see courses/downloads.py).
+# None streams the files from Django, 'x-accel-redirect' (nginx) or
+# 'x-sendfile' (Apache, lighttpd) let the front-end server send them.
+# With nginx, DOWNLOAD_ACCEL_PREFIX is an internal location aliasing
+# MEDIA_ROOT.
+DOWNLOAD_BACKEND = None
+DOWNLOAD_ACCEL_PREFIX = '/protected-media/'
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Variants of the Image items (see courses/images.py)
+IMAGE_PROCESS_WORKERS = 2
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+IMAGE_VARIANT_FORMATS = ('webp', 'jpeg')
+IMAGE_VARIANT_QUALITY = 80
+IMAGE_THUMBNAIL_SIZE = (160, 160)
+
+# Job queue (see jobs/queue.py and jobs/worker.py)
+JOB_WORKER_THREADS = 4
+JOB_POLL_INTERVAL = 1
+JOB_MAX_ATTEMPTS = 5
+# Seconds before the first retry, doubled at each attempt
+JOB_RETRY_DELAY = 10
+# Seconds after which a running job is considered lost
+JOB_TIMEOUT = 60 * 60
+
+# Size of the embedded videos, one of django-embed-video's sizes
+# or WIDTHxHEIGHT
+VIDEO_EMBED_SIZE = 'medium'
+
+# Full text search (see courses/search.py)
+SEARCH_RESULTS = 20
+SEARCH_MAX_TERMS = 10
+
+# Courses on each page of the course lists (see courses/pagination.py)
+COURSES_PER_PAGE = 20
+
+# Serve the catalog, course and player pages with their async views
+# (see courses/async_views.py), for an ASGI server (see elearning/asgi.py)
+ASYNC_VIEWS = False
+# Threads running the queries of the async views (see courses/parallel.py)
+ASYNC_VIEW_THREADS = 8
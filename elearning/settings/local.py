@@ -9,10 +9,21 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # In a file: the concurrency tests need several connections
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
 # Django debug toolbar
+INSTALLED_APPS = ['debug_toolbar'] + INSTALLED_APPS
+MIDDLEWARE = MIDDLEWARE + ['debug_toolbar.middleware.DebugToolbarMiddleware']
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
+
+# Report the views running more SQL queries than their budget
+# (see courses/budget.py)
+MIDDLEWARE = ['courses.budget.QueryBudgetMiddleware'] + MIDDLEWARE
+QUERY_BUDGET_RAISE = False
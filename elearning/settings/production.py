@@ -0,0 +1,76 @@
+import os
+
+from .base import *
+
+# Read from the environment of the workers:
+# DJANGO_SECRET_KEY, DJANGO_ALLOWED_HOSTS (comma separated) and the
+# DATABASE_NAME, DATABASE_USER, DATABASE_PASSWORD, DATABASE_HOST and
+# DATABASE_PORT of the PostgreSQL database, MEMCACHED_LOCATION (comma
+# separated host:port) of the memcached servers.
+
+DEBUG = False
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',')
+    if host.strip()
+]
+
+# Persistent connections, reused by the requests of a worker for a
+# minute. Django checks a connection before reusing it when the previous
+# request got a database error, and drops it if it is unusable.
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('DATABASE_NAME', 'elearning'),
+        'USER': os.environ.get('DATABASE_USER', ''),
+        'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+        'HOST': os.environ.get('DATABASE_HOST', ''),
+        'PORT': os.environ.get('DATABASE_PORT', ''),
+        'CONN_MAX_AGE': 60,
+    },
+}
+
+# Templates compiled once by worker
+TEMPLATES = [
+    dict(TEMPLATES[0],
+         APP_DIRS=False,
+         OPTIONS=dict(TEMPLATES[0]['OPTIONS'],
+                      loaders=[
+                          ('django.template.loaders.cached.Loader', [
+                              'django.template.loaders.filesystem.Loader',
+                              'django.template.loaders.app_directories.Loader',
+                          ]),
+                      ])),
+]
+
+# Shared by the workers: a cache version bumped by one of them
+# (see courses/cache.py) invalidates the pages of all of them, a session
+# or user dropped by one of them (see courses/sessions.py and
+# courses/auth.py) is dropped for all. Out of the database, the cached
+# sessions and users save their queries.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': os.environ.get('MEMCACHED_LOCATION',
+                                   '127.0.0.1:11211').split(','),
+        'TIMEOUT': 60 * 60,
+    }
+}
+
+# Sessions and users of the requests read from the shared cache, the
+# sessions written through to the database (see courses/sessions.py and
+# courses/auth.py). Not with a local memory cache: a logout or a
+# password change would only reach one process.
+SESSION_ENGINE = 'courses.sessions'
+# ModelBackend for the sessions opened before the cached backend, their
+# users are loaded from the database until they log in again
+AUTHENTICATION_BACKENDS = [
+    'courses.auth.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# The enrolled course ids of the students (see courses/membership.py)
+ENROLLMENT_CACHE_TIMEOUT = 60 * 60
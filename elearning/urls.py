@@ -20,16 +20,15 @@ from django.contrib.auth import views as auth_views
 from django.conf import settings
 from django.conf.urls.static import static
 
-from courses.views import CourseListView
+from courses import async_views, views
 
-import debug_toolbar
+# The catalog, async under an ASGI server (see courses/async_views.py)
+read_views = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
     # We want to display the list of courses in the URL http://127.0.0.1:8000/
     # and all other URLs for the courses application have the /course/ prefix.
-    path('', CourseListView.as_view(), name='course_list'),
-    # Django debug toolbar
-    path('__debug__/', include(debug_toolbar.urls)),
+    path('', read_views.CourseListView.as_view(), name='course_list'),
     path('admin/', admin.site.urls),
     path('accounts/login/', auth_views.LoginView.as_view(), name='login'),
     path('accounts/logout/', auth_views.LogoutView.as_view(), name='logout'),
@@ -39,6 +38,11 @@ urlpatterns = [
     path('students/', include('students.urls')),
 ]
 
+# Django debug toolbar, only installed by the local settings
+if 'debug_toolbar' in settings.INSTALLED_APPS:
+    import debug_toolbar
+    urlpatterns += [path('__debug__/', include(debug_toolbar.urls))]
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL,
                           document_root=settings.MEDIA_ROOT)
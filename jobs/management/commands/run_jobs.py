@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs.worker import run_workers
+
+
+class Command(BaseCommand):
+    help = 'Run the queued jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes',
+                            type=int,
+                            default=1,
+                            help='Number of worker processes')
+        parser.add_argument('--threads',
+                            type=int,
+                            default=settings.JOB_WORKER_THREADS,
+                            help='Number of worker threads by process')
+        parser.add_argument('--burst',
+                            action='store_true',
+                            help='Exit once there is no job due')
+        parser.add_argument('--poll-interval',
+                            type=float,
+                            default=settings.JOB_POLL_INTERVAL,
+                            help='Seconds between two polls of the queue')
+
+    def handle(self, *args, **options):
+        run_workers(processes=options['processes'],
+                    threads=options['threads'],
+                    burst=options['burst'],
+                    poll_interval=options['poll_interval'])
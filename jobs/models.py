@@ -0,0 +1,43 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    A call of a registered function (see jobs/queue.py) to run by the
+    run_jobs workers. The done jobs are deleted, the failed ones kept.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = [(QUEUED, 'Queued'), (RUNNING, 'Running'), (FAILED, 'Failed')]
+
+    name = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict)
+    # Hash of the name and the arguments, the same job is only queued once
+    key = models.CharField(max_length=64)
+    status = models.CharField(max_length=10,
+                              choices=STATUSES,
+                              default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField()
+    # Not run before, pushed back after a failed attempt
+    run_at = models.DateTimeField(default=timezone.now)
+    started = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['run_at', 'id']
+        indexes = [models.Index(fields=['status', 'run_at'])]
+        constraints = [
+            models.UniqueConstraint(fields=['key'],
+                                    condition=Q(status='queued'),
+                                    name='jobs_job_unique_queued_key')
+        ]
+
+    def __str__(self):
+        return '{}({})'.format(
+            self.name,
+            ', '.join('{}={!r}'.format(k, v) for k, v in self.kwargs.items()))
@@ -0,0 +1,79 @@
+"""
+A small job queue stored in the database.
+
+A function decorated with @job is registered under its dotted name and
+gets a delay() method queuing a call with keyword arguments:
+
+    @job
+    def warm_catalog(subject_id=None):
+        ...
+
+    warm_catalog.delay(subject_id=subject.id)
+
+The arguments are stored as JSON. Queuing is a single INSERT done in the
+current transaction, so a job is only visible to the workers once the
+data it works on is committed, and queuing a job identical to one still
+waiting does nothing. The jobs are run by `manage.py run_jobs`
+(see jobs/worker.py) and retried with an exponential backoff.
+"""
+
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+
+from jobs.models import Job
+
+registry = {}
+
+
+def job_name(func):
+    return '{}.{}'.format(func.__module__, func.__qualname__)
+
+
+def job(func=None, max_attempts=None):
+    """
+    Register the function as a job. Usable with or without arguments:
+    @job or @job(max_attempts=1).
+    """
+    if func is None:
+        return lambda func: job(func, max_attempts=max_attempts)
+
+    name = job_name(func)
+    registry[name] = func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return func(*args, **kwargs)
+
+    def delay(**kwargs):
+        return enqueue(name, kwargs, max_attempts=max_attempts)
+
+    wrapper.delay = delay
+    wrapper.job_name = name
+    return wrapper
+
+
+def job_key(name, kwargs):
+    value = json.dumps([name, kwargs], sort_keys=True, default=str)
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def enqueue(name, kwargs=None, max_attempts=None, run_at=None):
+    """
+    Queue the call of the registered job name with kwargs.
+    Nothing is queued if the same call is already waiting.
+    """
+    if name not in registry:
+        raise KeyError('No job registered as {}'.format(name))
+    kwargs = kwargs or {}
+    job = Job(name=name,
+              kwargs=kwargs,
+              key=job_key(name, kwargs),
+              max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS)
+    if run_at is not None:
+        job.run_at = run_at
+    # The unique constraint on the key of the queued jobs
+    # makes the duplicates be ignored
+    Job.objects.bulk_create([job], ignore_conflicts=True)
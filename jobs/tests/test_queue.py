@@ -0,0 +1,114 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import job, enqueue
+from jobs.worker import work_once, requeue_stale_jobs, claim_job, run_job
+
+calls = []
+
+
+@job
+def record(value):
+    calls.append(value)
+
+
+@job(max_attempts=2)
+def fail(value):
+    raise ValueError(value)
+
+
+@override_settings(JOB_RETRY_DELAY=10, JOB_MAX_ATTEMPTS=5)
+class JobQueueTest(TestCase):
+    def setUp(self):
+        del calls[:]
+
+    def test_delay(self):
+        with self.assertNumQueries(1):
+            record.delay(value=1)
+        job = Job.objects.get()
+        self.assertEqual(job.name, 'jobs.tests.test_queue.record')
+        self.assertEqual(job.kwargs, {'value': 1})
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.max_attempts, 5)
+        # Still callable directly
+        record(2)
+        self.assertEqual(calls, [2])
+
+    def test_unknown_job(self):
+        with self.assertRaises(KeyError):
+            enqueue('jobs.tests.test_queue.unknown')
+
+    def test_deduplication(self):
+        record.delay(value=1)
+        record.delay(value=1)
+        record.delay(value=2)
+        self.assertEqual(Job.objects.count(), 2)
+        # A running job doesn't prevent queuing it again
+        claim_job()
+        record.delay(value=1)
+        self.assertEqual(Job.objects.filter(status=Job.QUEUED).count(), 2)
+
+    def test_work_once(self):
+        record.delay(value=1)
+        record.delay(value=2)
+        self.assertTrue(work_once())
+        self.assertTrue(work_once())
+        self.assertFalse(work_once())
+        self.assertEqual(calls, [1, 2])
+        # The done jobs are deleted
+        self.assertFalse(Job.objects.exists())
+
+    def test_not_due(self):
+        enqueue(record.job_name, {'value': 1},
+                run_at=timezone.now() + timedelta(minutes=1))
+        self.assertFalse(work_once())
+
+    def test_retry_with_backoff(self):
+        fail.delay(value='boom')
+        start = timezone.now()
+        self.assertTrue(work_once())
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('ValueError: boom', job.last_error)
+        self.assertGreaterEqual(job.run_at, start + timedelta(seconds=10))
+        # Not due yet
+        self.assertFalse(work_once())
+
+        Job.objects.update(run_at=timezone.now())
+        self.assertTrue(work_once())
+        job = Job.objects.get()
+        # max_attempts reached
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_retry_of_a_queued_again_job(self):
+        fail.delay(value='boom')
+        job = claim_job()
+        fail.delay(value='boom')
+        run_job(job)
+        # The failed attempt is dropped for the queued one
+        self.assertEqual(Job.objects.get().attempts, 0)
+
+    @override_settings(JOB_TIMEOUT=60)
+    def test_requeue_stale_jobs(self):
+        record.delay(value=1)
+        claim_job()
+        requeue_stale_jobs()
+        self.assertEqual(Job.objects.get().status, Job.RUNNING)
+        Job.objects.update(started=timezone.now() - timedelta(minutes=2))
+        requeue_stale_jobs()
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.last_error, 'Timed out')
+
+    def test_command(self):
+        for value in range(3):
+            record.delay(value=value)
+        call_command('run_jobs', '--burst', '--threads=1', stdout=StringIO())
+        self.assertEqual(calls, [0, 1, 2])
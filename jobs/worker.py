@@ -0,0 +1,180 @@
+"""
+The workers running the queued jobs (see jobs/queue.py).
+
+A worker claims a job with a conditional UPDATE of its status, so
+several threads and processes can poll the same table without locking
+it and a job is only run once. A job raising an exception is queued
+again JOB_RETRY_DELAY * 2 ** (attempts - 1) seconds later, until it has
+been attempted max_attempts times. The jobs left running by a worker
+that died are retried once they have been running for JOB_TIMEOUT
+seconds.
+"""
+
+import logging
+import multiprocessing
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import registry
+
+logger = logging.getLogger(__name__)
+
+
+def claim_job():
+    """
+    Mark the next job due as running and return it, or None
+    if there is none.
+    """
+    now = timezone.now()
+    due = Job.objects.filter(status=Job.QUEUED, run_at__lte=now)
+    # A few candidates, in case other workers take the first ones
+    for job_id in due.values_list('id', flat=True)[:10]:
+        claimed = Job.objects.filter(id=job_id, status=Job.QUEUED).update(
+            status=Job.RUNNING, started=now, attempts=F('attempts') + 1)
+        if claimed:
+            return Job.objects.get(id=job_id)
+    return None
+
+
+def retry_later(job, error):
+    if job.attempts >= job.max_attempts:
+        Job.objects.filter(id=job.id).update(status=Job.FAILED,
+                                             last_error=error)
+        return
+    delay = settings.JOB_RETRY_DELAY * 2**(job.attempts - 1)
+    try:
+        with transaction.atomic():
+            Job.objects.filter(id=job.id).update(
+                status=Job.QUEUED,
+                run_at=timezone.now() + timedelta(seconds=delay),
+                last_error=error)
+    except IntegrityError:
+        # The same job was queued again meanwhile, it will do the work
+        Job.objects.filter(id=job.id).delete()
+
+
+def run_job(job):
+    func = registry.get(job.name)
+    try:
+        if func is None:
+            raise LookupError('No job registered as {}'.format(job.name))
+        func(**job.kwargs)
+    except Exception:
+        logger.exception('Job %s failed', job)
+        retry_later(job, traceback.format_exc())
+    else:
+        Job.objects.filter(id=job.id).delete()
+
+
+def requeue_stale_jobs():
+    # The jobs of the dead workers
+    limit = timezone.now() - timedelta(seconds=settings.JOB_TIMEOUT)
+    for job in Job.objects.filter(status=Job.RUNNING, started__lt=limit):
+        retry_later(job, 'Timed out')
+
+
+def work_once():
+    """
+    Run the next job due. Return False if there was none.
+    """
+    job = claim_job()
+    if job is None:
+        return False
+    run_job(job)
+    return True
+
+
+def work(stop, burst=False, poll_interval=None):
+    """
+    Run the jobs until stop is set or, in burst mode,
+    until there is no job due.
+    """
+    if poll_interval is None:
+        poll_interval = settings.JOB_POLL_INTERVAL
+    while not stop.is_set():
+        if not work_once():
+            if burst:
+                break
+            requeue_stale_jobs()
+            stop.wait(poll_interval)
+
+
+def _thread_main(stop, burst, poll_interval):
+    try:
+        work(stop, burst, poll_interval)
+    finally:
+        # Each thread has its own connection
+        connection.close()
+
+
+def run_threads(threads, stop, burst=False, poll_interval=None):
+    if threads == 1:
+        work(stop, burst, poll_interval)
+        return
+    workers = [
+        threading.Thread(target=_thread_main,
+                         args=(stop, burst, poll_interval),
+                         name='jobs-worker-{}'.format(i),
+                         daemon=True) for i in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            # With a timeout, to get KeyboardInterrupt in the main thread
+            while worker.is_alive():
+                worker.join(0.5)
+    except KeyboardInterrupt:
+        # Let the threads finish their current job
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+
+def _process_main(threads, stop, burst, poll_interval):
+    import django
+    # Needed by the spawn start method
+    django.setup()
+    try:
+        run_threads(threads, stop, burst, poll_interval)
+    except KeyboardInterrupt:
+        stop.set()
+
+
+def run_workers(processes=1, threads=1, burst=False, poll_interval=None):
+    """
+    Run the jobs with the given number of processes, each running
+    the given number of threads.
+    """
+    requeue_stale_jobs()
+    if processes == 1:
+        stop = threading.Event()
+        try:
+            run_threads(threads, stop, burst, poll_interval)
+        except KeyboardInterrupt:
+            stop.set()
+        return
+    # The children must not share the connection of the parent
+    connection.close()
+    stop = multiprocessing.Event()
+    children = [
+        multiprocessing.Process(target=_process_main,
+                                args=(threads, stop, burst, poll_interval))
+        for i in range(processes)
+    ]
+    for child in children:
+        child.start()
+    try:
+        for child in children:
+            child.join()
+    except KeyboardInterrupt:
+        stop.set()
+        for child in children:
+            child.join()
@@ -0,0 +1,54 @@
+"""
+Async version of the course player, for an ASGI server
+(see courses/async_views.py).
+"""
+
+from functools import partial
+
+from django.utils.cache import get_conditional_response
+from django.views.generic.base import View
+
+from courses.conditional import page_validators, set_page_validators
+from courses.parallel import AsyncViewMixin, run, gather, load_user
+
+from students import views
+from students.player import (get_course, get_modules, get_contents,
+                             make_player, parse_module_id)
+
+
+class StudentCourseDetailView(AsyncViewMixin, views.StudentCourseDetailView):
+    def dispatch(self, request, *args, **kwargs):
+        # The dispatch() of LoginRequiredMixin and ConditionalGetMixin
+        # query the database, get() does their checks itself
+        return View.dispatch(self, request, *args, **kwargs)
+
+    async def get(self, request, pk, module_id=None):
+        user = await run(load_user, request)
+        if not user.is_authenticated:
+            return self.handle_no_permission()
+        # The enrollment first, nothing else is loaded for a 304
+        course = await run(get_course, user, pk)
+        etag, timestamp = page_validators(course.last_modified, user)
+        response = get_conditional_response(request,
+                                            etag=etag,
+                                            last_modified=timestamp)
+        if response is not None:
+            return set_page_validators(response, etag, timestamp)
+        if module_id is None:
+            # The contents of the first module
+            modules = await run(get_modules, course)
+            if modules:
+                module_id = modules[0].id
+            contents = await run(get_contents, module_id)
+        else:
+            # Loaded with the outline, only from a module of the course:
+            # make_player() checks that the module is in it
+            module_id = parse_module_id(module_id)
+            modules, contents = await gather(
+                partial(get_modules, course),
+                partial(get_contents, module_id, course.id))
+        self.player = make_player(course, modules, module_id, contents)
+        self.object = course
+        response = self.render_to_response(
+            self.get_context_data(object=course))
+        return set_page_validators(response, etag, timestamp)
@@ -0,0 +1,190 @@
+"""
+Bulk enrollment of students in a course from a CSV file.
+
+The file has a header row with a "username" and/or an "email" column.
+The rows are processed in batches: the users of a batch are resolved
+with one query, the missing ones created with one bulk insert and the
+enrollments inserted with one bulk insert, whatever the batch size.
+"""
+
+import csv
+import time
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed
+
+from courses.models import Course
+
+
+class EnrollmentReport(object):
+    def __init__(self):
+        self.rows = 0
+        self.enrolled = 0
+        self.already_enrolled = 0
+        self.created = 0
+        # (line number, message)
+        self.errors = []
+        self.elapsed = 0
+
+    @property
+    def throughput(self):
+        # rows by second
+        return self.rows / self.elapsed if self.elapsed else 0
+
+    def __str__(self):
+        return ('{} rows in {:.2f}s ({:.0f} rows/s): {} enrolled, '
+                '{} already enrolled, {} accounts created, {} errors').format(
+                    self.rows, self.elapsed, self.throughput, self.enrolled,
+                    self.already_enrolled, self.created, len(self.errors))
+
+
+def read_rows(lines):
+    """
+    Yield (line number, username, email) for each row of the CSV lines.
+    Raise ValueError if the header has no username or email column.
+    """
+    reader = csv.DictReader(lines)
+    fields = [name.strip().lower() for name in reader.fieldnames or []]
+    if 'username' not in fields and 'email' not in fields:
+        raise ValueError('The file needs a "username" or "email" column.')
+    reader.fieldnames = fields
+    for row in reader:
+        yield (reader.line_num, (row.get('username') or '').strip(),
+               (row.get('email') or '').strip())
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def _resolve_users(rows):
+    # Map the usernames and emails of the rows to their users
+    usernames = {username for line, username, email in rows if username}
+    emails = {
+        email
+        for line, username, email in rows if email and not username
+    }
+    by_username, by_email = {}, {}
+    # The accounts created for the rows without username
+    # use the email as username
+    users = User.objects.filter(
+        Q(username__in=usernames | emails) | Q(email__in=emails)).only(
+            'id', 'username', 'email')
+    for user in users:
+        by_username[user.username] = user.id
+        by_email.setdefault(user.email, []).append(user.id)
+    return by_username, by_email
+
+
+def _create_users(rows, report):
+    # Create the missing accounts, the email is the username of the
+    # rows without one. They can't log in until they reset their password.
+    users = {}
+    for line, username, email in rows:
+        username = username or email
+        users.setdefault(
+            username,
+            User(username=username,
+                 email=email,
+                 password=make_password(None)))
+    User.objects.bulk_create(users.values(), ignore_conflicts=True)
+    # The databases don't all return the ids of the inserted rows. The
+    # accounts created meanwhile by another request are skipped by the
+    # insert: they don't have the random unusable password of ours.
+    ids = {}
+    for username, user_id, password in User.objects.filter(
+            username__in=users).values_list('username', 'id', 'password'):
+        ids[username] = user_id
+        if password == users[username].password:
+            report.created += 1
+    return ids
+
+
+def enroll_batch(course, rows, create_missing, report):
+    by_username, by_email = _resolve_users(rows)
+    user_ids = {}
+    missing = []
+    for line, username, email in rows:
+        if username:
+            user_id = by_username.get(username)
+        else:
+            ids = by_email.get(email, [])
+            if len(ids) > 1:
+                report.errors.append(
+                    (line, 'Several accounts use the email {}.'.format(email)))
+                continue
+            user_id = ids[0] if ids else by_username.get(email)
+        if user_id is not None:
+            user_ids[line] = user_id
+        elif create_missing:
+            missing.append((line, username, email))
+        else:
+            report.errors.append(
+                (line, 'No account for {}.'.format(username or email)))
+    if missing:
+        created = _create_users(missing, report)
+        for line, username, email in missing:
+            user_ids[line] = created[username or email]
+
+    ids = set(user_ids.values())
+    Enrollment = Course.students.through
+    enrolled = set(
+        Enrollment.objects.filter(course=course,
+                                  user_id__in=ids).values_list('user_id',
+                                                               flat=True))
+    new_ids = ids - enrolled
+    report.already_enrolled += len(enrolled)
+    if not new_ids:
+        return
+    # Send m2m_changed as course.students.add() would
+    # for the caches depending on the enrollments
+    m2m_changed.send(sender=Enrollment, action='pre_add', instance=course,
+                     reverse=False, model=User, pk_set=new_ids,
+                     using=Enrollment.objects.db)
+    Enrollment.objects.bulk_create(
+        [Enrollment(course=course, user_id=user_id) for user_id in new_ids],
+        ignore_conflicts=True)
+    m2m_changed.send(sender=Enrollment, action='post_add', instance=course,
+                     reverse=False, model=User, pk_set=new_ids,
+                     using=Enrollment.objects.db)
+    report.enrolled += len(new_ids)
+
+
+def bulk_enroll(course, lines, create_missing=True, batch_size=1000):
+    """
+    Enroll the users listed in the CSV lines in the course.
+    Return an EnrollmentReport, the invalid rows are reported
+    in its errors without stopping the import.
+    """
+    report = EnrollmentReport()
+    start = time.perf_counter()
+    for batch in _batches(read_rows(lines), batch_size):
+        report.rows += len(batch)
+        rows = []
+        for line, username, email in batch:
+            if not username and not email:
+                report.errors.append((line, 'No username or email.'))
+                continue
+            try:
+                if email:
+                    validate_email(email)
+                User._meta.get_field('username').run_validators(
+                    username or email)
+            except ValidationError as e:
+                report.errors.append((line, ' '.join(e.messages)))
+                continue
+            rows.append((line, username, email))
+        with transaction.atomic():
+            enroll_batch(course, rows, create_missing, report)
+    report.elapsed = time.perf_counter() - start
+    return report
@@ -6,3 +6,13 @@ class CourseEnrollForm(forms.Form):
     # Used in the CourseDetailView to let user enrol in a course
     course = forms.ModelChoiceField(queryset=Course.objects.all(),
                                     widget=forms.HiddenInput)
+
+
+class EnrollmentImportForm(forms.Form):
+    # Used by the instructors to enroll students from a CSV file
+    csv_file = forms.FileField(
+        label='CSV file',
+        help_text='With a "username" and/or an "email" column.')
+    create_missing = forms.BooleanField(label='Create the missing accounts',
+                                        initial=True,
+                                        required=False)
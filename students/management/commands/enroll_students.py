@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.models import Course
+from students.enrollment import bulk_enroll
+
+
+class Command(BaseCommand):
+    help = ('Enroll the users listed in a CSV file (with a "username" '
+            'and/or "email" column) in a course.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('course', help='Id or slug of the course')
+        parser.add_argument('csv_file')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--no-create',
+                            action='store_false',
+                            dest='create_missing',
+                            help="Report the unknown users instead of "
+                            "creating their accounts")
+
+    def handle(self, *args, **options):
+        course = options['course']
+        lookup = {'id': course} if course.isdigit() else {'slug': course}
+        try:
+            course = Course.objects.get(**lookup)
+        except Course.DoesNotExist:
+            raise CommandError('No course {}'.format(options['course']))
+
+        try:
+            with open(options['csv_file'], newline='',
+                      encoding='utf-8-sig') as lines:
+                report = bulk_enroll(course,
+                                     lines,
+                                     create_missing=options['create_missing'],
+                                     batch_size=options['batch_size'])
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+
+        for line, message in report.errors:
+            self.stderr.write('line {}: {}'.format(line, message))
+        self.stdout.write(self.style.SUCCESS(str(report)))
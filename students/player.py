@@ -0,0 +1,104 @@
+"""
+Data of the course player, the page on which the students follow
+a course they are enrolled in.
+
+load_player() fetches everything the page shows with a fixed number
+of queries, whatever the number of modules and contents:
+
+1. the course, only if the user is enrolled in it (see
+   courses.membership.get_enrolled_course_ids),
+2. the outline of the course, its ordered modules,
+3. the contents of the selected module,
+4. their items, one query by content type (see courses.models.load_items).
+"""
+
+from collections import namedtuple
+
+from django.http import Http404
+
+from courses.membership import is_enrolled
+from courses.models import Course, Content
+
+Player = namedtuple('Player', ['course', 'modules', 'module', 'contents'])
+
+
+def get_course(user, course_id):
+    # The enrollment is checked from the cached course ids, the course
+    # is loaded without joining the enrollments
+    if is_enrolled(user, course_id):
+        try:
+            return Course.objects.get(id=course_id)
+        except Course.DoesNotExist:
+            pass
+    raise Http404('No course matches the given query.')
+
+
+def get_modules(course):
+    modules = list(course.modules.all())
+    for module in modules:
+        # The course is already loaded
+        module.course = course
+    return modules
+
+
+def parse_module_id(module_id):
+    # The module id of the URL, None for the first module
+    if module_id is None:
+        return None
+    try:
+        return int(module_id)
+    except (TypeError, ValueError):
+        raise Http404('No module matches the given query.')
+
+
+def get_module(modules, module_id):
+    """
+    Return the module of the outline with the given id, the first module
+    if module_id is None. Raise Http404 if the module isn't in the course.
+    """
+    module_id = parse_module_id(module_id)
+    if module_id is None:
+        return modules[0] if modules else None
+    module = next((m for m in modules if m.id == module_id), None)
+    if module is None:
+        raise Http404('No module matches the given query.')
+    return module
+
+
+def get_contents(module_id, course_id=None):
+    # Only needs the ids: it can run at the same time as get_modules()
+    # (see students/async_views.py), the contents of a module of another
+    # course than course_id aren't loaded.
+    module_id = parse_module_id(module_id)
+    if module_id is None:
+        return []
+    contents = Content.objects.filter(module_id=module_id)
+    if course_id is not None:
+        contents = contents.filter(module__course_id=course_id)
+    return list(contents.with_items())
+
+
+def make_player(course, modules, module_id, contents):
+    """
+    Return the Player on the module, the first module if module_id is
+    None. Raise Http404 if the module isn't in the course.
+    """
+    module = get_module(modules, module_id)
+    for content in contents:
+        content.module = module
+    return Player(course, modules, module, contents)
+
+
+def load_player(user, course_id, module_id=None):
+    """
+    Return the Player of the course for the user, on the module
+    or on the first module of the course if module_id is None.
+    Raise Http404 if the user isn't enrolled or the module isn't
+    in the course.
+    """
+    course = get_course(user, course_id)
+    modules = get_modules(course)
+    # Checked against the outline before loading its contents
+    module = get_module(modules, module_id)
+    return make_player(course, modules, module and module.id,
+                       get_contents(module and module.id))
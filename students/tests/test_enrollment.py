@@ -0,0 +1,143 @@
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db.models.signals import m2m_changed
+
+from courses.models import Course
+from courses.tests.utils import create_instructor, seed_course
+from students.enrollment import bulk_enroll
+
+CSV = """username,email
+Ulrich,
+,baba@example.com
+newcomer,newcomer@example.com
+,new@example.com
+,not-an-email
+,
+Ulrich,
+"""
+
+
+class BulkEnrollTest(TestCase):
+    def setUp(self):
+        self.instructor = create_instructor()
+        self.course = seed_course(self.instructor)
+        self.ulrich = User.objects.create_user(username='Ulrich')
+        self.baba = User.objects.create_user(username='baba',
+                                             email='baba@example.com')
+
+    def test_bulk_enroll(self):
+        report = bulk_enroll(self.course, StringIO(CSV))
+        self.assertEqual(report.rows, 7)
+        self.assertEqual(report.enrolled, 4)
+        self.assertEqual(report.created, 2)
+        self.assertEqual([line for line, message in report.errors], [6, 7])
+        self.assertEqual(
+            set(self.course.students.values_list('username', flat=True)),
+            {'Ulrich', 'baba', 'newcomer', 'new@example.com'})
+        # The created accounts can't log in
+        self.assertFalse(
+            User.objects.get(username='newcomer').has_usable_password())
+
+    def test_already_enrolled(self):
+        self.course.students.add(self.ulrich)
+        report = bulk_enroll(self.course, StringIO(CSV), create_missing=False)
+        self.assertEqual(report.already_enrolled, 1)
+        self.assertEqual(report.enrolled, 1)
+        self.assertEqual(report.created, 0)
+        self.assertEqual(len(report.errors), 4)
+        self.assertEqual(self.course.students.count(), 2)
+
+    def test_created_meanwhile(self):
+        # Not found by the lookup, created before the insert
+        with mock.patch('students.enrollment._resolve_users',
+                        return_value=({}, {})):
+            report = bulk_enroll(self.course, StringIO('username\nUlrich\n'))
+        self.assertEqual((report.enrolled, report.created), (1, 0))
+        self.assertEqual(list(self.course.students.all()), [self.ulrich])
+
+    def test_constant_queries_per_batch(self):
+        # Small enough for sqlite to insert each batch with one query
+        lines = ['username'] + ['student{}'.format(i) for i in range(60)]
+        # 5 queries, the student count and a savepoint by batch
+        with self.assertNumQueries(16):
+            report = bulk_enroll(self.course, lines, batch_size=30)
+        self.assertEqual(report.enrolled, 60)
+
+    def test_m2m_changed_sent(self):
+        received = []
+
+        def receiver(sender, action, instance, pk_set, **kwargs):
+            received.append((action, instance, pk_set))
+
+        m2m_changed.connect(receiver, sender=Course.students.through)
+        self.addCleanup(m2m_changed.disconnect,
+                        receiver,
+                        sender=Course.students.through)
+        bulk_enroll(self.course, ['username', 'Ulrich'])
+        self.assertEqual(received, [('pre_add', self.course, {self.ulrich.id}),
+                                    ('post_add', self.course,
+                                     {self.ulrich.id})])
+
+    def test_missing_columns(self):
+        with self.assertRaises(ValueError):
+            bulk_enroll(self.course, ['name', 'Ulrich'])
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as csv_file:
+            csv_file.write(CSV)
+            csv_file.flush()
+            out, err = StringIO(), StringIO()
+            call_command('enroll_students',
+                         self.course.slug,
+                         csv_file.name,
+                         '--batch-size=2',
+                         stdout=out,
+                         stderr=err)
+        self.assertIn('4 enrolled', out.getvalue())
+        self.assertIn('line 6', err.getvalue())
+        self.assertEqual(self.course.students.count(), 4)
+
+    def test_import_view(self):
+        self.client.force_login(self.instructor)
+        url = reverse('courses:course_students_import',
+                      args=[self.course.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(
+            url, {
+                'csv_file': SimpleUploadedFile('students.csv',
+                                               CSV.encode('utf-8')),
+                'create_missing': 'on'
+            })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['report'].enrolled, 4)
+        self.assertEqual(self.course.students.count(), 4)
+
+    def test_import_view_invalid_csv(self):
+        self.client.force_login(self.instructor)
+        url = reverse('courses:course_students_import',
+                      args=[self.course.id])
+        # Over the field size limit of the csv module
+        response = self.client.post(
+            url, {
+                'csv_file':
+                SimpleUploadedFile('students.csv',
+                                   b'username\n' + b'a' * 200000 + b'\n')
+            })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].has_error('csv_file'))
+        self.assertIsNone(response.context['report'])
+
+    def test_import_view_owner_only(self):
+        other = create_instructor(username='other')
+        self.client.force_login(other)
+        response = self.client.get(
+            reverse('courses:course_students_import', args=[self.course.id]))
+        self.assertEqual(response.status_code, 404)
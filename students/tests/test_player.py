@@ -0,0 +1,151 @@
+from django.test import TestCase, override_settings
+from django.http import Http404
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from courses.membership import get_enrolled_course_ids
+from courses.models import Video, Content
+from courses.tests.utils import create_instructor, seed_course
+from students.player import load_player
+
+
+class LoadPlayerTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = create_instructor()
+        cls.student = User.objects.create_user(username='student')
+
+    def setUp(self):
+        cache.clear()
+
+    def get_student(self, enrollments=False):
+        # The user of a new request, with its enrolled course ids
+        # already cached if enrollments is True
+        student = User.objects.get(id=self.student.id)
+        if enrollments:
+            get_enrolled_course_ids(student)
+        return student
+
+    def assertFlatQueries(self, module_index):
+        counts = set()
+        for size in (1, 4, 16):
+            course = seed_course(self.instructor,
+                                 modules=size,
+                                 contents=size,
+                                 students=[self.student])
+            module = course.modules.all()[module_index(size)]
+            student = self.get_student(enrollments=True)
+            with self.assertNumQueries(4) as context:
+                player = load_player(student, course.id, module.id)
+                for content in player.contents:
+                    content.item.render()
+            counts.add(len(context.captured_queries))
+            self.assertEqual(player.module, module)
+            self.assertEqual(len(player.modules), size)
+            self.assertEqual(len(player.contents), size)
+        self.assertEqual(counts, {4})
+
+    def test_flat_queries(self):
+        self.assertFlatQueries(lambda size: 0)
+        self.assertFlatQueries(lambda size: size - 1)
+
+    def test_first_module(self):
+        course = seed_course(self.instructor,
+                             modules=3,
+                             students=[self.student])
+        player = load_player(self.get_student(), course.id)
+        self.assertEqual(player.course, course)
+        self.assertEqual(player.module, course.modules.first())
+        with self.assertNumQueries(0):
+            self.assertEqual([m.course for m in player.modules],
+                             [course] * 3)
+
+    def test_no_modules(self):
+        course = seed_course(self.instructor,
+                             modules=0,
+                             students=[self.student])
+        player = load_player(self.get_student(), course.id)
+        self.assertIsNone(player.module)
+        self.assertEqual(player.contents, [])
+
+    def test_not_enrolled(self):
+        course = seed_course(self.instructor, modules=1)
+        with self.assertRaises(Http404):
+            load_player(self.get_student(), course.id)
+
+    def test_module_of_another_course(self):
+        course = seed_course(self.instructor, students=[self.student])
+        other = seed_course(self.instructor, students=[self.student])
+        with self.assertRaises(Http404):
+            load_player(self.get_student(), course.id, other.modules.get().id)
+
+    def test_invalid_module_id(self):
+        course = seed_course(self.instructor, students=[self.student])
+        with self.assertRaises(Http404):
+            load_player(self.get_student(), course.id, 'abc')
+        self.client.force_login(self.student)
+        response = self.client.get('/students/course/{}/abc/'.format(
+            course.id))
+        self.assertEqual(response.status_code, 404)
+
+    def test_module_checked_before_contents(self):
+        course = seed_course(self.instructor, students=[self.student])
+        other = seed_course(self.instructor, students=[self.student])
+        module_id = other.modules.get().id
+        student = self.get_student(enrollments=True)
+        # The course and its outline, not the contents
+        with self.assertNumQueries(2):
+            with self.assertRaises(Http404):
+                load_player(student, course.id, module_id)
+
+    def test_mixed_content_types(self):
+        course = seed_course(self.instructor,
+                             modules=1,
+                             contents=2,
+                             students=[self.student])
+        module = course.modules.get()
+        video = Video.objects.create(owner=self.instructor,
+                                     title='Video',
+                                     url='https://example.com/video')
+        Content.objects.create(module=module, item=video)
+        student = self.get_student(enrollments=True)
+        # One more query for the videos
+        with self.assertNumQueries(5):
+            player = load_player(student, course.id, module.id)
+        with self.assertNumQueries(0):
+            self.assertIn(video,
+                          [content.item for content in player.contents])
+
+    def test_enrollments_not_cached(self):
+        course = seed_course(self.instructor, students=[self.student])
+        for i in range(2):
+            student = self.get_student()
+            with self.assertNumQueries(1):
+                self.assertEqual(get_enrolled_course_ids(student),
+                                 {course.id})
+
+    @override_settings(ENROLLMENT_CACHE_TIMEOUT=60)
+    def test_enrollments_cached(self):
+        course = seed_course(self.instructor, students=[self.student])
+        student = self.get_student()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_enrolled_course_ids(student),
+                             {course.id})
+        # From the cache in the next request
+        student = self.get_student()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_enrolled_course_ids(student), {course.id})
+        other = seed_course(self.instructor)
+        self.student.courses_joined.add(other)
+        self.assertEqual(get_enrolled_course_ids(self.get_student()),
+                         {course.id, other.id})
+        course.students.remove(self.student)
+        self.assertEqual(get_enrolled_course_ids(self.get_student()),
+                         {other.id})
+        other.students.clear()
+        self.assertEqual(get_enrolled_course_ids(self.get_student()),
+                         set())
+        course.students.add(self.student)
+        course.delete()
+        self.assertEqual(get_enrolled_course_ids(self.get_student()),
+                         set())
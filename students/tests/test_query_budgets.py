@@ -0,0 +1,68 @@
+from django.test import TestCase, SimpleTestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+
+from students import urls
+from courses.budget import QueryBudgetTestMixin, get_query_budget
+from courses.tests.utils import create_instructor, seed_course
+
+
+class QueryBudgetDeclaredTest(SimpleTestCase):
+    def test_every_view_has_a_budget(self):
+        for pattern in urls.urlpatterns:
+            self.assertIsNotNone(get_query_budget(pattern.callback),
+                                 '{} has no query budget'.format(pattern.name))
+
+
+class StudentViewsQueryBudgetTest(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = create_instructor()
+        cls.student = User.objects.create_user(username='student',
+                                               password='S3cr3t**')
+
+    def setUp(self):
+        self.client.force_login(self.student)
+
+    def test_registration(self):
+        self.client.logout()
+        self.assertQueryBudget(reverse('students:student_registration'))
+
+    def test_enroll_course(self):
+        course = seed_course(self.instructor)
+        self.assertQueryBudget(reverse('students:student_enroll_course'),
+                               method='post',
+                               data={'course': course.id})
+        self.assertTrue(course.students.filter(id=self.student.id).exists())
+
+    def test_student_course_list(self):
+        def seed(size):
+            for i in range(size):
+                seed_course(self.instructor,
+                            modules=size,
+                            students=[self.student])
+            return reverse('students:student_course_list')
+
+        self.assertQueryBudgetScales(seed)
+
+    def test_student_course_detail(self):
+        def seed(size):
+            course = seed_course(self.instructor,
+                                 modules=size,
+                                 contents=size,
+                                 students=[self.student])
+            return reverse('students:student_course_detail', args=[course.id])
+
+        self.assertQueryBudgetScales(seed)
+
+    def test_student_course_detail_module(self):
+        def seed(size):
+            course = seed_course(self.instructor,
+                                 modules=size,
+                                 contents=size,
+                                 students=[self.student])
+            module = course.modules.last()
+            return reverse('students:student_course_detail_module',
+                           args=[course.id, module.id])
+
+        self.assertQueryBudgetScales(seed)
@@ -1,9 +1,13 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = 'students'
 
+# The course player, async under an ASGI server
+read_views = async_views if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
     path('register/',
          views.StudentRegistrationView.as_view(),
@@ -15,9 +19,9 @@ urlpatterns = [
          views.StudentCourseListView.as_view(),
          name='student_course_list'),
     path('course/<pk>/',
-         views.StudentCourseDetailView.as_view(),
+         read_views.StudentCourseDetailView.as_view(),
          name='student_course_detail'),
     path('course/<pk>/<module_id>/',
-         views.StudentCourseDetailView.as_view(),
+         read_views.StudentCourseDetailView.as_view(),
          name='student_course_detail_module'),
 ]
@@ -6,12 +6,17 @@ from django.views.generic.detail import DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth import authenticate, login
 
+from courses.conditional import ConditionalGetMixin
+from courses.membership import get_enrolled_course_ids, is_enrolled
 from courses.models import Course
+from courses.pagination import KeysetPaginationMixin
 
 from students.forms import CourseEnrollForm
+from students.player import load_player
 
 
 class StudentRegistrationView(CreateView):
+    query_budget = {'get': 0, 'post': 11}
     template_name = 'students/student/registration.html'
     form_class = UserCreationForm
     success_url = reverse_lazy('students:student_course_list')
@@ -26,6 +31,9 @@ class StudentRegistrationView(CreateView):
 
 
 class StudentEnrollCourseView(LoginRequiredMixin, FormView):
+    # add() looks for an existing enrollment first as the
+    # student count listens to m2m_changed
+    query_budget = 6
     course = None
     form_class = CourseEnrollForm
 
@@ -40,33 +48,40 @@ class StudentEnrollCourseView(LoginRequiredMixin, FormView):
                             args=[self.course.id])
 
 
-class StudentCourseListView(LoginRequiredMixin, ListView):
+class StudentCourseListView(LoginRequiredMixin, KeysetPaginationMixin,
+                            ListView):
+    # The enrolled course ids when they are not cached
+    query_budget = 6
     model = Course
     template_name = 'students/course/list.html'
 
     def get_queryset(self):
         qs = super(StudentCourseListView, self).get_queryset()
-        # Return only courses on which this student is enrolled in
-        return qs.filter(students__in=[self.request.user])
+        # Return only courses on which this student is enrolled in,
+        # from the cached ids
+        return qs.filter(id__in=get_enrolled_course_ids(self.request.user))
 
 
-class StudentCourseDetailView(DetailView):
+class StudentCourseDetailView(LoginRequiredMixin, ConditionalGetMixin,
+                              DetailView):
+    # See students/player.py, at most one query by content type
+    # for the items
+    query_budget = 12
     model = Course
     template_name = 'students/course/detail.html'
 
-    def get_queryset(self):
-        qs = super(StudentCourseDetailView, self).get_queryset()
-        return qs.filter(students__in=[self.request.user])
+    def get_last_modified_queryset(self):
+        if not is_enrolled(self.request.user, self.kwargs['pk']):
+            return Course.objects.none()
+        return Course.objects.filter(id=self.kwargs['pk'])
+
+    def get_object(self, queryset=None):
+        self.player = load_player(self.request.user, self.kwargs['pk'],
+                                  self.kwargs.get('module_id'))
+        return self.player.course
 
     def get_context_data(self, **kwargs):
         context = super(StudentCourseDetailView,
                         self).get_context_data(**kwargs)
-        # get course object
-        course = self.get_object()
-        if 'module_id' in self.kwargs:
-            # get current module
-            context['module'] = course.modules.get(id=self.kwargs['module_id'])
-        else:
-            # get first module
-            context['module'] = course.modules.all()[0]
+        context.update(self.player._asdict())
         return context